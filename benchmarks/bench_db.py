@@ -0,0 +1,137 @@
+"""채팅 기록 DB 마이크로벤치마크 (메시지 1M개)
+
+before: 호출마다 sqlite3.connect + commit + close, messages(session_id, id) 인덱스 없음
+after : thread-local 연결 재사용(WAL, pragma), init_db 마이그레이션으로 인덱스 생성,
+        save_message write-behind 배치 저장
+
+측정: save_message 초당 insert 수(호출 기준/저장 완료 기준), load_history 지연시간(p50/p95),
+      search_messages 지연시간 (FTS5 trigram vs LIKE 전체 스캔)
+
+실행: python -m benchmarks.bench_db [메시지 수]  (기본 1,000,000, 임시 파일에 DB 생성)
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from my_agent.utils import db
+
+MESSAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+SESSIONS = 10_000
+INSERTS = 2_000
+LOADS = 200
+
+
+def populate(path: str):
+    """세션 SESSIONS개에 메시지 MESSAGES개를 나눠 넣는다 (한 트랜잭션으로 빠르게)"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executemany(
+        "INSERT INTO chat_sessions (name, phone_number) VALUES (?, '')",
+        ((f"session {i}",) for i in range(SESSIONS)),
+    )
+    conn.executemany(
+        "INSERT INTO messages (session_id, role, content, message_uid) VALUES (?,?,?,?)",
+        (
+            (
+                random.randint(1, SESSIONS),
+                "user" if i % 2 == 0 else "assistant",
+                f"{i}번째 메시지입니다. 포메라니안 5kg 가위컷 예약 문의",
+                f"uid-{i}",
+            )
+            for i in range(MESSAGES)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_save_message(session_id: int, content: str):
+    conn = sqlite3.connect(db.DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO messages (session_id, role, content, message_uid) VALUES (?,?,?,?)",
+        (session_id, "user", content, None),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_load_history(session_id: int):
+    conn = sqlite3.connect(db.DB_PATH)
+    rows = conn.execute(
+        "SELECT id, role, content, message_uid FROM messages WHERE session_id = ? ORDER BY id ASC",
+        (session_id,),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def measure_inserts(save, flush=lambda: None) -> tuple[float, float]:
+    """(호출 쪽에서 본 초당 insert 수, 디스크 반영까지 포함한 초당 insert 수)"""
+    start = time.perf_counter()
+    for i in range(INSERTS):
+        save(random.randint(1, SESSIONS), f"벤치마크 메시지 {i}")
+    call_elapsed = time.perf_counter() - start
+    flush()
+    return INSERTS / call_elapsed, INSERTS / (time.perf_counter() - start)
+
+
+def measure_loads(load) -> tuple[float, float]:
+    latencies = []
+    for _ in range(LOADS):
+        start = time.perf_counter()
+        load(random.randint(1, SESSIONS))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def uncached_search(query: str) -> list[dict]:
+    # 같은 검색어가 반복돼도 매번 DB를 읽는 지연을 잰다 (ui에서는 rerun마다 캐시된 결과를 쓴다)
+    db._search_page.cache_clear()
+    return db.search_messages(query)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench_chat_history.db")
+        # before: 인덱스 생성 전 단계까지만 적용한 스키마
+        conn = sqlite3.connect(db.DB_PATH)
+        for migration in db.MIGRATIONS[:2]:
+            migration(conn.cursor())
+        conn.commit()
+        conn.close()
+        print(f"populating {MESSAGES:,} messages ...")
+        populate(db.DB_PATH)
+
+        before_inserts = measure_inserts(legacy_save_message)
+        before_p50, before_p95 = measure_loads(legacy_load_history)
+
+        db.init_db()
+        after_inserts = measure_inserts(
+            lambda session_id, content: db.save_message(session_id, "user", content),
+            db.message_writer.flush,
+        )
+        after_p50, after_p95 = measure_loads(db.load_history)
+
+        fts_p50, fts_p95 = measure_loads(
+            lambda session_id: uncached_search(f"{session_id * 7}번째 메시지")
+        )
+        # 2글자 검색어는 FTS 색인을 쓰지 못하고 LIKE로 찾는다
+        like_p50, like_p95 = measure_loads(
+            lambda session_id: uncached_search(f"{session_id * 7}번째 메시지 문의")
+        )
+
+    print(
+        f"{'':>8} {'call/s':>10} {'saved/s':>10} {'load p50(ms)':>13} {'load p95(ms)':>13}"
+    )
+    for name, (call_rate, saved_rate), p50, p95 in (
+        ("before", before_inserts, before_p50, before_p95),
+        ("after", after_inserts, after_p50, after_p95),
+    ):
+        print(f"{name:>8} {call_rate:>10.0f} {saved_rate:>10.0f} {p50:>13.2f} {p95:>13.2f}")
+    print(f"search p50/p95(ms): fts={fts_p50:.2f}/{fts_p95:.2f} like={like_p50:.2f}/{like_p95:.2f}")
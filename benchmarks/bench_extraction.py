@@ -0,0 +1,150 @@
+"""기존 분리 추출(Pet -> weight_range -> Reservation)과 통합 추출(QuoteRequest)의
+LLM 호출 수와 end-to-end latency 비교
+
+실행: python -m benchmarks.bench_extraction  (OPENAI_API_KEY 필요)
+"""
+
+import statistics
+import time
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+load_dotenv()
+
+from my_agent.utils.pricing import weight_to_range
+from my_agent.utils.tools.rag import (
+    llm,
+    Pet,
+    QuoteRequest,
+    Reservation,
+    fill_quote_request_runnable,
+)
+
+QUERIES = [
+    "포메라니안 5kg 가위컷 12월 20일 오후 2시에 예약하고 싶어요",
+    "말티즈 3.5kg 위생미용 다음주 화요일 오전 11시",
+    "골든 리트리버 28kg 목욕이랑 위생미용 얼마에요? 1월 3일 10시 가능할까요",
+    "7kg 비숑 프리제 스포팅 70000원으로 12월 24일 15:00",
+]
+ROUNDS = 3
+
+# 통합 전 get_service_menu가 사용하던 추출 프롬프트
+pet_prompt_template = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are an expert extraction algorithm. "
+            "Only extract relevant information from the text. "
+            "If you do not know the value of an attribute asked to extract, "
+            "return null for the attribute's value.",
+        ),
+        # Please see the how-to about improving performance with
+        # reference examples.
+        # MessagesPlaceholder('examples'),
+        ("human", "{query}"),
+    ]
+)
+
+reservation_prompt_template = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are an expert extraction algorithm. "
+            "Only extract reservation information from the text. "
+            "If you do not know the value of an attribute asked to extract, "
+            "return null for the attribute's value.",
+        ),
+        # Please see the how-to about improving performance with
+        # reference examples.
+        # MessagesPlaceholder('examples'),
+        ("human", "{query}"),
+    ]
+)
+
+# 통합 전 get_service_menu가 사용하던 weight_range 프롬프트
+weight_dictionary = [
+    "4kg 이하 -> weight_range=1",
+    "4kg 이상 6kg 이하 -> weight_range=2",
+    "6kg 이상 8kg 이하 -> weight_range=3",
+    "8kg 이상 10kg 이하 -> weight_range=4",
+]
+weight_range_prompt = ChatPromptTemplate.from_template(
+    """
+    you are an expert in pet services.
+    you can help you find the price of a service for your pet.
+    주어지는 petInfo를 적극 활용해주세요.
+    [pet_info]
+    {pet_info}
+    [weight_dictionary]
+    {weight_dictionary}
+    다음과 같은 요구사항이 있습니다
+    1. weight_dictionary를 참고해서 weight를 weight_range로 바꿔주세요
+    2. 다른 설명은 하지 마시고, weight_range의 숫자만 출력해주세요
+    ex) weight_range=1 이라면 1만
+"""
+)
+
+fill_pet_info_runnable = pet_prompt_template | llm.with_structured_output(schema=Pet)
+grade_weight_range_chain = weight_range_prompt | llm | StrOutputParser()
+fill_reservation_info_runnable = (
+    reservation_prompt_template | llm.with_structured_output(schema=Reservation)
+)
+
+
+class CallCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.calls = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+
+
+def legacy_extraction(query: str, config: dict):
+    pet = fill_pet_info_runnable.invoke({"query": query}, config=config)
+    weight_range = grade_weight_range_chain.invoke(
+        {"pet_info": pet, "weight_dictionary": weight_dictionary}, config=config
+    )
+    reservation = fill_reservation_info_runnable.invoke({"query": query}, config=config)
+    return pet, weight_range, reservation
+
+
+def to_reservation(quote_request: QuoteRequest) -> Reservation:
+    return Reservation(
+        service_name=quote_request.service_name,
+        weight=quote_request.weight,
+        reservation_date=quote_request.reservation_date,
+        price=quote_request.price,
+        phone=None,
+    )
+
+
+def fused_extraction(query: str, config: dict):
+    quote_request = fill_quote_request_runnable.invoke({"query": query}, config=config)
+    # 통합 추출에서는 weight_range를 LLM에 묻지 않고 무게로 계산한다
+    weight_range = weight_to_range(quote_request.weight) if quote_request.weight else None
+    return quote_request.to_pet(), weight_range, to_reservation(quote_request)
+
+
+def run(name: str, extract):
+    counter = CallCounter()
+    config = {"callbacks": [counter]}
+    latencies = []
+    for _ in range(ROUNDS):
+        for query in QUERIES:
+            started = time.perf_counter()
+            extract(query, config)
+            latencies.append(time.perf_counter() - started)
+    runs = ROUNDS * len(QUERIES)
+    print(
+        f"{name:>7}: llm calls/quote={counter.calls / runs:.1f} "
+        f"p50={statistics.median(latencies):.3f}s "
+        f"mean={statistics.mean(latencies):.3f}s "
+        f"max={max(latencies):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    run("legacy", legacy_extraction)
+    run("fused", fused_extraction)
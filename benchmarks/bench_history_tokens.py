@@ -0,0 +1,63 @@
+"""30턴 대화에서 턴마다 LLM이 받는 입력 토큰 수 비교
+
+before: 매 턴 UI 기록 전체를 id 없는 새 메시지로 graph에 다시 보냄 (add_messages가 중복으로 쌓음)
+after : 새 사용자 메시지 하나만 UI와 같은 id로 보냄
+
+실행: python -m benchmarks.bench_history_tokens  (API 호출 없음)
+"""
+
+import uuid
+import tiktoken
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph.message import add_messages
+
+TURNS = 30
+encoding = tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(messages) -> int:
+    return sum(len(encoding.encode(message.content)) for message in messages)
+
+
+def user_text(turn: int) -> str:
+    return f"{turn}번째 질문입니다. 포메라니안 5kg 가위컷 가격과 12월 {turn % 28 + 1}일 예약 가능 여부를 알려주세요."
+
+
+def assistant_text(turn: int) -> str:
+    return f"{turn}번째 답변입니다. 포메라니안 5kg 가위컷은 80,000원이며 요청하신 날짜에 예약 가능합니다."
+
+
+def simulate_before() -> list[int]:
+    ui_messages, thread, tokens = [], [], []
+    for turn in range(1, TURNS + 1):
+        ui_messages.append(HumanMessage(content=user_text(turn)))
+        # UI가 매번 id 없는 새 메시지 객체를 만들어 전체 기록을 보낸다
+        resent = [type(message)(content=message.content) for message in ui_messages]
+        thread = add_messages(thread, resent)
+        tokens.append(count_tokens(thread))
+        reply = AIMessage(content=assistant_text(turn))
+        thread = add_messages(thread, [reply])
+        ui_messages.append(AIMessage(content=reply.content))
+    return tokens
+
+
+def simulate_after() -> list[int]:
+    ui_messages, thread, tokens = [], [], []
+    for turn in range(1, TURNS + 1):
+        user_message = HumanMessage(content=user_text(turn), id=str(uuid.uuid4()))
+        ui_messages.append(user_message)
+        thread = add_messages(thread, [user_message])
+        tokens.append(count_tokens(thread))
+        reply = AIMessage(content=assistant_text(turn), id=str(uuid.uuid4()))
+        thread = add_messages(thread, [reply])
+        ui_messages.append(AIMessage(content=reply.content, id=reply.id))
+    return tokens
+
+
+if __name__ == "__main__":
+    before = simulate_before()
+    after = simulate_after()
+    print(f"{'turn':>4} {'before':>8} {'after':>8}")
+    for turn, (b, a) in enumerate(zip(before, after), start=1):
+        print(f"{turn:>4} {b:>8} {a:>8}")
+    print(f"total input tokens: before={sum(before)} after={sum(after)}")
@@ -0,0 +1,73 @@
+"""`import my_agent.agent`의 import 시간 (python -X importtime 요약)
+
+새 프로세스에서 import만 하고, 누적 시간이 큰 top-level 패키지와 self 시간이 큰 모듈을 보여준다.
+외부 client는 처음 사용할 때 만들어지므로 API key가 없어도 import는 성공해야 한다.
+
+실행: python -m benchmarks.bench_import_time [--runs 5] [--max-ms 3000]
+      --max-ms를 넘으면 exit code 1 (회귀 검사용)
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+TARGET = "my_agent.agent"
+TOP = 15
+
+
+def run_importtime() -> list[tuple[int, int, str]]:
+    """(self us, cumulative us, module) 목록. API key가 없는 환경을 흉내 내기 위해 관련 변수를 지운다."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.endswith(("_API_KEY", "_KEY", "_URL"))
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {TARGET} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    totals, rows = [], []
+    for _ in range(args.runs):
+        rows = run_importtime()
+        totals.append(next(c for _, c, m in rows if m.strip() == TARGET) / 1000)
+    total_ms = statistics.median(totals)
+
+    # 마지막 실행 기준 top-level 패키지별 누적 시간 (들여쓰기가 없는 import가 최상위)
+    packages = defaultdict(int)
+    for _, cumulative_us, module in rows:
+        if not module.startswith("  "):
+            packages[module.strip().split(".")[0]] += cumulative_us
+    print(f"import {TARGET}: p50 {total_ms:.0f} ms over {args.runs} runs")
+    print(f"\n{'package':<30} {'cumulative(ms)':>15}")
+    for package, cumulative_us in sorted(packages.items(), key=lambda item: -item[1])[:TOP]:
+        print(f"{package:<30} {cumulative_us / 1000:>15.1f}")
+    print(f"\n{'module':<50} {'self(ms)':>9}")
+    for self_us, _, module in sorted(rows, reverse=True)[:TOP]:
+        print(f"{module.strip():<50} {self_us / 1000:>9.1f}")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\nFAIL: {total_ms:.0f} ms > {args.max_ms:.0f} ms")
+        sys.exit(1)
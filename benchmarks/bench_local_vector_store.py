@@ -0,0 +1,53 @@
+"""LocalVectorStore 스냅샷 열기와 top-k 검색 지연시간
+
+Upstage 대신 langchain_core의 DeterministicFakeEmbedding(Upstage와 같은 4096차원)으로
+breeds.csv(133행)와 복제해서 늘린 행렬을 임베딩하고, save -> load(memmap) 뒤 similarity_search_with_score를 잰다.
+임베딩 호출 시간은 빼고 행렬 검색만 재기 위해 질의 벡터는 미리 만들어 둔다.
+
+실행: python -m benchmarks.bench_local_vector_store
+"""
+
+import statistics
+import tempfile
+import time
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from my_agent.utils.local_vector_store import LocalVectorStore, _normalize, breed_documents
+
+DIMENSION = 4096
+QUERIES = 200
+
+
+if __name__ == "__main__":
+    embedding = DeterministicFakeEmbedding(size=DIMENSION)
+    texts, metadatas = breed_documents()
+    store = LocalVectorStore.from_texts(texts, embedding, metadatas)
+
+    # 같은 문서의 임베딩으로 검색하면 자기 자신이 1등이어야 한다
+    doc, score = store.similarity_search_with_score(texts[0], k=1)[0]
+    assert doc.page_content == texts[0] and abs(score - 1) < 1e-5
+
+    query_vectors = [embedding.embed_query(f"query {i}") for i in range(QUERIES)]
+    print(f"{'rows':>8} {'file(MB)':>9} {'load(ms)':>9} {'top5 p50(ms)':>13} {'top5 p95(ms)':>13}")
+    for rows in (len(texts), 2_000, 10_000):
+        rng = np.random.default_rng(0)
+        vectors = _normalize(rng.standard_normal((rows, DIMENSION), dtype=np.float32))
+        vectors[: len(texts)] = store.vectors
+        documents = (store.documents * (rows // len(texts) + 1))[:rows]
+        with tempfile.TemporaryDirectory() as path:
+            LocalVectorStore(embedding, vectors, documents).save(path)
+            start = time.perf_counter()
+            loaded = LocalVectorStore.load(path, embedding)
+            load_ms = (time.perf_counter() - start) * 1000
+            assert loaded.similarity_search(texts[0], k=1)[0].page_content == texts[0]
+            latencies = []
+            for query in query_vectors:
+                start = time.perf_counter()
+                loaded.similarity_search_by_vector_with_score(query, k=5)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            del loaded
+        print(
+            f"{rows:>8} {vectors.nbytes / 2**20:>9.1f} {load_ms:>9.2f} "
+            f"{statistics.median(latencies):>13.3f} {latencies[int(len(latencies) * 0.95)]:>13.3f}"
+        )
@@ -0,0 +1,81 @@
+"""로컬 SQLite 예약 backend로 rpc.py의 예약 경로 전체를 네트워크 없이 측정
+
+RESERVATION_BACKEND=sqlite, 임시 DB 파일, 호출마다 LATENCY(+ 0 ~ JITTER)초의 인위적 지연으로
+예약 생성 -> 조회(캐시) -> 날짜 변경/취소(단건 반복 vs 한 번의 bulk RPC)를 실행한다.
+
+실행: python -m benchmarks.bench_reservation_backend [--latency 0.03] [--jitter 0.01]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+PHONE = "01012345678"
+RESERVATIONS = 20
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.update(
+        RESERVATION_BACKEND="sqlite",
+        LOCAL_RESERVATION_DB_PATH=os.path.join(workdir, "reservations.db"),
+        LOCAL_RPC_LATENCY_SECONDS=str(args.latency),
+        LOCAL_RPC_JITTER_SECONDS=str(args.jitter),
+    )
+    from my_agent.utils import rpc
+
+    rpc.warmup_rpc_gateway().join()
+    services = rpc.get_service_by_breed_and_weight(1, 1)
+    assert services and services[0]["max_weight"] == 4
+
+    create_ms = [
+        timed(
+            rpc.create_reservation,
+            SimpleNamespace(
+                status="예약대기",
+                service_name=services[0]["service_name"],
+                weight=3.5,
+                reservation_date=f"2099-01-{day + 1:02d} 14:00:00",
+                price=services[0]["price"],
+            ),
+            PHONE,
+        )
+        for day in range(RESERVATIONS)
+    ]
+    cold_ms = timed(rpc.reservation_cache.get, PHONE)
+    warm_ms = statistics.median(timed(rpc.reservation_cache.get, PHONE) for _ in range(50))
+    upcoming = rpc.reservation_cache.get(PHONE)
+    assert len(upcoming) == rpc.UPCOMING_RESERVATIONS_LIMIT + 1
+
+    uuids = [row["reservation_uuid"] for row in rpc.get_reservations_by_phone(PHONE)]
+    half = len(uuids) // 2
+    loop_ms = timed(
+        lambda: [rpc.update_reservation_date(uuid_, "2099-02-01 10:00:00") for uuid_ in uuids[:half]]
+    )
+    bulk_ms = timed(
+        rpc.update_reservation_dates,
+        [{"reservation_uuid": uuid_, "new_date": "2099-02-01 10:00:00"} for uuid_ in uuids[half:]],
+    )
+    results = rpc.cancel_reservations(uuids + ["00000000-0000-0000-0000-000000000000"])
+    assert [result["ok"] for result in results] == [True] * len(uuids) + [False]
+    assert rpc.get_reservations_by_phone(PHONE, status="예약대기") == []
+
+    print(f"latency {args.latency * 1000:.0f} ms + jitter {args.jitter * 1000:.0f} ms per RPC")
+    print(f"{'create_reservation':<34} p50 {statistics.median(create_ms):>8.2f} ms")
+    print(f"{'search (cold / cached)':<34} {cold_ms:>12.2f} / {warm_ms:.3f} ms")
+    print(f"{f'update {half} x single RPC':<34} {loop_ms:>12.2f} ms")
+    print(f"{f'update {len(uuids) - half} in one bulk RPC':<34} {bulk_ms:>12.2f} ms")
@@ -0,0 +1,19 @@
+"""규칙 기반 예약 파서의 hit rate (LLM 없이 필수 필드를 모두 채운 비율)와 파싱 시간
+
+파싱 결과의 정확성은 tests/test_reservation_parser.py에서 같은 말뭉치(benchmarks/reservation_corpus.py)로 검사한다. 여기서는 수치만 잰다.
+
+실행: python -m benchmarks.bench_reservation_parser
+"""
+
+import time
+from my_agent.utils.reservation_parser import parse_reservation
+from benchmarks.reservation_corpus import CORPUS, NOW
+
+if __name__ == "__main__":
+    hits = 0
+    started = time.perf_counter()
+    for text, *_ in CORPUS:
+        hits += parse_reservation(text, now=NOW).is_complete()
+    elapsed = time.perf_counter() - started
+    print(f"hit rate (LLM skipped): {hits}/{len(CORPUS)} = {hits / len(CORPUS):.0%}")
+    print(f"parse time: {elapsed / len(CORPUS) * 1000:.3f} ms/query")
@@ -0,0 +1,106 @@
+"""로컬 stand-in PostgREST 서버를 상대로 RPC 호출 지연시간 비교
+
+before: 호출마다 새 HTTP client를 만들고 연결을 새로 맺음 (예전 get_supabase_client() 방식)
+after : RpcGateway 하나의 keep-alive 연결을 재사용
+
+stand-in 서버는 `POST /rest/v1/rpc/{function}`에 고정된 JSON을 돌려주고, 연결마다 handshake 비용을
+흉내 내기 위해 새 연결의 첫 요청에 HANDSHAKE_DELAY를 더한다. (평문 HTTP라 HTTP/1.1로 통신한다)
+
+실행: python -m benchmarks.bench_rpc_gateway
+"""
+
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from my_agent.utils.rpc import RpcError, RpcGateway
+
+CALLS = 200
+# TLS handshake 비용 대신 새 연결의 첫 요청에 더하는 지연(초)
+HANDSHAKE_DELAY = 0.02
+RESERVATIONS = [
+    {
+        "reservation_uuid": f"00000000-0000-0000-0000-{i:012d}",
+        "reservation_date": "2024-12-20T14:00:00",
+        "service_name": "가위컷",
+        "price": 70000,
+        "status": "reserved",
+    }
+    for i in range(5)
+]
+
+
+class StandInPostgREST(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # header와 body를 따로 쓰므로 Nagle + delayed ACK 지연(~40ms)이 측정에 섞이지 않도록 끈다
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        time.sleep(HANDSHAKE_DELAY)
+
+    def do_GET(self):
+        self._send(200, {})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        params = json.loads(self.rfile.read(length) or b"{}")
+        if self.headers.get("apikey") != "stand-in-key":
+            self._send(401, {"message": "Invalid API key"})
+        elif self.path == "/rest/v1/rpc/get_reservations_by_phone" and "phone_number" in params:
+            self._send(200, RESERVATIONS)
+        else:
+            self._send(404, {"message": f"Could not find the function {self.path}"})
+
+    def _send(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def per_call_client(base_url: str):
+    with httpx.Client(base_url=f"{base_url}/rest/v1", headers={"apikey": "stand-in-key"}) as client:
+        return client.post("/rpc/get_reservations_by_phone", json={"phone_number": "01012345678"}).json()
+
+
+def measure(call) -> tuple[float, float]:
+    latencies = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInPostgREST)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    gateway = RpcGateway(base_url, "stand-in-key")
+    gateway.warmup()
+    assert gateway.call("get_reservations_by_phone", {"phone_number": "01012345678"}) == RESERVATIONS
+    try:
+        gateway.call("missing_function")
+    except RpcError as e:
+        assert e.status_code == 404
+
+    before = measure(lambda: per_call_client(base_url))
+    after = measure(
+        lambda: gateway.call("get_reservations_by_phone", {"phone_number": "01012345678"})
+    )
+    gateway.close()
+    server.shutdown()
+
+    print(f"{'':>8} {'p50(ms)':>8} {'p95(ms)':>8}")
+    print(f"{'before':>8} {before[0]:>8.2f} {before[1]:>8.2f}")
+    print(f"{'after':>8} {after[0]:>8.2f} {after[1]:>8.2f}")
@@ -0,0 +1,139 @@
+"""결함을 주입하는 로컬 stand-in PostgREST 서버를 상대로 RPC 정책 비교
+
+stand-in 서버는 요청마다 FAILURE_RATE 확률로 503을, SLOW_RATE 확률로 SLOW_DELAY만큼 늦은 응답을 돌려준다.
+(나머지는 FAST_DELAY 뒤에 정상 응답)
+
+no policy : 재시도 없음, hedging 없음
+retry     : 읽기 재시도 (exponential backoff + jitter)
+retry+hedge: 재시도 + HEDGE_AFTER 안에 응답이 없으면 같은 요청을 한 번 더 보냄
+
+마지막으로 서버를 완전히 죽인 상태(모두 503)에서 circuit breaker가 열린 뒤의 fail-fast 지연을 잰다.
+
+동작(재시도, breaker 복구, hedging)의 정확성은 tests/test_rpc_resilience.py에서 검사한다. 여기서는 수치만 잰다.
+
+실행: python -m benchmarks.bench_rpc_resilience
+"""
+
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from my_agent.utils.resilience import CircuitBreaker, CircuitOpenError
+from my_agent.utils.rpc import RpcError, RpcGateway
+
+CALLS = 300
+FAILURE_RATE = 0.1
+SLOW_RATE = 0.05
+FAST_DELAY = 0.002
+SLOW_DELAY = 0.5
+HEDGE_AFTER = 0.05
+DEADLINE = 2.0
+RESERVATIONS = [{"reservation_uuid": "00000000-0000-0000-0000-000000000000", "status": "reserved"}]
+
+
+class FaultInjectingPostgREST(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # 서버 전체를 죽인 상태를 흉내 낼 때 True
+    down = False
+
+    def do_GET(self):
+        self._send(200, {})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        roll = random.random()
+        if self.down or roll < FAILURE_RATE:
+            self._send(503, {"message": "Service Unavailable"})
+        elif roll < FAILURE_RATE + SLOW_RATE:
+            time.sleep(SLOW_DELAY)
+            self._send(200, RESERVATIONS)
+        else:
+            time.sleep(FAST_DELAY)
+            self._send(200, RESERVATIONS)
+
+    def _send(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # hedging으로 먼저 끝난 쪽만 쓰고 닫은 연결에 늦은 응답을 쓰다 나는 오류는 무시한다
+        pass
+
+
+def measure(gateway: RpcGateway) -> tuple[float, float, float]:
+    """(오류율, p50 ms, p99 ms)"""
+    latencies, errors = [], 0
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        try:
+            gateway.call("get_reservations_by_phone", {"phone_number": "01012345678"}, idempotent=True)
+        except (RpcError, CircuitOpenError, TimeoutError):
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return errors / CALLS, statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def gateway(base_url: str, **kwargs) -> RpcGateway:
+    # 측정 중 breaker가 열리지 않도록 threshold를 크게 둔다 (fail-fast는 따로 잰다)
+    gateway = RpcGateway(
+        base_url,
+        "stand-in-key",
+        timeout=DEADLINE,
+        breaker=CircuitBreaker(failure_threshold=10**6),
+        **kwargs,
+    )
+    gateway.warmup()
+    return gateway
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    server = StandInServer(("127.0.0.1", 0), FaultInjectingPostgREST)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{'':>12} {'errors':>7} {'p50(ms)':>8} {'p99(ms)':>8}")
+    for name, kwargs in [
+        ("no policy", {}),
+        ("retry", {"read_retries": 2}),
+        ("retry+hedge", {"read_retries": 2, "hedge_after": HEDGE_AFTER}),
+    ]:
+        g = gateway(base_url, **kwargs)
+        error_rate, p50, p99 = measure(g)
+        g.close()
+        print(f"{name:>12} {error_rate:>7.1%} {p50:>8.2f} {p99:>8.2f}")
+
+    # 서버가 죽은 상태: breaker가 열리기 전과 후의 호출 지연
+    FaultInjectingPostgREST.down = True
+    g = RpcGateway(base_url, "stand-in-key", read_retries=2, breaker=CircuitBreaker(failure_threshold=5))
+    start = time.perf_counter()
+    while not g.caller.breaker.is_open:
+        try:
+            g.call("get_reservations_by_phone", idempotent=True)
+        except (RpcError, CircuitOpenError):
+            pass
+    opened_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        try:
+            g.call("get_reservations_by_phone", idempotent=True)
+        except CircuitOpenError:
+            pass
+    fail_fast_us = (time.perf_counter() - start) / CALLS * 1e6
+    g.close()
+    server.shutdown()
+    print(f"\nbackend down: breaker opened after {opened_ms:.0f} ms, then fails fast in {fail_fast_us:.1f} us/call")
@@ -0,0 +1,69 @@
+"""새 브라우저 세션 하나가 추가될 때의 메모리와 첫 응답까지의 시간
+
+before: 세션마다 buildGraph() (graph compile + checkpointer 연결 + compaction 스레드)
+after : registry가 만든 graph 하나를 모든 세션이 공유
+
+측정
+- 세션당 메모리: 세션 SESSIONS개를 만드는 동안 늘어난 tracemalloc 바이트 / SESSIONS
+- 첫 응답 시간: 세션 시작부터 graph 준비 + 새 thread의 get_state까지
+  (OPENAI_API_KEY가 있으면 첫 질문에 대한 응답까지 포함)
+
+실행: python -m benchmarks.bench_session_startup
+"""
+
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+load_dotenv()
+
+from my_agent.agent import buildGraph
+from my_agent.utils.registry import registry
+
+SESSIONS = 20
+FIRST_QUESTION = "포메라니안 5kg 가위컷 가격 알려주세요"
+
+
+def first_response(get_graph) -> float:
+    start = time.perf_counter()
+    graph = get_graph()
+    config = {"configurable": {"thread_id": str(uuid.uuid4()), "phone_number": "01012345678"}}
+    graph.get_state(config)
+    if os.getenv("OPENAI_API_KEY"):
+        graph.invoke({"messages": [HumanMessage(content=FIRST_QUESTION)]}, config)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(get_graph) -> tuple[float, float]:
+    """(세션당 메모리 KB, 첫 응답 시간 p50 ms)"""
+    sessions, latencies = [], []
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(SESSIONS):
+        latencies.append(first_response(get_graph))
+        # streamlit처럼 세션이 graph 참조를 들고 있는 상태를 유지한다
+        sessions.append(get_graph())
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return allocated / SESSIONS / 1024, statistics.median(latencies)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_path = os.path.join(tmp, "bench_checkpoints.db")
+        # 모듈 import, 공유 client 생성 비용은 양쪽에서 제외한다
+        registry.get("graph", buildGraph, checkpoint_path)
+
+        before_memory, before_latency = measure(lambda: buildGraph(checkpoint_path))
+        after_memory, after_latency = measure(
+            lambda: registry.get("graph", buildGraph, checkpoint_path)
+        )
+
+    print(f"{'':>8} {'KB/session':>11} {'first response p50(ms)':>23}")
+    print(f"{'before':>8} {before_memory:>11.1f} {before_latency:>23.2f}")
+    print(f"{'after':>8} {after_memory:>11.1f} {after_latency:>23.2f}")
@@ -0,0 +1,49 @@
+"""규칙 기반 예약 파서의 말뭉치. tests/test_reservation_parser.py와 benchmarks/bench_reservation_parser.py가 함께 쓴다."""
+
+from datetime import datetime
+
+# 기준 시각: 2024-12-18(수) 10:00
+NOW = datetime(2024, 12, 18, 10, 0)
+
+# (입력, 기대 reservation_date, 기대 service_name, 기대 price)
+# 기대값이 None이면 파서가 채우지 못해야 하는(LLM으로 넘겨야 하는) 경우
+CORPUS = [
+    ("12월 20일 오후 2시 가위컷 70,000원", "2024-12-20 14:00:00", "가위컷", 70000),
+    ("12월 20일 14시 가위컷 70000원", "2024-12-20 14:00:00", "가위컷", 70000),
+    ("12월 20일 2시 위생미용 15000원", "2024-12-20 14:00:00", "위생미용", 15000),
+    ("12월 20일 오전 11시 30분 스포팅 6만원", "2024-12-20 11:30:00", "스포팅", 60000),
+    ("12월 20일 오전 10시 반 클리핑 3만 5천원", "2024-12-20 10:30:00", "클리핑", 35000),
+    ("1월 3일 오후 3시 위생미용+목욕 25,000원", "2025-01-03 15:00:00", "위생미용+목욕", 25000),
+    ("12월 1일 오후 1시 가위컷 70,000원", "2025-12-01 13:00:00", "가위컷", 70000),
+    ("2025년 2월 14일 오후 4시 스포팅 60,000원", "2025-02-14 16:00:00", "스포팅", 60000),
+    ("2025-01-10 14:00 가위컷 70000원", "2025-01-10 14:00:00", "가위컷", 70000),
+    ("12/24 15:30 클리핑 35,000원", "2024-12-24 15:30:00", "클리핑", 35000),
+    # 24시간 표기는 오후로 바꾸지 않는다
+    ("12/24 07:30 클리핑 35,000원", "2024-12-24 07:30:00", "클리핑", 35000),
+    ("내일 오후 2시 가위컷 70,000원", "2024-12-19 14:00:00", "가위컷", 70000),
+    ("모레 오전 10시 위생미용 15,000원", "2024-12-20 10:00:00", "위생미용", 15000),
+    ("내일모레 저녁 6시 목욕 25,000원", "2024-12-20 18:00:00", "위생미용+목욕", 25000),
+    ("오늘 오후 5시 위생미용 15,000원", "2024-12-18 17:00:00", "위생미용", 15000),
+    ("다음주 화요일 오후 2시 가위컷 70,000원", "2024-12-24 14:00:00", "가위컷", 70000),
+    ("다음 주 월요일 11시 클리핑 35,000원", "2024-12-23 11:00:00", "클리핑", 35000),
+    ("이번주 금요일 정오 스포팅 60,000원", "2024-12-20 12:00:00", "스포팅", 60000),
+    ("토요일 오후 1시 가위컷 70,000원", "2024-12-21 13:00:00", "가위컷", 70000),
+    ("다다음주 수요일 낮 2시 위생미용 15,000원", "2025-01-01 14:00:00", "위생미용", 15000),
+    # 밤 12시는 자정
+    ("12월 20일 밤 12시 가위컷 70,000원", "2024-12-20 00:00:00", "가위컷", 70000),
+    ("포메라니안 5kg 12월 27일 오후 4시 가위컷 80,000원", "2024-12-27 16:00:00", "가위컷", 80000),
+    # 가격이 없으면 LLM으로 넘어가야 한다
+    ("12월 20일 오후 2시 가위컷", "2024-12-20 14:00:00", "가위컷", None),
+    # 시각이 없으면 날짜를 확정하지 않는다
+    ("12월 20일 가위컷 70,000원", None, "가위컷", 70000),
+    # 이미 지난 이번주 요일, 지난 시각
+    ("이번주 월요일 오후 2시 가위컷 70,000원", None, "가위컷", 70000),
+    ("오늘 오전 9시 가위컷 70,000원", None, "가위컷", 70000),
+    # 서비스가 없으면 LLM으로
+    ("12월 20일 오후 2시로 해주세요 70,000원", "2024-12-20 14:00:00", None, 70000),
+    # 금액이 여러 개면 먼저 나온 금액
+    ("12월 20일 오후 2시 가위컷 총 70,000원 (1만원 할인)", "2024-12-20 14:00:00", "가위컷", 70000),
+    ("다음에 예약할게요", None, None, None),
+]
+
+
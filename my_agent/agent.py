@@ -9,9 +9,11 @@ from typing import Literal, Annotated
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 from langgraph.graph.message import add_messages, AnyMessage
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import tools_condition
 from my_agent.utils.state import ReservState
+from my_agent.utils.checkpointer import SqliteCheckpointer, CHECKPOINT_DB_PATH
+from my_agent.utils.registry import registry
+from my_agent.utils.rpc import warmup_rpc_gateway, reservation_cache
 from my_agent.utils.nodes import (
     Assistant,
     route_question_adaptive,
@@ -48,7 +50,7 @@ def route_tools(state: ReservState):
 
 
 # 기본적인 연결은 add_edge로, add_conditional_edge 보다는 Command 처리방식이 권장됨
-def buildGraph():
+def buildGraph(checkpoint_path: str = CHECKPOINT_DB_PATH):
     builder = StateGraph(ReservState)
 
     builder.add_node("first_question_router", route_question_adaptive)
@@ -73,7 +75,9 @@ def buildGraph():
     builder.add_edge("rag_safe_tools", "rag_assistant")
     builder.add_edge("rag_sensitive_tools", "rag_assistant")
 
-    memory = MemorySaver()
+    # 재시작해도 thread(승인 대기 중인 interrupt 포함)를 이어갈 수 있도록 디스크에 저장
+    memory = SqliteCheckpointer(checkpoint_path)
+    memory.start_compaction()
     graph = builder.compile(
         checkpointer=memory,
     )
@@ -85,7 +89,11 @@ from langchain_core.messages import ToolMessage
 from my_agent.utils.utils import _print_event
 import streamlit as st
 from my_agent.utils.db import init_db, update_phone_number
-from my_agent.utils.chat import init_session_state, save_message
+from my_agent.utils.chat import (
+    init_session_state,
+    save_message,
+    sync_thread_messages,
+)
 from my_agent.utils.ui import (
     sidebar_ui,
     get_selected_session,
@@ -105,7 +113,10 @@ if __name__ == "__main__":
     init_session_state()
 
     if "graph" not in st.session_state:
-        st.session_state.graph = buildGraph()
+        # compiled graph(와 checkpointer)는 모든 브라우저 세션이 공유한다
+        st.session_state.graph = registry.get("graph", buildGraph, CHECKPOINT_DB_PATH)
+        # 프로세스에서 한 번, 첫 예약 조회 전에 Supabase 연결을 미리 맺어 둔다
+        registry.get("rpc_warmup", warmup_rpc_gateway)
 
     with st.sidebar:
         selected_session_id = sidebar_ui()
@@ -124,6 +135,14 @@ if __name__ == "__main__":
 
     st.title("강아지 미용 예약 서비스 챗봇입니다!")
 
+    # 채팅방을 처음 열 때 한 번만 graph thread와 UI 기록이 맞는지 확인한다
+    thread_id = st.session_state.config["configurable"]["thread_id"]
+    if st.session_state.get("synced_thread_id") != thread_id:
+        sync_thread_messages(
+            st.session_state.graph, st.session_state.config, current_session_id
+        )
+        st.session_state.synced_thread_id = thread_id
+
     str = (
         "안녕하세요! \n이리온 댕댕입니다 🐾  \n"
         "더욱 편리하고 개인 맞춤형 예약 서비스를  \n"
@@ -133,16 +152,19 @@ if __name__ == "__main__":
         "ex)01012345678  \n"
     )
     if len(st.session_state.messages) == 0:
-        st.session_state.messages.append(AIMessage(content=str))
-        save_message(current_session_id, "assistant", str)
+        greeting = AIMessage(content=str, id=save_message(current_session_id, "assistant", str))
+        st.session_state.messages.append(greeting)
 
     display_messages(st.session_state.messages)
 
     # React to user input
     if prompt := st.chat_input("What is up?"):
         st.chat_message("user").markdown(prompt)
-        st.session_state.messages.append(HumanMessage(content=prompt))
-        save_message(current_session_id, "user", prompt)
+        # UI, DB, graph가 같은 message id를 공유한다
+        user_message = HumanMessage(
+            content=prompt, id=save_message(current_session_id, "user", prompt)
+        )
+        st.session_state.messages.append(user_message)
         if st.session_state.config["configurable"]["phone_number"] == "":
             phone_number = parse_phone_number(prompt)
             if phone_number == []:
@@ -163,6 +185,8 @@ if __name__ == "__main__":
                     0
                 ]
                 update_phone_number(current_session_id, phone_number[0])
+                # "내 예약 보여줘"에 바로 답할 수 있도록 예약 목록을 미리 가져온다
+                reservation_cache.prefetch(phone_number[0])
                 st.session_state.messages.append(
                     AIMessage(
                         content="전화번호 입력이 완료되었습니다! 예약 상담을 도와드리겠습니다."
@@ -176,14 +200,20 @@ if __name__ == "__main__":
                 st.rerun()
         _printed = set()
 
+        # graph는 checkpoint에 대화 기록을 가지고 있으므로 새 메시지만 보낸다
         events = st.session_state.graph.stream(
-            {"messages": st.session_state.messages},
+            {"messages": [user_message]},
             st.session_state.config,
             stream_mode="values",
         )
         for event in events:
             _print_event(event, _printed)
             final_response = event["messages"][-1].content
+            final_message_id = (
+                event["messages"][-1].id
+                if isinstance(event["messages"][-1], AIMessage)
+                else None
+            )
             st.session_state.event = event
 
         response = f"{final_response}"
@@ -193,8 +223,10 @@ if __name__ == "__main__":
         #     response = "죄송해요, 말씀하신 내용을 잘 이해하지 못했어요. 다시 시도하시거나, 구체적인 질문을 입력해 주세요. 예를 들어 '예약 변경' 또는 '가격 확인' 등을 말씀해주시면 더 잘 도와드릴 수 있어요!"
         with st.chat_message("assistant"):
             st.markdown(response)
-        st.session_state.messages.append(AIMessage(content=response))
-        save_message(current_session_id, "assistant", response)
+        final_message_id = save_message(
+            current_session_id, "assistant", response, final_message_id
+        )
+        st.session_state.messages.append(AIMessage(content=response, id=final_message_id))
 
     if "user_input" not in st.session_state:
         st.session_state.user_input = None
@@ -231,6 +263,7 @@ if __name__ == "__main__":
                         content=result["messages"][-1].content,
                         additional_kwargs=result["messages"][-1].additional_kwargs,
                         response_metadata=result["messages"][-1].response_metadata,
+                        id=result["messages"][-1].id,
                     )
                 else:
                     st.session_state.messages[-1]["content"] = result["messages"][
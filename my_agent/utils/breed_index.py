@@ -0,0 +1,259 @@
+import csv
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+BREEDS_CSV_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "csv", "breeds.csv"
+)
+
+# 이 점수 미만이면 vector search + retrieval grader로 fallback
+BREED_MATCH_THRESHOLD = 0.75
+
+# 한글 음절 -> 자모 분해용 테이블 (유니코드 한글 음절 = 0xAC00 + (초성*21 + 중성)*28 + 종성)
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+
+_NGRAM_SIZES = (2, 3)
+# 퍼지 매칭 시 한 번에 이어붙여 볼 최대 토큰 수 ("미니어처 푸들" 같은 여러 단어 품종명)
+_MAX_SPAN_TOKENS = 3
+# 품종명 뒤에 붙는 조사/어미 ("말티즈예요", "푸들이고"). 토큰에서 떼어내고 정확히 일치하는지 본다
+_PARTICLE = re.compile(
+    r"(이에요|예요|에요|입니다|인데요|인데|이랑|랑|이고|고|이요|요|이야|야|이|가|은|는|을|를|도|와|과|견)$"
+)
+# 퍼지 점수가 이 이상인 표기가 있으면 문장에 품종이 언급된 것으로 본다 (품종이 없는 문장은 0.45 미만)
+BREED_MENTION_THRESHOLD = 0.5
+# 퍼지 매칭에서 breed type이 다른 후보와 점수 차이가 이보다 작으면 고르지 않고 vector search로 넘긴다
+_AMBIGUITY_MARGIN = 0.25
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 풀어쓴다. 한글이 아닌 문자는 그대로 둔다."""
+    jamo = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            jamo.append(_CHO[code // 588])
+            jamo.append(_JUNG[(code % 588) // 28])
+            jamo.append(_JONG[code % 28])
+        else:
+            jamo.append(char)
+    return "".join(jamo)
+
+
+def normalize_breed_name(text: str) -> str:
+    """공백과 기호를 제거하고 소문자로 바꾼다."""
+    return re.sub(r"[^0-9a-z가-힣]", "", text.lower())
+
+
+def _ngrams(text: str) -> Counter:
+    jamo = decompose_jamo(text)
+    grams = Counter()
+    for n in _NGRAM_SIZES:
+        for i in range(len(jamo) - n + 1):
+            grams[jamo[i : i + n]] += 1
+    return grams
+
+
+def _split_aliases(name: str) -> tuple[str, list[str]]:
+    """'셰틀랜드 쉽독(셀티, 셔틀랜드)' -> ('셰틀랜드 쉽독', ['셀티', '셔틀랜드'])"""
+    match = re.match(r"^(.*?)\((.*)\)\s*$", name)
+    if not match:
+        return name.strip(), []
+    main = match.group(1).strip()
+    aliases = [alias.strip() for alias in match.group(2).split(",") if alias.strip()]
+    return main, aliases
+
+
+@dataclass
+class BreedMatch:
+    name: str  # breeds.csv의 원래 품종명
+    breed_type: str
+    score: float  # 0 ~ 1, 1이면 정확히 일치
+    matched: str  # 실제로 매칭된 표기
+
+
+class BreedIndex:
+    """breeds.csv를 메모리에 올려 품종명 -> breed type을 찾아주는 인덱스.
+
+    정확히 일치하는 표기(괄호 안의 별칭 포함)를 먼저 찾고,
+    없으면 자모 n-gram 기반 퍼지 매칭으로 가장 비슷한 품종과 점수를 돌려준다.
+    """
+
+    def __init__(self, rows: list[tuple[str, str]]):
+        # 품종명 -> breed type
+        self.breeds: dict[str, str] = dict(rows)
+        # 정규화된 표기 -> (품종명, breed type)
+        self._exact: dict[str, tuple[str, str]] = {}
+        for name, breed_type in rows:
+            main, _ = _split_aliases(name)
+            self._exact.setdefault(normalize_breed_name(main), (name, breed_type))
+        # 원래 품종명이 별칭보다 우선하도록 별칭은 나중에 넣는다
+        for name, breed_type in rows:
+            main, aliases = _split_aliases(name)
+            main_tokens = main.split()
+            for alias in aliases:
+                variants = [alias]
+                # '잉글리시 불도그(불독)' -> '잉글리시 불독'
+                if len(main_tokens) > 1 and " " not in alias:
+                    variants.append(" ".join(main_tokens[:-1] + [alias]))
+                for variant in variants:
+                    self._exact.setdefault(
+                        normalize_breed_name(variant), (name, breed_type)
+                    )
+
+        self._grams: dict[str, Counter] = {}
+        self._postings: dict[str, list[str]] = {}
+        for key in self._exact:
+            grams = _ngrams(key)
+            self._grams[key] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key)
+        self._gram_sizes = {key: sum(grams.values()) for key, grams in self._grams.items()}
+
+    @classmethod
+    def from_csv(cls, path: str = BREEDS_CSV_PATH) -> "BreedIndex":
+        with open(path, encoding="utf-8") as f:
+            rows = [(row["name"], row["type"]) for row in csv.DictReader(f)]
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.breeds)
+
+    def lookup(self, name: str) -> Optional[BreedMatch]:
+        """표기가 정확히 일치하는 품종만 찾는다."""
+        key = normalize_breed_name(name)
+        if key not in self._exact:
+            return None
+        breed, breed_type = self._exact[key]
+        return BreedMatch(name=breed, breed_type=breed_type, score=1.0, matched=key)
+
+    def resolve(self, query: str) -> Optional[BreedMatch]:
+        """자유 문장("포메라니안 5kg")에서 품종을 찾아 점수와 함께 돌려준다."""
+        tokens = self._tokens(query)
+        if not tokens:
+            return None
+        exact = self._exact_span(tokens)
+        if exact is None:
+            return self._best_fuzzy(self._fuzzy_scores(tokens), tokens)
+        match, start, end = exact
+        # '미니어쳐 푸들'처럼 오타가 섞인 긴 품종명 안에 짧은 품종명('푸들')이 들어있는 경우.
+        # 정확히 일치한 토큰 구간을 포함하면서 더 긴 구간만 본다 ('닥스훈트'만 말하면 '장모 닥스훈트'로 바꾸지 않는다)
+        spans = [
+            (span_start, span_end)
+            for span_start in range(max(0, end - _MAX_SPAN_TOKENS), start + 1)
+            for span_end in range(end, min(span_start + _MAX_SPAN_TOKENS, len(tokens)) + 1)
+            if (span_start, span_end) != (start, end)
+        ]
+        longer = {
+            key: score
+            for key, score in self._fuzzy_scores(tokens, spans).items()
+            if match.matched in key and len(key) > len(match.matched)
+        }
+        if max(longer.values(), default=0.0) < BREED_MATCH_THRESHOLD:
+            return match
+        # 품종명을 더 길게 말했는데 어느 품종인지 가릴 수 없으면 짧은 품종명으로 확정하지 않는다
+        # ('스탠다드 푸들'을 '푸들'로 확정하면 가격표가 달라진다)
+        extra_tokens = tokens[:start] + tokens[end:]
+        fuzzy = self._best_fuzzy(longer, extra_tokens)
+        if fuzzy is None or fuzzy.score < BREED_MATCH_THRESHOLD:
+            return None
+        return fuzzy
+
+    def mentions_breed(self, query: str) -> bool:
+        """문장에 (확신할 수 없더라도) 품종명으로 보이는 표기가 있는지"""
+        tokens = self._tokens(query)
+        if self._exact_span(tokens) is not None:
+            return True
+        scores = self._fuzzy_scores(tokens)
+        return max(scores.values(), default=0.0) >= BREED_MENTION_THRESHOLD
+
+    def _exact_span(self, tokens: list[str]) -> Optional[tuple[BreedMatch, int, int]]:
+        """토큰 구간이 품종 표기와 정확히 일치하는 것 중 가장 긴 표기와 그 구간.
+
+        토큰 안에 품종명이 들어있기만 한 경우('믹스커피')는 일치로 보지 않는다. 끝의 조사는 떼고 비교한다.
+        """
+        best = None
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(start + _MAX_SPAN_TOKENS, len(tokens)) + 1):
+                span = "".join(tokens[start:end])
+                # '믹스견이에요' -> '믹스견' -> '믹스'
+                stripped = _PARTICLE.sub("", span)
+                for key in (span, stripped, _PARTICLE.sub("", stripped)):
+                    if key in self._exact and (best is None or len(key) > len(best[0].matched)):
+                        breed, breed_type = self._exact[key]
+                        best = (
+                            BreedMatch(name=breed, breed_type=breed_type, score=1.0, matched=key),
+                            start,
+                            end,
+                        )
+        return best
+
+    @staticmethod
+    def _tokens(query: str) -> list[str]:
+        # 숫자부터는(5kg, 3살 등) 품종명이 아니므로 잘라낸다 ('말티즈3kg' -> '말티즈')
+        tokens = [normalize_breed_name(re.split(r"\d", token)[0]) for token in query.split()]
+        return [token for token in tokens if token]
+
+    def _fuzzy_scores(
+        self, tokens: list[str], spans: Optional[list[tuple[int, int]]] = None
+    ) -> dict[str, float]:
+        """표기별로 토큰 구간과의 최고 자모 n-gram dice 점수를 구한다. spans를 주면 그 구간만 본다"""
+        if spans is None:
+            spans = [
+                (start, end)
+                for start in range(len(tokens))
+                for end in range(start + 1, min(start + _MAX_SPAN_TOKENS, len(tokens)) + 1)
+            ]
+        # 표기별 최고 점수
+        scores: dict[str, float] = {}
+        for start, end in spans:
+            span_grams = _ngrams("".join(tokens[start:end]))
+            span_size = sum(span_grams.values())
+            if span_size == 0:
+                continue
+            # n-gram 역색인으로 겹치는 표기만 후보로 본다
+            overlaps = Counter()
+            for gram, count in span_grams.items():
+                for key in self._postings.get(gram, ()):
+                    overlaps[key] += min(count, self._grams[key][gram])
+            for key, shared in overlaps.items():
+                score = 2 * shared / (span_size + self._gram_sizes[key])
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+        return scores
+
+    def _best_fuzzy(self, scores: dict[str, float], tokens: list[str]) -> Optional[BreedMatch]:
+        """가장 비슷한 품종. breed type(= 가격)이 다른 후보와 구분되지 않으면 None
+
+        퍼지 매칭이 틀리면 vector search와 grader를 건너뛰고 다른 가격표로 예약되므로,
+        애매하면 고르지 않는다.
+        """
+        if not scores:
+            return None
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_key, best_score = ranked[0]
+        breed, breed_type = self._exact[best_key]
+        # '말티스' -> 말티슈(2) / 말티즈(1)처럼 breed type이 다른 후보가 가까이 있는 경우
+        runner_up = next(
+            (score for key, score in ranked[1:] if self._exact[key][1] != breed_type),
+            0.0,
+        )
+        if best_score - runner_up < _AMBIGUITY_MARGIN:
+            return None
+        # '비숑' -> 비숑푸(2) / 비숑 프리제(3)처럼 토큰이 여러 breed type 품종명의 일부인 경우
+        for token in tokens:
+            if token in best_key and token != best_key and any(
+                token in key and self._exact[key][1] != breed_type for key in self._exact
+            ):
+                return None
+        return BreedMatch(
+            name=breed, breed_type=breed_type, score=best_score, matched=best_key
+        )
+
+
+breed_index = BreedIndex.from_csv()
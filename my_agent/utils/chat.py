@@ -1,24 +1,102 @@
 import streamlit as st
 import uuid
-from .db import load_history, save_message, get_phone_number
+from langchain_core.messages import HumanMessage, RemoveMessage
+from .db import (
+    HISTORY_PAGE_SIZE,
+    get_phone_number,
+    load_history,
+    load_history_page,
+    load_user_message_ids,
+    save_message,
+)
+from .rpc import reservation_cache
+
+# 기존 thread를 UI 기록으로 다시 채울 때 사용할 node.
+# 나가는 edge가 없는(Command로만 이동하는) node여야 update 후 snapshot.next가 비어 있다
+SEED_AS_NODE = "first_question_router"
+
+
+def thread_id_for_session(session_id: int) -> str:
+    # 채팅방마다 고정된 thread를 써야 graph checkpoint를 이어서 사용할 수 있다
+    return f"chat-session-{session_id}"
 
 
 def set_selected_session(session_id: int | None):
     st.session_state["selected_session_id"] = session_id
     if session_id is not None:
-        st.session_state["messages"] = load_history(session_id)
-        st.session_state.config["configurable"]["phone_number"] = get_phone_number(session_id)
+        # 최신 메시지 한 페이지만 불러오고 나머지는 "이전 메시지 더 보기"로 가져온다
+        messages, history_cursor = load_history_page(session_id)
+        st.session_state["messages"] = messages
+        st.session_state["history_cursor"] = history_cursor
+        st.session_state["history_window"] = HISTORY_PAGE_SIZE
+        phone_number = get_phone_number(session_id)
+        st.session_state.config["configurable"]["phone_number"] = phone_number
+        if phone_number:
+            reservation_cache.prefetch(phone_number)
+        st.session_state.config["configurable"]["thread_id"] = thread_id_for_session(
+            session_id
+        )
 
 
 def get_selected_session():
     return st.session_state.get("selected_session_id", None)
 
 
+def has_older_messages() -> bool:
+    return (
+        len(st.session_state.messages) > st.session_state.history_window
+        or st.session_state.history_cursor is not None
+    )
+
+
+def load_older_messages():
+    """화면에 그릴 메시지 범위를 한 페이지 늘린다. 메모리에 부족한 만큼만 DB에서 가져온다."""
+    window = st.session_state.history_window + HISTORY_PAGE_SIZE
+    shortfall = window - len(st.session_state.messages)
+    if shortfall > 0 and st.session_state.history_cursor is not None:
+        older, st.session_state.history_cursor = load_history_page(
+            get_selected_session(), st.session_state.history_cursor, shortfall
+        )
+        st.session_state.messages[:0] = older
+    st.session_state.history_window = window
+
+
+def sync_thread_messages(graph, config: dict, session_id: int) -> bool:
+    """graph thread의 사용자 메시지가 채팅 기록과 맞는지 확인하고, 다르면 채팅 기록으로 다시 채운다.
+
+    매 턴 전체 기록을 다시 보내던 예전 thread(중복 메시지)나
+    checkpoint가 없는 thread를 한 번만 정리한다. 정리했으면 True.
+    """
+    snapshot = graph.get_state(config)
+    if snapshot.next:
+        # 승인 대기 중인 thread는 건드리지 않는다
+        return False
+    graph_messages = snapshot.values.get("messages", [])
+    graph_human_ids = {m.id for m in graph_messages if isinstance(m, HumanMessage)}
+    # UI에는 최근 한 페이지만 있으므로 비교는 DB의 id로 한다
+    ui_human_ids = load_user_message_ids(session_id)
+    # 전화번호 입력처럼 graph로 보내지 않는 메시지가 있으므로 graph 쪽이 기록의 부분집합이면 정상
+    if graph_human_ids <= ui_human_ids and (graph_human_ids or not ui_human_ids):
+        return False
+
+    if graph_messages:
+        graph.update_state(
+            config,
+            {"messages": [RemoveMessage(id=m.id) for m in graph_messages]},
+            as_node=SEED_AS_NODE,
+        )
+    if history := load_history(session_id):
+        graph.update_state(config, {"messages": history}, as_node=SEED_AS_NODE)
+    return True
+
+
 def init_session_state():
     if "selected_session_id" not in st.session_state:
         st.session_state["selected_session_id"] = None
     if "messages" not in st.session_state:
         st.session_state["messages"] = []
+        st.session_state["history_cursor"] = None
+        st.session_state["history_window"] = HISTORY_PAGE_SIZE
     if "config" not in st.session_state:
         thread_id = str(uuid.uuid4())
         st.session_state.config = {
@@ -0,0 +1,438 @@
+import asyncio
+import random
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+
+CHECKPOINT_DB_PATH = "checkpoints.db"
+
+# thread(+namespace)마다 남겨둘 최근 checkpoint 수
+RETAIN_CHECKPOINTS_PER_THREAD = 5
+# 이 크기(byte)보다 큰 직렬화 결과는 zlib으로 압축해서 저장
+COMPRESS_MIN_BYTES = 1024
+# 백그라운드 compaction 주기(초)
+COMPACTION_INTERVAL_SECONDS = 600
+
+_INTERRUPT = "__interrupt__"
+_TASKS = "__pregel_tasks"
+_ZLIB_SUFFIX = "+zlib"
+
+
+class SqliteCheckpointer(BaseCheckpointSaver):
+    """SQLite(WAL)에 checkpoint를 저장하는 checkpointer.
+
+    MemorySaver와 달리 재시작해도 thread를 이어갈 수 있고(승인 대기 중인 interrupt 포함),
+    thread마다 최근 RETAIN_CHECKPOINTS_PER_THREAD 개와 승인 대기 중인 interrupt checkpoint만 남긴다.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB_PATH,
+        *,
+        retain: int = RETAIN_CHECKPOINTS_PER_THREAD,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.retain = retain
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._setup()
+
+    def _setup(self):
+        with self.lock:
+            # auto_vacuum은 테이블을 만들기 전에 설정해야 적용된다
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    type TEXT,
+                    checkpoint BLOB,
+                    metadata_type TEXT,
+                    metadata BLOB,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                );
+                CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    type TEXT,
+                    value BLOB,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                );
+                """
+            )
+            self.conn.commit()
+
+    @contextmanager
+    def _cursor(self):
+        with self.lock:
+            cur = self.conn.cursor()
+            try:
+                yield cur
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    # 직렬화: serde(msgpack) 결과가 크면 zlib으로 압축한다
+    def _dumps(self, value: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return type_ + _ZLIB_SUFFIX, zlib.compress(data)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(_ZLIB_SUFFIX):
+            type_, data = type_[: -len(_ZLIB_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._cursor() as cur:
+            if checkpoint_id := get_checkpoint_id(config):
+                cur.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+            else:
+                cur.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(cur, thread_id, checkpoint_ns, *row)
+
+    def _to_tuple(
+        self,
+        cur: sqlite3.Cursor,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        parent_checkpoint_id: Optional[str],
+        type_: str,
+        checkpoint: bytes,
+        metadata_type: str,
+        metadata: bytes,
+    ) -> CheckpointTuple:
+        cur.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        pending_writes = [
+            (task_id, channel, self._loads(value_type, value))
+            for task_id, channel, value_type, value in cur.fetchall()
+        ]
+        loaded_checkpoint = self._loads(type_, checkpoint)
+        if parent_checkpoint_id:
+            # 부모 checkpoint에 기록된 Send는 pending_sends로 복원한다
+            cur.execute(
+                "SELECT type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND checkpoint_id = ? AND channel = ? ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, _TASKS),
+            )
+            sends = [self._loads(value_type, value) for value_type, value in cur.fetchall()]
+            if sends:
+                loaded_checkpoint = {**loaded_checkpoint, "pending_sends": sends}
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=loaded_checkpoint,
+            metadata=self._loads(metadata_type, metadata),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=pending_writes,
+        )
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        conditions, params = [], []
+        if config is not None:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        results = []
+        with self._cursor() as cur:
+            rows = cur.execute(query, params).fetchall()
+            for thread_id, checkpoint_ns, *row in rows:
+                checkpoint_tuple = self._to_tuple(cur, thread_id, checkpoint_ns, *row)
+                # metadata는 직렬화되어 있으므로 filter는 읽은 뒤 적용한다
+                if filter and any(
+                    checkpoint_tuple.metadata.get(key) != value
+                    for key, value in filter.items()
+                ):
+                    continue
+                results.append(checkpoint_tuple)
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized_checkpoint = self._dumps(checkpoint)
+        metadata_type, serialized_metadata = self._dumps(metadata)
+        with self._cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    serialized_checkpoint,
+                    metadata_type,
+                    serialized_metadata,
+                ),
+            )
+            self._prune(cur, thread_id, checkpoint_ns)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # 특수 채널(error, interrupt 등)은 덮어쓰고, 일반 write는 처음 값만 남긴다
+        query = (
+            "INSERT OR REPLACE INTO writes "
+            if all(channel in WRITES_IDX_MAP for channel, _ in writes)
+            else "INSERT OR IGNORE INTO writes "
+        ) + (
+            "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        configurable = config["configurable"]
+        with self._cursor() as cur:
+            cur.executemany(
+                query,
+                [
+                    (
+                        configurable["thread_id"],
+                        configurable.get("checkpoint_ns", ""),
+                        configurable["checkpoint_id"],
+                        task_id,
+                        WRITES_IDX_MAP.get(channel, idx),
+                        channel,
+                        *self._dumps(value),
+                    )
+                    for idx, (channel, value) in enumerate(writes)
+                ],
+            )
+
+    def get_next_version(self, current: Optional[str], channel) -> str:
+        # MemorySaver와 같은 형식 (정렬 가능한 문자열 버전)
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def _prune(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str):
+        """최근 retain 개와 아직 재개되지 않은 interrupt checkpoint만 남기고 나머지는 writes와 함께 지운다.
+
+        interrupt가 걸린 checkpoint는 뒤에 새 checkpoint가 없을 때(= 승인 대기 중)만 지킨다.
+        재개되어 뒤에 checkpoint가 생긴 interrupt는 일반 checkpoint처럼 retention 대상이다.
+        """
+        stale = """
+            SELECT checkpoint_id FROM checkpoints
+            WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns
+              AND checkpoint_id NOT IN (
+                SELECT checkpoint_id FROM checkpoints
+                WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns
+                ORDER BY checkpoint_id DESC LIMIT :retain
+              )
+              AND NOT (
+                checkpoint_id = (
+                  SELECT MAX(checkpoint_id) FROM checkpoints
+                  WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns
+                )
+                AND checkpoint_id IN (
+                  SELECT checkpoint_id FROM writes
+                  WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns
+                    AND channel = :interrupt
+                )
+              )
+        """
+        params = {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "retain": self.retain,
+            "interrupt": _INTERRUPT,
+        }
+        cur.execute(
+            f"DELETE FROM writes WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns "
+            f"AND checkpoint_id IN ({stale})",
+            params,
+        )
+        cur.execute(
+            f"DELETE FROM checkpoints WHERE thread_id = :thread_id AND checkpoint_ns = :checkpoint_ns "
+            f"AND checkpoint_id IN ({stale})",
+            params,
+        )
+
+    def compact(self):
+        """모든 thread에 retention을 다시 적용하고 빈 페이지와 WAL을 정리한다."""
+        with self._cursor() as cur:
+            threads = cur.execute(
+                "SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints"
+            ).fetchall()
+            for thread_id, checkpoint_ns in threads:
+                self._prune(cur, thread_id, checkpoint_ns)
+        with self.lock:
+            # incremental_vacuum은 한 step에 한 페이지만 비운다. execute()는 한 번만 step하므로
+            # 끝까지 실행하는 executescript로 freelist 전체를 정리한다
+            self.conn.executescript("PRAGMA incremental_vacuum;")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def start_compaction(self, interval: float = COMPACTION_INTERVAL_SECONDS):
+        """compact()를 주기적으로 실행하는 daemon thread를 띄운다. 이미 떠 있으면 무시한다."""
+        if self._compaction_thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                except sqlite3.Error as e:
+                    print(f"checkpoint compaction failed: {e}")
+
+        self._compaction_thread = threading.Thread(
+            target=run, name="checkpoint-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+    def close(self):
+        self._stop.set()
+        with self.lock:
+            self.conn.close()
+
+    # async graph(langgraph dev 등)에서도 쓸 수 있도록 sync 구현을 executor에서 실행한다
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.get_tuple, config
+        )
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit)),
+        )
+        for checkpoint_tuple in results:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.put_writes, config, writes, task_id, task_path
+        )
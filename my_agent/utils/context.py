@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from typing import Optional
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+
+
+@dataclass(frozen=True)
+class ContextPolicy:
+    """node가 LLM에 넘길 대화 범위"""
+
+    max_turns: int  # 요약 없이 그대로 보낼 최근 턴 수(사용자 메시지 기준)
+    max_tool_chars: int  # 마지막 턴이 아닌 ToolMessage는 이 길이로 자른다
+    use_summary: bool  # 창 밖으로 밀려난 대화의 요약을 앞에 붙일지
+
+
+NODE_CONTEXT_POLICIES = {
+    # router는 최근 몇 턴만 보면 충분하고 툴 결과는 필요 없다
+    "router": ContextPolicy(max_turns=2, max_tool_chars=0, use_summary=False),
+    "reservation_assistant": ContextPolicy(
+        max_turns=6, max_tool_chars=500, use_summary=True
+    ),
+    "rag_assistant": ContextPolicy(max_turns=6, max_tool_chars=500, use_summary=True),
+}
+
+# 요약되지 않은 턴이 max_turns보다 이만큼 더 쌓이면 한 번에 요약한다
+SUMMARY_BATCH_TURNS = 4
+
+OMITTED_TOOL_OUTPUT = "(이전 툴 결과 생략)"
+
+
+def split_turns(messages: list) -> list[list]:
+    """사용자 메시지를 기준으로 대화를 턴 단위로 나눈다. 첫 사용자 메시지 앞의 메시지는 첫 턴에 붙는다."""
+    turns: list[list] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def unsummarized_turns(messages: list, summary_until: Optional[str]) -> list[list]:
+    """summary_until(마지막으로 요약된 message id) 이후의 턴들"""
+    if summary_until:
+        for index, message in enumerate(messages):
+            if message.id == summary_until:
+                messages = messages[index + 1 :]
+                break
+    return split_turns(messages)
+
+
+def _compress_tool_output(message: ToolMessage, max_chars: int) -> ToolMessage:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if len(content) <= max_chars:
+        return message
+    compressed = content[:max_chars] + " ... (생략)" if max_chars else OMITTED_TOOL_OUTPUT
+    # tool_call_id는 그대로 둬야 AIMessage의 tool call과 짝이 맞는다
+    return message.model_copy(update={"content": compressed, "artifact": None})
+
+
+def _format_for_summary(message) -> str:
+    if isinstance(message, ToolMessage):
+        message = _compress_tool_output(message, 200)
+    return f"{message.type}: {message.content}"
+
+
+def select_context(state: dict, policy: ContextPolicy) -> list:
+    """policy에 맞게 최근 턴만 남기고 오래된 툴 결과는 줄인 메시지 목록을 만든다."""
+    turns = unsummarized_turns(state["messages"], state.get("summary_until"))
+    if policy.use_summary:
+        # 아직 요약되지 않은 턴은 모두 보낸다 (summarize_if_overflow 덕분에 길이가 제한됨)
+        window = turns
+    else:
+        window = turns[-policy.max_turns :]
+
+    context = []
+    if policy.use_summary and state.get("summary"):
+        context.append(SystemMessage(content=f"이전 대화 요약: {state['summary']}"))
+    for index, turn in enumerate(window):
+        is_latest_turn = index == len(window) - 1
+        for message in turn:
+            if isinstance(message, ToolMessage) and not is_latest_turn:
+                message = _compress_tool_output(message, policy.max_tool_chars)
+            context.append(message)
+    return context
+
+
+def summarize_if_overflow(state: dict, policy: ContextPolicy, summarizer) -> dict:
+    """창 밖으로 밀려난 턴이 SUMMARY_BATCH_TURNS 이상 쌓였을 때만 요약을 갱신한다.
+
+    반환값은 state update (요약할 필요가 없으면 빈 dict)
+    """
+    turns = unsummarized_turns(state["messages"], state.get("summary_until"))
+    if len(turns) < policy.max_turns + SUMMARY_BATCH_TURNS:
+        return {}
+    overflow = [message for turn in turns[: -policy.max_turns] for message in turn]
+    conversation = "\n".join(_format_for_summary(message) for message in overflow)
+    summary = summarizer.invoke(
+        {"summary": state.get("summary") or "없음", "conversation": conversation}
+    )
+    return {"summary": summary, "summary_until": overflow[-1].id}
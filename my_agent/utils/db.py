@@ -1,12 +1,78 @@
+import atexit
+import queue
 import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
 from langchain_core.messages import HumanMessage, AIMessage
 
 DB_PATH = "chat_history.db"
 
+# 연결마다 한 번 적용하는 pragma
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",  # 16MB
+    "PRAGMA busy_timeout = 5000",
+)
+# sqlite3 모듈이 연결마다 캐싱할 prepared statement 수
+STATEMENT_CACHE_SIZE = 128
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
+# save_message write-behind: 이 개수가 모이거나 이 시간(초)이 지나면 한 트랜잭션으로 저장
+WRITE_BATCH_SIZE = 64
+WRITE_FLUSH_INTERVAL = 0.05
+# 저장에 실패한 batch를 다시 시도하는 횟수와 첫 대기 시간(초, 매번 두 배)
+WRITE_RETRIES = 3
+WRITE_RETRY_BACKOFF = 0.1
+# 재시도까지 실패한 메시지는 새 메시지가 없어도 이 간격(초)마다 다시 저장해 본다
+WRITE_RETRY_INTERVAL = 5.0
+# 사이드바 채팅방 목록 한 페이지의 크기와, 캐싱해 둘 페이지 수
+SESSION_PAGE_SIZE = 20
+SESSION_CACHE_SIZE = 64
+# 검색 결과 한 페이지의 크기와, 캐싱해 둘 (검색어, 페이지) 수
+SEARCH_PAGE_SIZE = 10
+SEARCH_CACHE_SIZE = 64
+# trigram 색인은 3글자 미만 검색어를 찾지 못한다
+FTS_MIN_TERM_LENGTH = 3
+# 채팅방을 열 때, "이전 메시지 더 보기"를 누를 때 불러오는 메시지 수
+HISTORY_PAGE_SIZE = 30
+
+_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """스레드마다 하나씩 재사용하는 연결. streamlit은 rerun마다 스레드가 달라질 수 있어 thread-local로 둔다."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(DB_PATH)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        connections[DB_PATH] = conn
+    return conn
+
+
+@contextmanager
+def transaction():
+    """성공하면 commit, 예외가 나면 rollback 하는 cursor"""
+    conn = get_connection()
     c = conn.cursor()
+    try:
+        yield c
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        c.close()
+
+
+def _create_tables(c: sqlite3.Cursor):
     # 채팅방(세션) 테이블
     c.execute(
         """
@@ -31,97 +97,509 @@ def init_db():
     )
     """
     )
-    conn.commit()
-    conn.close()
 
 
-def get_sessions():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id, name FROM chat_sessions ORDER BY id ASC")
-    sessions = c.fetchall()
-    conn.close()
-    return sessions
+def _add_message_uid(c: sqlite3.Cursor):
+    # UI와 graph가 같은 message id를 쓰도록 message_uid 컬럼 추가
+    columns = [row[1] for row in c.execute("PRAGMA table_info(messages)")]
+    if "message_uid" not in columns:
+        c.execute("ALTER TABLE messages ADD COLUMN message_uid TEXT")
+
+
+def _index_messages_by_session(c: sqlite3.Cursor):
+    # load_history, delete_session이 테이블 전체를 훑지 않도록
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)"
+    )
+
+
+def _create_message_search_index(c: sqlite3.Cursor):
+    # 한국어는 공백 단위 토큰화가 맞지 않아 trigram(부분 문자열) 토크나이저를 쓴다 (SQLite 3.34+).
+    # 그보다 오래된 SQLite에서는 건너뛰고, 업그레이드 뒤 init_db가 다시 만든다
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return
+    # executescript는 열린 transaction을 commit해 버리므로, user_version 갱신과 한 transaction이 되도록 execute로 실행한다
+    for statement in (
+        """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        content, content='messages', content_rowid='id', tokenize='trigram'
+    )
+    """,
+        """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+        """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+        """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+        # 이미 있던 메시지도 색인하고, 이후 insert가 segment 병합 비용을 떠안지 않도록 합쳐 둔다
+        "INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')",
+        "INSERT INTO messages_fts (messages_fts) VALUES ('optimize')",
+    ):
+        c.execute(statement)
+
+
+def _track_session_recency(c: sqlite3.Cursor):
+    # 최근 대화 순으로 채팅방 목록을 정렬하기 위한 updated_at (메시지가 저장될 때 trigger로 갱신).
+    # 같은 초에 여러 채팅방이 갱신될 수 있어 밀리초까지 저장한다
+    columns = [row[1] for row in c.execute("PRAGMA table_info(chat_sessions)")]
+    if "updated_at" not in columns:
+        # ALTER TABLE로는 CURRENT_TIMESTAMP 기본값을 줄 수 없어 아래에서 채운다
+        c.execute("ALTER TABLE chat_sessions ADD COLUMN updated_at TIMESTAMP")
+    c.execute(
+        """
+    UPDATE chat_sessions
+    SET updated_at = COALESCE(
+        (SELECT MAX(created_at) FROM messages WHERE session_id = chat_sessions.id),
+        created_at
+    )
+    WHERE updated_at IS NULL
+    """
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sessions_recency ON chat_sessions (updated_at DESC, id DESC)"
+    )
+    c.execute(
+        """
+    CREATE TRIGGER IF NOT EXISTS sessions_touch_on_message AFTER INSERT ON messages BEGIN
+        UPDATE chat_sessions SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+        WHERE id = new.session_id;
+    END
+    """
+    )
+
+
+# PRAGMA user_version 기준으로 순서대로 적용되는 스키마 마이그레이션.
+# 이미 배포된 단계는 수정하지 말고 뒤에 추가한다. (user_version 도입 전 DB도 있으므로 각 단계는 멱등이어야 한다)
+MIGRATIONS = (
+    _create_tables,
+    _add_message_uid,
+    _index_messages_by_session,
+    _create_message_search_index,
+    _track_session_recency,
+)
+
+
+def _has_search_index(c: sqlite3.Cursor | sqlite3.Connection | None = None) -> bool:
+    c = c or get_connection()
+    row = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+    ).fetchone()
+    return row is not None
+
+
+def init_db():
+    with transaction() as c:
+        # DDL도 이 transaction 안에서 실행되도록 명시적으로 시작한다 (sqlite3 모듈은 DML 앞에서만 BEGIN한다)
+        c.execute("BEGIN")
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS[version:]:
+            migration(c)
+        if version < len(MIGRATIONS):
+            # PRAGMA는 parameter binding을 지원하지 않는다
+            c.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        # 오래된 SQLite에서 건너뛴 검색 색인은 SQLite가 업그레이드되면 만든다
+        if not _has_search_index(c):
+            _create_message_search_index(c)
+
+
+# 채팅방 목록이 바뀔 때마다(생성, 이름 변경, 삭제, 새 메시지) 올리는 값. 목록과 검색 결과 캐시의 key로 쓴다
+_sessions_generation = 0
+_sessions_generation_lock = threading.Lock()
+
+
+def _invalidate_sessions():
+    global _sessions_generation
+    with _sessions_generation_lock:
+        _sessions_generation += 1
+
+
+@lru_cache(maxsize=SESSION_CACHE_SIZE)
+def _sessions_page(db_path: str, generation: int, cursor: tuple | None, limit: int):
+    if cursor is None:
+        c = get_connection().execute(
+            "SELECT id, name, updated_at FROM chat_sessions "
+            "ORDER BY updated_at DESC, id DESC LIMIT ?",
+            (limit + 1,),
+        )
+    else:
+        c = get_connection().execute(
+            "SELECT id, name, updated_at FROM chat_sessions WHERE (updated_at, id) < (?, ?) "
+            "ORDER BY updated_at DESC, id DESC LIMIT ?",
+            (*cursor, limit + 1),
+        )
+    rows = c.fetchall()
+    next_cursor = (rows[limit - 1][2], rows[limit - 1][0]) if len(rows) > limit else None
+    return tuple((session_id, name) for session_id, name, _ in rows[:limit]), next_cursor
+
+
+@lru_cache(maxsize=SESSION_CACHE_SIZE)
+def _session_count(db_path: str, generation: int) -> int:
+    return get_connection().execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+
+
+def get_sessions_page(cursor: tuple | None = None, limit: int = SESSION_PAGE_SIZE):
+    """최근 대화 순 채팅방 목록 한 페이지 (keyset pagination, 목록이 바뀌기 전까지 캐싱).
+
+    반환값은 ((id, name), ...)와 다음 페이지 cursor. 마지막 페이지면 cursor는 None.
+    """
+    return _sessions_page(DB_PATH, _sessions_generation, cursor, limit)
+
+
+def count_sessions() -> int:
+    return _session_count(DB_PATH, _sessions_generation)
 
 
 def get_phone_number(session_id: int) -> str:
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT phone_number FROM chat_sessions WHERE id = ?", (session_id,))
+    c = get_connection().execute(
+        "SELECT phone_number FROM chat_sessions WHERE id = ?", (session_id,)
+    )
     phone_number = c.fetchone()[0]
     print(f"Phone number: {phone_number}")
-    conn.close()
     return phone_number
 
 
 def create_session(name: str) -> int:
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT INTO chat_sessions (name, phone_number) VALUES (?, '')", (name,))
-    conn.commit()
-    session_id = c.lastrowid
-    conn.close()
+    with transaction() as c:
+        c.execute(
+            "INSERT INTO chat_sessions (name, phone_number, updated_at) "
+            "VALUES (?, '', strftime('%Y-%m-%d %H:%M:%f', 'now'))",
+            (name,),
+        )
+        session_id = c.lastrowid
+    _invalidate_sessions()
     if not session_id:
         raise Exception("Failed to create a new session")
     return session_id
 
 
+class MessageWriter:
+    """save_message를 모아서 저장하는 write-behind 큐.
+
+    writer 스레드 하나가 FIFO로 처리하므로 세션별 저장 순서가 보장된다.
+    아직 저장되지 않은 메시지는 pending에 남아 load_history에서 함께 읽힌다.
+    저장이 WRITE_RETRIES번 실패한 메시지는 버리지 않고 retry_interval마다(또는 다음 batch와 함께) 다시 저장하며,
+    그동안 flush()는 오류를 낸다.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = WRITE_BATCH_SIZE,
+        interval: float = WRITE_FLUSH_INTERVAL,
+        retry_interval: float = WRITE_RETRY_INTERVAL,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.queue: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        # 저장 중에는 discard()가 기다리도록 저장 한 번을 감싼다
+        self.save_lock = threading.Lock()
+        self.pending: dict[int, list[tuple[str, str, str]]] = {}
+        # 재시도까지 실패해서 다음 batch에 다시 넣을 행과 마지막 오류
+        self.failed: list[tuple] = []
+        self.error: Exception | None = None
+        self.thread: threading.Thread | None = None
+
+    def put(self, session_id: int, role: str, content: str, message_uid: str):
+        row = (session_id, role, content, message_uid)
+        with self.lock:
+            self.pending.setdefault(session_id, []).append(row[1:])
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._run, name="chat-history-writer", daemon=True
+                )
+                self.thread.start()
+        self.queue.put(row)
+
+    def pending_messages(self, session_id: int) -> list[tuple[str, str, str]]:
+        with self.lock:
+            return list(self.pending.get(session_id, ()))
+
+    def flush(self):
+        """큐에 들어간 메시지가 모두 처리될 때까지 기다린다. 저장하지 못한 메시지가 있으면 오류를 낸다."""
+        self.queue.join()
+        with self.lock:
+            if self.failed:
+                raise RuntimeError(
+                    f"{len(self.failed)} chat messages are not saved yet"
+                ) from self.error
+
+    @contextmanager
+    def discard(self, session_id: int):
+        """세션의 대기 중인 메시지를 버리고, with 블록이 끝날 때까지 저장을 멈춘다 (채팅방 삭제용).
+
+        다른 세션의 저장 실패와는 상관없이 동작한다.
+        """
+        self.queue.join()
+        with self.save_lock:
+            with self.lock:
+                self.failed = [row for row in self.failed if row[0] != session_id]
+                self.pending.pop(session_id, None)
+            yield
+
+    def close(self):
+        """종료 전에 남은 메시지를 저장한다. 끝내 저장하지 못하면 오류 대신 로그를 남긴다."""
+        self.queue.join()
+        with self.save_lock:
+            with self.lock:
+                rows = self.failed
+            if not rows:
+                return
+            try:
+                self._save(rows)
+            except Exception as e:
+                print(f"Dropping {len(rows)} unsaved chat messages at exit: {e!r}")
+            else:
+                self._mark_saved(rows)
+                with self.lock:
+                    self.failed = []
+
+    def _run(self):
+        while True:
+            with self.lock:
+                # 저장하지 못한 메시지가 있으면 새 메시지를 기다리지 않고 retry_interval 뒤에 다시 시도한다
+                timeout = self.retry_interval if self.failed else None
+            try:
+                batch = [self.queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            deadline = time.monotonic() + self.interval
+            while batch and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with self.save_lock:
+                    with self.lock:
+                        rows, self.failed = self.failed + batch, []
+                    if not rows:
+                        continue
+                    try:
+                        self._save(rows)
+                    except Exception as e:
+                        # 어떤 오류에도 스레드가 죽지 않도록 한다 (죽으면 flush()가 영원히 기다린다)
+                        print(f"Failed to save {len(rows)} messages, will retry: {e!r}")
+                        with self.lock:
+                            self.failed, self.error = rows, e
+                    else:
+                        self._mark_saved(rows)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _save(self, rows: list[tuple]):
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                with transaction() as c:
+                    c.executemany(
+                        "INSERT INTO messages (session_id, role, content, message_uid) VALUES (?,?,?,?)",
+                        rows,
+                    )
+            except sqlite3.OperationalError:
+                # database is locked 등 일시적인 오류만 잠시 뒤 다시 시도한다
+                if attempt == WRITE_RETRIES:
+                    raise
+                time.sleep(WRITE_RETRY_BACKOFF * 2**attempt)
+            else:
+                # 새 메시지로 채팅방의 최근 대화 순서가 바뀐다
+                _invalidate_sessions()
+                with self.lock:
+                    self.error = None
+                return
+
+    def _mark_saved(self, batch: list[tuple]):
+        with self.lock:
+            for session_id, *row in batch:
+                rows = self.pending.get(session_id)
+                if rows:
+                    rows.remove(tuple(row))
+                    if not rows:
+                        del self.pending[session_id]
+
+
+message_writer = MessageWriter()
+# 종료 전에 남은 메시지를 저장한다
+atexit.register(message_writer.close)
+
+
+def _to_message(row_id: int | None, role: str, content: str, message_uid: str | None):
+    # message_uid가 없는 예전 메시지는 row id로 고정된 id를 만든다
+    message_id = message_uid or f"db-{row_id}"
+    if role == "user":
+        return HumanMessage(content=content, id=message_id)
+    return AIMessage(content=content, id=message_id)
+
+
+def _with_pending(pending: list, rows: list) -> list:
+    # 아직 writer가 저장하지 않은 메시지도 포함한다 (read-your-writes).
+    # pending은 SELECT 전에 읽어 둔 것이라, 그 사이 저장된 메시지는 rows에도 있으므로 uid로 거른다
+    saved_uids = {row[3] for row in rows}
+    return rows + [
+        (None, role, content, message_uid)
+        for role, content, message_uid in pending
+        if message_uid not in saved_uids
+    ]
+
+
 def load_history(session_id: int):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id ASC",
+    # SELECT 뒤에 pending을 읽으면 그 사이 저장된 batch가 양쪽 모두에서 빠지므로 먼저 읽는다
+    pending = message_writer.pending_messages(session_id)
+    c = get_connection().execute(
+        "SELECT id, role, content, message_uid FROM messages WHERE session_id = ? ORDER BY id ASC",
         (session_id,),
     )
-    rows = c.fetchall()
-    conn.close()
+    return [_to_message(*row) for row in _with_pending(pending, c.fetchall())]
 
-    messages = []
-    for role, content in rows:
-        if role == "user":
-            messages.append(HumanMessage(content=content))
-        else:
-            messages.append(AIMessage(content=content))
-    return messages
 
+def load_history_page(
+    session_id: int, before_id: int | None = None, limit: int = HISTORY_PAGE_SIZE
+):
+    """before_id보다 오래된 메시지 중 최신 limit개를 오래된 순으로 가져온다 (keyset pagination).
 
-def save_message(session_id: int, role: str, content: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO messages (session_id, role, content) VALUES (?,?,?)",
-        (session_id, role, content),
+    반환값은 (messages, 다음 페이지를 가져올 before_id). 더 오래된 메시지가 없으면 before_id는 None.
+    """
+    if before_id is None:
+        pending = message_writer.pending_messages(session_id)
+        c = get_connection().execute(
+            "SELECT id, role, content, message_uid FROM messages WHERE session_id = ? "
+            "ORDER BY id DESC LIMIT ?",
+            (session_id, limit + 1),
+        )
+    else:
+        c = get_connection().execute(
+            "SELECT id, role, content, message_uid FROM messages WHERE session_id = ? AND id < ? "
+            "ORDER BY id DESC LIMIT ?",
+            (session_id, before_id, limit + 1),
+        )
+    rows = c.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit][::-1]
+    next_before_id = rows[0][0] if has_more else None
+    if before_id is None:
+        rows = _with_pending(pending, rows)
+    return [_to_message(*row) for row in rows], next_before_id
+
+
+def load_user_message_ids(session_id: int) -> set[str]:
+    """세션의 사용자 메시지 id. 메시지 객체를 만들지 않고 graph thread와 비교할 때 사용한다."""
+    pending = message_writer.pending_messages(session_id)
+    c = get_connection().execute(
+        "SELECT id, message_uid FROM messages WHERE session_id = ? AND role = 'user'",
+        (session_id,),
     )
-    conn.commit()
-    conn.close()
+    ids = {message_uid or f"db-{row_id}" for row_id, message_uid in c.fetchall()}
+    ids.update(message_uid for role, _, message_uid in pending if role == "user")
+    return ids
+
+
+def save_message(session_id: int, role: str, content: str, message_uid: str | None = None) -> str:
+    """메시지를 write-behind 큐에 넣고 message_uid를 바로 돌려준다."""
+    message_uid = message_uid or str(uuid.uuid4())
+    message_writer.put(session_id, role, content, message_uid)
+    return message_uid
 
 
 def update_phone_number(session_id: int, phone_number: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    # NOTE: f-strings로 쿼리를 작성하면 SQL Injection 공격을 당할 수 있다.
-    c.execute(
-        "UPDATE chat_sessions SET phone_number = ? WHERE id = ?",
-        (phone_number, session_id),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        # NOTE: f-strings로 쿼리를 작성하면 SQL Injection 공격을 당할 수 있다.
+        c.execute(
+            "UPDATE chat_sessions SET phone_number = ? WHERE id = ?",
+            (phone_number, session_id),
+        )
 
 
 def update_session_name(session_id: int, name: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("UPDATE chat_sessions SET name = ? WHERE id = ?", (name, session_id))
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        c.execute("UPDATE chat_sessions SET name = ? WHERE id = ?", (name, session_id))
+    _invalidate_sessions()
 
 
 def delete_session(session_id: int):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    # 해당 세션의 메시지 먼저 삭제
-    c.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
-    # 세션 삭제
-    c.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
-    conn.commit()
-    conn.close()
+    # 대기 중이던 이 세션의 메시지가 삭제 뒤에 저장되지 않도록 버리고, 지우는 동안 writer를 멈춘다
+    with message_writer.discard(session_id), transaction() as c:
+        # 해당 세션의 메시지 먼저 삭제
+        c.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        # 세션 삭제
+        c.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+    _invalidate_sessions()
+
+
+
+
+def search_messages(query: str, limit: int = SEARCH_PAGE_SIZE, offset: int = 0) -> list[dict]:
+    """채팅 기록 전문 검색. 관련도 순으로 limit개씩 돌려준다.
+
+    모든 검색어가 3글자 이상이면 FTS5(trigram) 색인을 쓰고,
+    짧은 검색어가 섞여 있으면 LIKE로 찾아 최신 순으로 돌려준다.
+    Streamlit은 rerun마다 검색창을 다시 그리므로, 새 메시지가 저장되기 전까지 결과를 캐싱한다.
+    (2글자 검색어의 LIKE는 전체 테이블을 읽는다)
+    """
+    if not query.split():
+        return []
+    return [
+        dict(result)
+        for result in _search_page(DB_PATH, _sessions_generation, query, limit, offset)
+    ]
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _search_page(db_path: str, generation: int, query: str, limit: int, offset: int) -> tuple:
+    terms = query.split()
+    if _has_search_index() and all(len(term) >= FTS_MIN_TERM_LENGTH for term in terms):
+        # 각 검색어를 phrase로 감싸서 FTS5 문법 문자를 그대로 검색한다 (AND 조건)
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        c = get_connection().execute(
+            """
+            SELECT m.session_id, s.name, m.id, m.role,
+                   snippet(messages_fts, 0, '**', '**', '…', 12), m.created_at
+            FROM messages_fts
+            JOIN messages m ON m.id = messages_fts.rowid
+            JOIN chat_sessions s ON s.id = m.session_id
+            WHERE messages_fts MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+            """,
+            (match, limit, offset),
+        )
+    else:
+        conditions = " AND ".join("m.content LIKE ? ESCAPE '\\'" for _ in terms)
+        patterns = [
+            "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            for term in terms
+        ]
+        c = get_connection().execute(
+            f"""
+            SELECT m.session_id, s.name, m.id, m.role, m.content, m.created_at
+            FROM messages m
+            JOIN chat_sessions s ON s.id = m.session_id
+            WHERE {conditions}
+            ORDER BY m.id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (*patterns, limit, offset),
+        )
+    return tuple(
+        {
+            "session_id": session_id,
+            "session_name": session_name,
+            "message_id": message_id,
+            "role": role,
+            "snippet": snippet,
+            "created_at": created_at,
+        }
+        for session_id, session_name, message_id, role, snippet, created_at in c.fetchall()
+    )
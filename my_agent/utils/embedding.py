@@ -1,10 +1,21 @@
-import os
-from langchain_upstage import UpstageEmbeddings
-from dotenv import load_dotenv
-
-load_dotenv()
-UPSTAGE_API_KEY = os.getenv("UPSTAGE_API_KEY")
-embedding = UpstageEmbeddings(
-    api_key=UPSTAGE_API_KEY,
-    model="embedding-query"
-)
+from typing import TYPE_CHECKING
+from my_agent.utils.registry import registry
+from my_agent.utils.settings import get_settings
+
+if TYPE_CHECKING:
+    from langchain_upstage import UpstageEmbeddings
+
+
+def get_embedding() -> "UpstageEmbeddings":
+    """UPSTAGE 임베딩 client. 처음 호출될 때 만든다."""
+
+    def build(api_key: str, model: str) -> "UpstageEmbeddings":
+        from langchain_upstage import UpstageEmbeddings
+
+        return UpstageEmbeddings(api_key=api_key, model=model)
+
+    settings = get_settings()
+    settings.require("upstage_api_key")
+    return registry.get(
+        "embedding", build, settings.upstage_api_key, settings.upstage_embedding_model
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from my_agent.utils.registry import get_chat_model
 
 # Data model
 class GradeDocuments(BaseModel):
@@ -11,7 +11,7 @@ class GradeDocuments(BaseModel):
     )
 
 # LLM with function call
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
+llm = get_chat_model("gpt-4o", temperature=0)
 structured_llm_grader = llm.with_structured_output(schema=GradeDocuments)
 
 # Prompt
@@ -0,0 +1,175 @@
+"""Pinecone 없이 쓰는 로컬 품종 벡터 DB.
+
+임베딩은 정규화한 float32 행렬 파일(embeddings.f32)로 저장하고 np.memmap으로 열어서,
+질의마다 전체 행과 내적(cosine similarity)을 구해 top-k를 고른다. 133개 품종은 물론 수천 행까지 충분히 빠르다.
+
+스냅샷 만들기 (csv/breeds.csv를 한 번 임베딩, UPSTAGE_API_KEY 필요):
+    python -m my_agent.utils.local_vector_store [--csv csv/breeds.csv] [--out breeds_index]
+"""
+
+import argparse
+import csv
+import json
+import os
+from typing import Any, Iterable, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from my_agent.utils.breed_index import BREEDS_CSV_PATH
+
+LOCAL_BREEDS_INDEX_PATH = "breeds_index"
+EMBEDDINGS_FILE = "embeddings.f32"
+MANIFEST_FILE = "documents.json"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class LocalVectorStore(VectorStore):
+    """similarity_search / similarity_search_with_score를 PineconeVectorStore와 같은 형태로 제공한다.
+
+    점수는 cosine similarity (클수록 가깝다). 문서 추가는 메모리에서만 되고, save()로 스냅샷을 남긴다.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        vectors: np.ndarray,
+        documents: list[Document],
+    ):
+        if len(vectors) != len(documents):
+            raise ValueError(f"{len(vectors)} vectors for {len(documents)} documents")
+        self._embedding = embedding
+        # 정규화된 (문서 수, 차원) float32 행렬. load()로 열면 read-only memmap
+        self.vectors = vectors
+        self.documents = documents
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_texts(
+        self, texts: Iterable[str], metadatas: Optional[list[dict]] = None, **kwargs: Any
+    ) -> list[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = _normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+        start = len(self.documents)
+        self.vectors = np.concatenate([np.asarray(self.vectors), vectors]) if start else vectors
+        self.documents += [
+            Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)
+        ]
+        return [str(i) for i in range(start, len(self.documents))]
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: Optional[list[dict]] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding, np.empty((0, 0), dtype=np.float32), [])
+        store.add_texts(texts, metadatas)
+        return store
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4
+    ) -> list[tuple[Document, float]]:
+        if not self.documents:
+            return []
+        query = _normalize(np.asarray([embedding], dtype=np.float32))[0]
+        if query.shape[0] != self.vectors.shape[1]:
+            raise ValueError(
+                f"query dimension {query.shape[0]} != index dimension {self.vectors.shape[1]}"
+            )
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        # 전체 정렬 대신 top-k만 골라서 정렬한다
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.documents[i], float(scores[i])) for i in top]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # cosine similarity [-1, 1] -> [0, 1] (float32 오차로 1을 살짝 넘는 값은 자른다)
+        return lambda score: min(1.0, max(0.0, (score + 1) / 2))
+
+    def save(self, path: str):
+        """임베딩 행렬과 문서 목록을 path 디렉터리에 스냅샷으로 남긴다."""
+        os.makedirs(path, exist_ok=True)
+        vectors = np.ascontiguousarray(self.vectors, dtype=np.float32)
+        vectors.tofile(os.path.join(path, EMBEDDINGS_FILE))
+        with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "shape": list(vectors.shape),
+                    "documents": [
+                        {"page_content": doc.page_content, "metadata": doc.metadata}
+                        for doc in self.documents
+                    ],
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, path: str, embedding: Embeddings) -> "LocalVectorStore":
+        """save()로 남긴 스냅샷을 연다. 임베딩 행렬은 복사하지 않고 memmap으로 읽는다."""
+        if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            raise FileNotFoundError(
+                f"No vector store snapshot at {path}. "
+                "Build it with: python -m my_agent.utils.local_vector_store"
+            )
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        vectors = np.memmap(
+            os.path.join(path, EMBEDDINGS_FILE),
+            dtype=np.float32,
+            mode="r",
+            shape=tuple(manifest["shape"]),
+        )
+        documents = [Document(**document) for document in manifest["documents"]]
+        return cls(embedding, vectors, documents)
+
+
+def breed_documents(path: str = BREEDS_CSV_PATH) -> tuple[list[str], list[dict]]:
+    """breeds.csv의 행을 Pinecone 문서와 같은 "name: X\\ntype: Y" 형태로 만든다. (parse_breed_document가 읽는 형식)"""
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    texts = [f"name: {row['name']}\ntype: {row['type']}" for row in rows]
+    metadatas = [{"id": int(row["id"]), "name": row["name"], "type": row["type"]} for row in rows]
+    return texts, metadatas
+
+
+def build_breeds_index(out: str = LOCAL_BREEDS_INDEX_PATH, csv_path: str = BREEDS_CSV_PATH):
+    from my_agent.utils.embedding import get_embedding
+
+    texts, metadatas = breed_documents(csv_path)
+    store = LocalVectorStore.from_texts(texts, get_embedding(), metadatas)
+    store.save(out)
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="csv/breeds.csv를 임베딩해서 로컬 벡터 DB 스냅샷을 만든다")
+    parser.add_argument("--csv", default=BREEDS_CSV_PATH)
+    parser.add_argument("--out", default=LOCAL_BREEDS_INDEX_PATH)
+    args = parser.parse_args()
+    store = build_breeds_index(args.out, args.csv)
+    print(f"saved {store.vectors.shape[0]} x {store.vectors.shape[1]} embeddings to {args.out}")
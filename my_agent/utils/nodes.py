@@ -1,9 +1,19 @@
+import json
 from typing import Literal
 from langchain_core.runnables import Runnable, RunnableConfig
-from langchain_openai import ChatOpenAI
-from my_agent.utils.state import ReservState
+from my_agent.utils.state import ReservState, merge_slots
 from my_agent.utils.tools.user import fetch_user_info
-from my_agent.utils.runnables import router_runnable
+from my_agent.utils.runnables import router_runnable, summary_runnable
+from my_agent.utils.context import (
+    NODE_CONTEXT_POLICIES,
+    select_context,
+    summarize_if_overflow,
+)
+from my_agent.utils.pre_router import (
+    pre_route,
+    log_routing_decision,
+    PRE_ROUTER_THRESHOLD,
+)
 from my_agent.utils.tools.reservation import primary_sensitive_tool_names
 from my_agent.utils.tools.rag import rag_sensitive_tool_names
 from .tools.rag import rag_runnable
@@ -23,8 +33,12 @@ class Assistant:
 
     def __call__(self, state: ReservState, config: RunnableConfig):
         print("\n ----- reservation assistant -----\n")
+        policy = NODE_CONTEXT_POLICIES["reservation_assistant"]
+        summary_update = summarize_if_overflow(state, policy, summary_runnable)
+        state = {**state, **summary_update}
+        messages = select_context(state, policy)
         while True:
-            result = self.runnable.invoke(state, config=config)
+            result = self.runnable.invoke({**state, "messages": messages}, config=config)
 
             if not result.tool_calls and (
                 not result.content
@@ -32,8 +46,7 @@ class Assistant:
                 # 설명 필요
                 and not result.content[0].get("text")
             ):
-                messages = state["messages"] + [("user", "Respond with a real output.")]
-                state = {**state, "messages": messages}
+                messages = messages + [("user", "Respond with a real output.")]
             else:
                 break
 
@@ -41,7 +54,7 @@ class Assistant:
         next_node = tools_condition({"messages": [result]})
         if next_node == END:
             # END로 갈 때 messages 업데이트 하는 방법 찾기
-            return Command(goto=END, update={"messages": result})
+            return Command(goto=END, update={**summary_update, "messages": result})
 
         first_tool_call = result.tool_calls[0]
         if first_tool_call["name"] in primary_sensitive_tool_names:
@@ -49,75 +62,130 @@ class Assistant:
             chk_action = human_chk["action"]
             if chk_action == "continue":
                 return Command(
-                    goto="primary_sensitive_tools", update={"messages": [result]}
+                    goto="primary_sensitive_tools",
+                    update={**summary_update, "messages": [result]},
                 )
             else:
                 return Command(
                     goto="reservation_assistant",
                     update={
+                        **summary_update,
                         "messages": [
                             result,
                             ToolMessage(
                                 tool_call_id=result.tool_calls[0]["id"],
                                 content=f"API call denied by user. Reasoning: 'user abort tool'. Continue assisting, accounting for the user's input.",
                             ),
-                        ]
+                        ],
                     },
                 )
         else:
-            return Command(goto="primary_safe_tools", update={"messages": [result]})
+            return Command(
+                goto="primary_safe_tools",
+                update={**summary_update, "messages": [result]},
+            )
+
+
+def collect_tool_slots(messages) -> dict:
+    """마지막 AIMessage 이후 실행된 툴들이 artifact로 넘긴 slot 업데이트를 모은다."""
+    artifacts = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        if isinstance(message.artifact, dict) and message.artifact.get("slots"):
+            artifacts.append(message.artifact["slots"])
+    slot_update = {}
+    for artifact in reversed(artifacts):
+        slot_update = merge_slots(slot_update, artifact)
+    return slot_update
+
+
+def format_slots(slots: dict) -> str:
+    confirmed = {key: value for key, value in slots.items() if value}
+    if not confirmed:
+        return "없음"
+    return json.dumps(confirmed, ensure_ascii=False)
 
 
 def rag_assistant(state: ReservState):
     print("\n ----- rag assistant -----")
-    result = rag_runnable.invoke(state["messages"])
+    policy = NODE_CONTEXT_POLICIES["rag_assistant"]
+    slot_update = collect_tool_slots(state["messages"])
+    slots = merge_slots(state.get("slots"), slot_update)
+    update = {**summarize_if_overflow(state, policy, summary_runnable), "slots": slot_update}
+    result = rag_runnable.invoke(
+        {
+            "messages": select_context({**state, **update}, policy),
+            "slots": format_slots(slots),
+        }
+    )
     next_node = tools_condition({"messages": [result]})
     if next_node == END:
         # END로 갈 때 messages 업데이트 하는 방법 찾기
         print("----- goto END -----\n")
-        return Command(goto=END, update={"messages": result})
+        return Command(goto=END, update={**update, "messages": result})
     first_tool_call = result.tool_calls[0]
     if first_tool_call["name"] in rag_sensitive_tool_names:
         human_chk = interrupt({})
         chk_action = human_chk["action"]
         if chk_action == "continue":
             print("----- goto rag_sensitive_tools -----\n")
-            return Command(goto="rag_sensitive_tools", update={"messages": [result]})
+            return Command(
+                goto="rag_sensitive_tools", update={**update, "messages": [result]}
+            )
         else:
             print("----- goto rag_assistant -----\n")
             return Command(
                 goto="rag_assistant",
                 update={
+                    **update,
                     "messages": [
                         result,
                         ToolMessage(
                             tool_call_id=result.tool_calls[0]["id"],
                             content=f"API call denied by user. Reasoning: 'user abort tool'. Continue assisting, accounting for the user's input.",
                         ),
-                    ]
+                    ],
                 },
             )
     else:
         print("----- goto rag_safe_tools -----\n")
-        return Command(goto="rag_safe_tools", update={"messages": [result]})
+        return Command(goto="rag_safe_tools", update={**update, "messages": [result]})
 
 
 def route_question_adaptive(state: ReservState):
 
     latest_message = state["messages"]
-    try:
-        result = router_runnable.invoke({"messages": latest_message})
-
-        datasource = result.tool
+    # 규칙/대화 흐름/n-gram 모델로 확신할 수 있으면 LLM router를 호출하지 않는다
+    decision = pre_route(latest_message, state.get("active_assistant"), state.get("slots"))
+    if decision is not None and decision.confidence >= PRE_ROUTER_THRESHOLD:
+        print(f"----- pre-routed ({decision.source}): {decision.route} -----")
+        datasource = decision.route
+    else:
+        try:
+            # router는 최근 몇 턴만 본다
+            result = router_runnable.invoke(
+                {
+                    "messages": select_context(
+                        state, NODE_CONTEXT_POLICIES["router"]
+                    )
+                }
+            )
 
-        if datasource == "reservation_assistant":
-            return Command(goto="reservation_assistant")
-        elif datasource == "rag_assistant":
-            return Command(goto="rag_assistant")
-        else:
-            return Command(goto="terminate_irrelevant")
-    except Exception as e:
-        return Command(goto="terminate_irrelevant")
+            datasource = result.tool
+            log_routing_decision(latest_message[-1].content, datasource)
+        except Exception as e:
+            return Command(goto="terminate_irrelevant", update={"active_assistant": None})
+
+    if datasource == "reservation_assistant":
+        return Command(
+            goto="reservation_assistant",
+            update={"active_assistant": "reservation_assistant"},
+        )
+    elif datasource == "rag_assistant":
+        return Command(goto="rag_assistant", update={"active_assistant": "rag_assistant"})
+    else:
+        return Command(goto="terminate_irrelevant", update={"active_assistant": None})
 
 
 def terminate_irrelevant_chat(state: ReservState):
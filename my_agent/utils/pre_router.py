@@ -0,0 +1,239 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from langchain_core.messages import AIMessage, HumanMessage
+from my_agent.utils.breed_index import breed_index, normalize_breed_name
+from my_agent.utils.settings import get_settings
+
+ROUTES = ("reservation_assistant", "rag_assistant", "terminate")
+
+# 이 확신도 이상이면 LLM router를 건너뛴다
+PRE_ROUTER_THRESHOLD = 0.8
+
+# 로그에 남기기 전에 가리는 개인정보 (전화번호, 이메일)
+_PHONE = re.compile(r"\+?\d[\d\s-]{7,}\d")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+# 로그가 이만큼 쌓이기 전에는 n-gram 모델을 쓰지 않는다
+MIN_TRAINING_EXAMPLES = 50
+# route마다 이만큼의 예시가 없으면 쓰지 않는다 (terminate 예시가 없으면 잡담도 둘 중 하나로 확신한다)
+MIN_ROUTE_EXAMPLES = 10
+# 문장의 2~3글자 n-gram 중 학습 때 본 비율이 이보다 작으면 모르는 문장으로 보고 LLM router에 맡긴다
+MIN_KNOWN_GRAM_RATIO = 0.5
+# 1, 2위 route의 n-gram당 평균 log 확률 차이가 이보다 작으면 판단하지 않는다
+MIN_ROUTE_MARGIN = 0.1
+
+# 예약 조회/변경/취소
+RESERVATION_PATTERNS = [
+    r"취소",
+    r"변경",
+    r"수정",
+    r"바꾸|바꿔|바꿀",
+    r"미루|미뤄|당기|당겨",
+    r"(내|제)\s*예약",
+    r"예약\s*(확인|조회|내역|목록|현황|보여)",
+]
+# 가격 문의, 서비스 안내, 새 예약
+RAG_PATTERNS = [
+    r"가격|얼마|비용|요금|견적",
+    r"서비스|메뉴",
+    r"미용|가위\s*컷|스포팅|클리핑|목욕",
+    r"\d+(\.\d+)?\s*(kg|키로|킬로)",
+    r"예약\s*(하고|할|해\s*주|잡|하려|원해)",
+    r"새\s*(로운)?\s*예약",
+]
+# 직전 질문에 대한 짧은 대답 ("네", "2번", "12월 20일 2시")
+SHORT_REPLY = re.compile(
+    r"^\s*(네|넵|예|응|웅|아니(요|오)?|좋아요|좋아|괜찮아요|그걸로|그렇게|진행|\d+\s*번|ok|yes|no)\b"
+    r"|^[\d\s월일시분:./-]+(오전|오후)?[\d\s월일시분:./-]*$",
+    re.IGNORECASE,
+)
+SHORT_REPLY_MAX_LENGTH = 20
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    confidence: float
+    source: str  # "sticky", "rules", "ngram"
+
+
+class NgramRouteModel:
+    """LLM router 로그로 학습하는 문자 n-gram 나이브 베이즈 분류기"""
+
+    def __init__(self, n_sizes=(1, 2, 3)):
+        self.n_sizes = n_sizes
+        self.route_counts: Counter = Counter()
+        self.gram_counts: dict[str, Counter] = {route: Counter() for route in ROUTES}
+        self.vocabulary: set[str] = set()
+
+    def _grams(self, text: str) -> list[str]:
+        compact = normalize_breed_name(text)
+        return [
+            compact[i : i + n]
+            for n in self.n_sizes
+            for i in range(len(compact) - n + 1)
+        ]
+
+    def add(self, text: str, route: str):
+        if route not in ROUTES:
+            return
+        grams = self._grams(text)
+        self.route_counts[route] += 1
+        self.gram_counts[route].update(grams)
+        self.vocabulary.update(grams)
+
+    @property
+    def size(self) -> int:
+        return sum(self.route_counts.values())
+
+    def predict(self, text: str) -> Optional[RouteDecision]:
+        """확신할 수 있을 때만 route를 돌려준다.
+
+        나이브 베이즈의 softmax 확신도는 n-gram 수만큼 곱해져서 처음 보는 문장에도 1에 가깝게 나온다.
+        그래서 학습량, 처음 보는 n-gram 비율, 1, 2위 차이로 먼저 거른다.
+        """
+        if self.size < MIN_TRAINING_EXAMPLES or any(
+            self.route_counts[route] < MIN_ROUTE_EXAMPLES for route in ROUTES
+        ):
+            return None
+        grams = self._grams(text)
+        multi_char = [gram for gram in grams if len(gram) > 1]
+        if not multi_char or (
+            sum(gram in self.vocabulary for gram in multi_char) / len(multi_char)
+            < MIN_KNOWN_GRAM_RATIO
+        ):
+            return None
+        vocabulary_size = len(self.vocabulary) + 1
+        log_probs = {}
+        for route in ROUTES:
+            total = sum(self.gram_counts[route].values())
+            log_prob = math.log(self.route_counts[route] / self.size)
+            for gram in grams:
+                log_prob += math.log(
+                    (self.gram_counts[route][gram] + 1) / (total + vocabulary_size)
+                )
+            log_probs[route] = log_prob
+        # softmax로 확신도 계산
+        best, runner_up = sorted(log_probs, key=log_probs.get, reverse=True)[:2]
+        if (log_probs[best] - log_probs[runner_up]) / len(grams) < MIN_ROUTE_MARGIN:
+            return None
+        normalizer = sum(
+            math.exp(log_prob - log_probs[best]) for log_prob in log_probs.values()
+        )
+        return RouteDecision(route=best, confidence=1 / normalizer, source="ngram")
+
+    @classmethod
+    def from_log(cls, path: Optional[str] = None) -> "NgramRouteModel":
+        model = cls()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    model.add(record["text"], record["route"])
+        return model
+
+
+_model: Optional[NgramRouteModel] = None
+_model_lock = threading.Lock()
+
+
+def _get_model() -> NgramRouteModel:
+    global _model
+    with _model_lock:
+        if _model is None:
+            settings = get_settings()
+            _model = NgramRouteModel.from_log(
+                settings.routing_log_path if settings.routing_log_enabled else None
+            )
+        return _model
+
+
+def redact(text: str) -> str:
+    return _EMAIL.sub("<email>", _PHONE.sub("<phone>", text))
+
+
+def log_routing_decision(text: str, route: str):
+    """LLM router의 결정을 n-gram 모델에 바로 반영한다.
+
+    ROUTING_LOG_ENABLED일 때만 개인정보를 가린 문장을 파일에도 남겨 다음 실행에서 다시 학습한다.
+    """
+    text = redact(text)
+    settings = get_settings()
+    with _model_lock:
+        if settings.routing_log_enabled:
+            with open(settings.routing_log_path, "a", encoding="utf-8") as f:
+                f.write(
+                    json.dumps({"text": text, "route": route, "source": "llm"}, ensure_ascii=False)
+                    + "\n"
+                )
+        if _model is not None:
+            _model.add(text, route)
+
+
+def _rule_decision(text: str) -> Optional[RouteDecision]:
+    hits = {
+        "reservation_assistant": sum(
+            bool(re.search(pattern, text)) for pattern in RESERVATION_PATTERNS
+        ),
+        "rag_assistant": sum(bool(re.search(pattern, text)) for pattern in RAG_PATTERNS),
+    }
+    # 토큰 단위로 정확히 일치하는 품종명만 센다 ('믹스커피'는 품종이 아니다)
+    breed_match = breed_index.resolve(text)
+    if breed_match is not None and breed_match.score == 1.0:
+        hits["rag_assistant"] += 1
+
+    matched = [route for route, count in hits.items() if count]
+    if len(matched) != 1:
+        # 아무것도 안 걸리거나 양쪽 다 걸리면 규칙으로는 판단하지 않는다
+        return None
+    route = matched[0]
+    confidence = min(0.99, 0.85 + 0.05 * (hits[route] - 1))
+    return RouteDecision(route=route, confidence=confidence, source="rules")
+
+
+def _sticky_decision(
+    messages: list, active_assistant: Optional[str], slots: Optional[dict] = None
+) -> Optional[RouteDecision]:
+    """직전 sub assistant가 사용자의 답을 기다리는 중이면 그대로 이어간다.
+
+    rag_assistant가 예약을 진행 중(slots의 reservation_in_progress)이거나,
+    직전 질문에 대한 짧은 대답일 때만 이어간다.
+    """
+    if active_assistant not in ("reservation_assistant", "rag_assistant"):
+        return None
+    if len(messages) < 2 or not isinstance(messages[-1], HumanMessage):
+        return None
+    previous = messages[-2]
+    if not isinstance(previous, AIMessage) or previous.tool_calls:
+        return None
+    text = messages[-1].content
+    collecting = active_assistant == "rag_assistant" and bool(
+        (slots or {}).get("reservation_in_progress")
+    )
+    if collecting or (len(text) <= SHORT_REPLY_MAX_LENGTH and SHORT_REPLY.search(text)):
+        return RouteDecision(route=active_assistant, confidence=1.0, source="sticky")
+    return None
+
+
+def pre_route(
+    messages: list, active_assistant: Optional[str] = None, slots: Optional[dict] = None
+) -> Optional[RouteDecision]:
+    """LLM router 전에 규칙, 대화 흐름, n-gram 모델로 라우팅을 시도한다."""
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+    text = messages[-1].content
+    rule = _rule_decision(text)
+    sticky = _sticky_decision(messages, active_assistant, slots)
+    if sticky is not None and (rule is None or rule.route == sticky.route):
+        return sticky
+    if rule is not None:
+        return rule
+    return _get_model().predict(text)
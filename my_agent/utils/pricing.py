@@ -0,0 +1,146 @@
+import csv
+import os
+from typing import Optional
+from my_agent.utils.breed_index import BreedIndex, breed_index, normalize_breed_name
+
+SERVICES_CSV_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "csv", "services.csv"
+)
+
+# weight_range 1 ~ 4 의 상한 무게(kg), services.csv의 max_weight와 같다
+WEIGHT_RANGE_MAX_WEIGHTS = (4, 6, 8, 10)
+
+# breed_type 4(대형견)는 services.csv에 데이터가 없어서
+# breed_type 3 표로 서비스 목록을 만들고 가격은 kg당 가격으로 계산한다
+LARGE_BREED_TYPE = 4
+LARGE_BREED_BASE_TYPE = 3
+PRICE_PER_KG = {
+    "위생미용+목욕": 7000,
+    "클리핑": 10000,
+    "스포팅": 13000,
+    "가위컷": 20000,
+    "위생미용": 5000,
+}
+
+
+def weight_to_range(weight: float) -> int:
+    """무게(kg)를 weight_range로 바꾼다.
+
+    각 구간은 상한을 포함한다. (4kg -> 1, 4.1kg -> 2, 6kg -> 2, 8kg -> 3)
+    10kg을 넘는 무게는 표에 없으므로 가장 큰 구간(4)으로 본다.
+    """
+    if weight is None or weight <= 0:
+        raise ValueError(f"Invalid weight: {weight}")
+    for weight_range, max_weight in enumerate(WEIGHT_RANGE_MAX_WEIGHTS, start=1):
+        if weight <= max_weight:
+            return weight_range
+    return len(WEIGHT_RANGE_MAX_WEIGHTS)
+
+
+class PriceTable:
+    """services.csv를 (breed_type, max_weight) 로 색인한 가격표."""
+
+    def __init__(self, rows: list[dict]):
+        # (breed_type, max_weight) -> ((service_id, service_name, price), ...)
+        table: dict[tuple[int, int], list[tuple[int, str, int]]] = {}
+        for row in sorted(rows, key=lambda row: int(row["id"])):
+            key = (int(row["breed_type"]), int(row["max_weight"]))
+            table.setdefault(key, []).append(
+                (int(row["id"]), row["service_name"], int(row["price"]))
+            )
+        self._table = {key: tuple(services) for key, services in table.items()}
+        self.service_names = tuple(
+            dict.fromkeys(name for services in self._table.values() for _, name, _ in services)
+        )
+
+    @classmethod
+    def from_csv(cls, path: str = SERVICES_CSV_PATH) -> "PriceTable":
+        with open(path, encoding="utf-8") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def services(self, breed_type: int, weight_range: int) -> list[dict]:
+        """breed_type, weight_range 에 해당하는 서비스 목록 (get_services_by_breed_and_weight 와 같은 형태)"""
+        max_weight = WEIGHT_RANGE_MAX_WEIGHTS[weight_range - 1]
+        return [
+            {
+                "id": service_id,
+                "service_name": service_name,
+                "price": price,
+                "breed_type": breed_type,
+                "max_weight": max_weight,
+            }
+            for service_id, service_name, price in self._table.get(
+                (breed_type, max_weight), ()
+            )
+        ]
+
+    def quote(self, breed_type: int, weight: float) -> list[dict]:
+        """품종 타입과 무게로 서비스별 가격을 계산한다."""
+        weight_range = weight_to_range(weight)
+        if breed_type != LARGE_BREED_TYPE:
+            return self.services(breed_type, weight_range)
+
+        services = self.services(LARGE_BREED_BASE_TYPE, weight_range)
+        for service in services:
+            service["breed_type"] = LARGE_BREED_TYPE
+            if service["service_name"] in PRICE_PER_KG:
+                service["price"] = PRICE_PER_KG[service["service_name"]] * int(weight)
+        return services
+
+
+class QuoteMatrix:
+    """breeds.csv x weight_range x services.csv 를 미리 join 해 둔 견적표.
+
+    가격 문의는 (품종명, weight_range, 서비스명) 키 하나로 바로 답한다.
+    breed_type 4 품종은 무게에 비례하므로 kg당 가격만 저장해두고 조회 시 계산한다.
+    """
+
+    def __init__(self, breeds: BreedIndex, table: PriceTable):
+        # (품종명, weight_range, 정규화된 서비스명) -> (서비스명, 가격)
+        self._matrix: dict[tuple[str, int, str], tuple[str, int]] = {}
+        # (품종명, weight_range) -> 정규화된 서비스명 목록
+        self._services: dict[tuple[str, int], tuple[str, ...]] = {}
+        for breed, breed_type in breeds.breeds.items():
+            for weight_range in range(1, len(WEIGHT_RANGE_MAX_WEIGHTS) + 1):
+                base_type = int(breed_type)
+                if base_type == LARGE_BREED_TYPE:
+                    base_type = LARGE_BREED_BASE_TYPE
+                keys = []
+                for service in table.services(base_type, weight_range):
+                    key = normalize_breed_name(service["service_name"])
+                    self._matrix[(breed, weight_range, key)] = (
+                        service["service_name"],
+                        service["price"],
+                    )
+                    keys.append(key)
+                self._services[(breed, weight_range)] = tuple(keys)
+        self._large_breeds = {
+            breed
+            for breed, breed_type in breeds.breeds.items()
+            if int(breed_type) == LARGE_BREED_TYPE
+        }
+        self._price_per_kg = {
+            normalize_breed_name(name): price for name, price in PRICE_PER_KG.items()
+        }
+
+    def lookup(
+        self, breed: str, weight: float, service_name: Optional[str] = None
+    ) -> list[dict]:
+        """breeds.csv의 품종명과 무게로 견적을 낸다. service_name이 없으면 전체 서비스를 돌려준다."""
+        weight_range = weight_to_range(weight)
+        keys = self._services.get((breed, weight_range), ())
+        if service_name is not None:
+            wanted = normalize_breed_name(service_name)
+            keys = [key for key in keys if key == wanted]
+
+        quotes = []
+        for key in keys:
+            name, price = self._matrix[(breed, weight_range, key)]
+            if breed in self._large_breeds and key in self._price_per_kg:
+                price = self._price_per_kg[key] * int(weight)
+            quotes.append({"service_name": name, "price": price})
+        return quotes
+
+
+price_table = PriceTable.from_csv()
+quote_matrix = QuoteMatrix(breed_index, price_table)
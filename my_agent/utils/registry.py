@@ -0,0 +1,90 @@
+import threading
+from typing import Any, Callable, Optional
+from langchain_core.runnables import Runnable
+from my_agent.utils.settings import get_settings
+
+
+class ResourceRegistry:
+    """프로세스 전체에서 공유하는 리소스(compiled graph, LLM/DB client) 모음.
+
+    (name, *key)마다 factory를 한 번만 호출한다. streamlit 세션은 서로 다른 스레드에서
+    동시에 들어오므로, 같은 리소스를 두 번 만들지 않도록 key별 lock으로 보호한다.
+    """
+
+    def __init__(self):
+        self._resources: dict[tuple, Any] = {}
+        self._locks: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[..., Any], *key) -> Any:
+        registry_key = (name, *key)
+        if registry_key in self._resources:
+            return self._resources[registry_key]
+        with self._lock:
+            lock = self._locks.setdefault(registry_key, threading.Lock())
+        # graph처럼 만드는 데 오래 걸리는 리소스가 다른 리소스를 막지 않도록 key별로 잠근다
+        with lock:
+            if registry_key not in self._resources:
+                self._resources[registry_key] = factory(*key)
+        return self._resources[registry_key]
+
+    def clear(self):
+        with self._lock:
+            self._resources.clear()
+            self._locks.clear()
+
+
+registry = ResourceRegistry()
+
+
+class LazyRunnable(Runnable):
+    """처음 실행될 때 factory로 실제 runnable을 만든다.
+
+    모듈 수준에서 `prompt | llm`처럼 chain을 조립해도 client(API key 검사, 네트워크 연결)는
+    첫 호출 때 만들어진다. bind_tools, with_structured_output도 lazy하게 이어진다.
+    """
+
+    def __init__(self, factory: Callable[[], Runnable]):
+        self._factory = factory
+        self._runnable: Optional[Runnable] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> Runnable:
+        if self._runnable is None:
+            with self._lock:
+                if self._runnable is None:
+                    self._runnable = self._factory()
+        return self._runnable
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.resolve().invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await self.resolve().ainvoke(input, config, **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        yield from self.resolve().stream(input, config, **kwargs)
+
+    async def astream(self, input, config=None, **kwargs):
+        async for chunk in self.resolve().astream(input, config, **kwargs):
+            yield chunk
+
+    def bind_tools(self, tools, **kwargs) -> "LazyRunnable":
+        return LazyRunnable(lambda: self.resolve().bind_tools(tools, **kwargs))
+
+    def with_structured_output(self, schema, **kwargs) -> "LazyRunnable":
+        return LazyRunnable(lambda: self.resolve().with_structured_output(schema, **kwargs))
+
+
+def get_chat_model(model: str = "gpt-4o-mini", temperature: Optional[float] = None) -> LazyRunnable:
+    """모델 설정마다 하나의 ChatOpenAI를 공유한다. client는 처음 호출될 때 만들어진다."""
+
+    def build() -> Runnable:
+        settings = get_settings()
+        settings.require("openai_api_key")
+        from langchain_openai import ChatOpenAI
+
+        kwargs = {} if temperature is None else {"temperature": temperature}
+        return ChatOpenAI(model=model, api_key=settings.openai_api_key, **kwargs)
+
+    return registry.get("chat_model", lambda *_: LazyRunnable(build), model, temperature)
@@ -0,0 +1,322 @@
+import csv
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Optional
+from my_agent.utils.breed_index import BREEDS_CSV_PATH
+from my_agent.utils.pricing import SERVICES_CSV_PATH, WEIGHT_RANGE_MAX_WEIGHTS
+
+LOCAL_RESERVATION_DB_PATH = "reservations.db"
+# 예약 테이블의 컬럼. get_reservations_by_phone의 fields는 이 중에서만 고를 수 있다
+RESERVATION_COLUMNS = (
+    "reservation_uuid",
+    "phone",
+    "service_name",
+    "weight",
+    "reservation_date",
+    "price",
+    "status",
+)
+CANCELLED_STATUS = "예약취소"
+
+
+class RpcError(Exception):
+    """PostgREST가 오류 응답을 돌려준 경우 (로컬 backend도 같은 형태로 낸다)"""
+
+    def __init__(self, function: str, status_code: int, detail: Any):
+        super().__init__(f"RPC {function} failed ({status_code}): {detail}")
+        self.function = function
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ReservationBackend(ABC):
+    """rpc.py의 예약/서비스 함수가 호출하는 저장소.
+
+    Supabase RPC와 같은 이름, 같은 반환 형태를 갖는다. 설정의 RESERVATION_BACKEND로 고른다.
+    """
+
+    @abstractmethod
+    def get_reservations_by_phone(
+        self,
+        phone: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        status: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[str, str]] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> list:
+        """reservation_date, reservation_uuid 순으로 정렬한 예약 목록"""
+
+    @abstractmethod
+    def update_reservation_date(self, reservation_uuid: str, new_date: str): ...
+
+    @abstractmethod
+    def cancel_reservation(self, reservation_uuid: str): ...
+
+    @abstractmethod
+    def cancel_reservations(self, reservation_uuids: list[str]) -> list:
+        """항목별 {"reservation_uuid", "ok", "error"}"""
+
+    @abstractmethod
+    def update_reservation_dates(self, updates: list[dict]) -> list:
+        """항목별 {"reservation_uuid", "ok", "error"}"""
+
+    @abstractmethod
+    def get_services_by_breed_and_weight(self, breed_type: int, weight_range: int) -> list: ...
+
+    @abstractmethod
+    def create_reservation(self, reservation: dict) -> Any: ...
+
+    def warmup(self):
+        """첫 사용자 요청 전에 연결 등을 미리 준비한다."""
+
+    def close(self):
+        pass
+
+
+def _to_timestamp(value: str) -> str:
+    """ISO 날짜를 저장 형식(YYYY-MM-DDTHH:MM:SS)으로 맞춘다.
+
+    timezone이 있으면 Postgres의 timestamp 변환처럼 UTC로 바꾼 뒤 떼어낸다.
+    """
+    try:
+        date = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}") from None
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date.isoformat(timespec="seconds")
+
+
+class SqliteReservationBackend(ReservationBackend):
+    """Supabase 없이 쓰는 로컬 SQLite 예약 저장소 (오프라인 개발, 부하 테스트, CI용).
+
+    처음 열 때 csv/services.csv, csv/breeds.csv로 테이블을 채운다.
+    latency(+ 0 ~ jitter 사이 임의 시간)만큼 호출마다 기다려서 네트워크 왕복을 흉내 낸다.
+    """
+
+    def __init__(
+        self,
+        path: str = LOCAL_RESERVATION_DB_PATH,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+    ):
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self._local = threading.local()
+        self._seed_lock = threading.Lock()
+        self._seeded = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA busy_timeout = 5000")
+        if not self._seeded:
+            with self._seed_lock:
+                if not self._seeded:
+                    self._seed(conn)
+                    self._seeded = True
+        return conn
+
+    def _seed(self, conn: sqlite3.Connection):
+        with conn:
+            conn.executescript(
+                """
+            CREATE TABLE IF NOT EXISTS breeds (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                type INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS services (
+                id INTEGER PRIMARY KEY,
+                price INTEGER NOT NULL,
+                breed_type INTEGER NOT NULL,
+                service_name TEXT NOT NULL,
+                max_weight INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_services_breed_weight
+                ON services(breed_type, max_weight);
+            CREATE TABLE IF NOT EXISTS reservations (
+                reservation_uuid TEXT PRIMARY KEY,
+                phone TEXT NOT NULL,
+                service_name TEXT NOT NULL,
+                weight REAL,
+                reservation_date TEXT NOT NULL,
+                price INTEGER,
+                status TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_reservations_phone
+                ON reservations(phone, reservation_date, reservation_uuid);
+            """
+            )
+            for table, path, columns in (
+                ("breeds", BREEDS_CSV_PATH, ("id", "name", "type")),
+                ("services", SERVICES_CSV_PATH, ("id", "price", "breed_type", "service_name", "max_weight")),
+            ):
+                with open(path, encoding="utf-8") as f:
+                    rows = [tuple(row[column] for column in columns) for row in csv.DictReader(f)]
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})",
+                    rows,
+                )
+
+    def _wait(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_reservations_by_phone(
+        self,
+        phone: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        status: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[str, str]] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> list:
+        self._wait()
+        columns = fields or RESERVATION_COLUMNS
+        unknown = [column for column in columns if column not in RESERVATION_COLUMNS]
+        if unknown:
+            raise RpcError(
+                "get_reservations_by_phone", 400, {"message": f"unknown columns: {unknown}"}
+            )
+        conditions, params = ["phone = ?"], [phone]
+        if date_from:
+            conditions.append("reservation_date >= ?")
+            params.append(_to_timestamp(date_from))
+        if date_to:
+            conditions.append("reservation_date < ?")
+            params.append(_to_timestamp(date_to))
+        if after:
+            conditions.append("(reservation_date, reservation_uuid) > (?, ?)")
+            params.extend((_to_timestamp(after[0]), after[1]))
+        if status:
+            conditions.append(f"status IN ({', '.join('?' * len(status))})")
+            params.extend(status)
+        sql = (
+            f"SELECT {', '.join(columns)} FROM reservations WHERE {' AND '.join(conditions)} "
+            "ORDER BY reservation_date, reservation_uuid"
+        )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    def _update_date(self, conn: sqlite3.Connection, reservation_uuid: str, new_date: str):
+        cursor = conn.execute(
+            "UPDATE reservations SET reservation_date = ? WHERE reservation_uuid = ?",
+            (_to_timestamp(new_date), reservation_uuid),
+        )
+        if cursor.rowcount == 0:
+            raise LookupError(f"reservation {reservation_uuid} not found")
+
+    def _cancel(self, conn: sqlite3.Connection, reservation_uuid: str):
+        cursor = conn.execute(
+            "UPDATE reservations SET status = ? WHERE reservation_uuid = ?",
+            (CANCELLED_STATUS, reservation_uuid),
+        )
+        if cursor.rowcount == 0:
+            raise LookupError(f"reservation {reservation_uuid} not found")
+
+    def _run(self, function: str, operation, *args):
+        """단건 변경. 실패하면 PostgREST처럼 RpcError(400)를 낸다."""
+        self._wait()
+        conn = self._connection()
+        try:
+            with conn:
+                operation(conn, *args)
+        except (LookupError, ValueError) as e:
+            raise RpcError(function, 400, {"message": str(e)}) from e
+
+    def _run_each(self, operation, items: list[tuple]) -> list:
+        """여러 건을 한 트랜잭션에서 처리하고, 항목마다 savepoint로 실패한 항목만 되돌린다."""
+        self._wait()
+        conn = self._connection()
+        results = []
+        with conn:
+            # sqlite3 모듈은 SAVEPOINT 앞에 BEGIN을 넣지 않아서, 그대로 두면 RELEASE마다 따로 commit된다
+            conn.execute("BEGIN")
+            for args in items:
+                conn.execute("SAVEPOINT item")
+                try:
+                    operation(conn, *args)
+                except (LookupError, ValueError) as e:
+                    conn.execute("ROLLBACK TO item")
+                    results.append({"reservation_uuid": args[0], "ok": False, "error": str(e)})
+                else:
+                    results.append({"reservation_uuid": args[0], "ok": True, "error": None})
+                conn.execute("RELEASE item")
+        return results
+
+    def update_reservation_date(self, reservation_uuid: str, new_date: str):
+        self._run("update_reservation_date", self._update_date, reservation_uuid, new_date)
+
+    def cancel_reservation(self, reservation_uuid: str):
+        self._run("cancel_reservation", self._cancel, reservation_uuid)
+
+    def cancel_reservations(self, reservation_uuids: list[str]) -> list:
+        return self._run_each(self._cancel, [(uuid_,) for uuid_ in reservation_uuids])
+
+    def update_reservation_dates(self, updates: list[dict]) -> list:
+        return self._run_each(
+            self._update_date,
+            [(update["reservation_uuid"], update["new_date"]) for update in updates],
+        )
+
+    def get_services_by_breed_and_weight(self, breed_type: int, weight_range: int) -> list:
+        self._wait()
+        if not 1 <= weight_range <= len(WEIGHT_RANGE_MAX_WEIGHTS):
+            return []
+        rows = self._connection().execute(
+            "SELECT id, price, breed_type, service_name, max_weight FROM services "
+            "WHERE breed_type = ? AND max_weight = ? ORDER BY id",
+            (breed_type, WEIGHT_RANGE_MAX_WEIGHTS[weight_range - 1]),
+        )
+        return [dict(row) for row in rows]
+
+    def create_reservation(self, reservation: dict) -> Any:
+        reservation_uuid = str(uuid.uuid4())
+
+        def insert(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT INTO reservations (reservation_uuid, phone, service_name, weight, "
+                "reservation_date, price, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    reservation_uuid,
+                    reservation["phone"],
+                    reservation["service_name"],
+                    reservation.get("weight"),
+                    _to_timestamp(reservation["reservation_date"]),
+                    reservation.get("price"),
+                    reservation["status"],
+                ),
+            )
+
+        self._run("create_reservation", insert)
+        return {"reservation_uuid": reservation_uuid}
+
+    def warmup(self):
+        self._connection()
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,184 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from my_agent.utils.breed_index import normalize_breed_name
+from my_agent.utils.pricing import price_table
+
+# 오전/오후 없이 "N시"로 말하면 영업시간 기준으로 오후로 본다 ("2시" -> 14시). "07:30" 같은 24시간 표기에는 적용하지 않는다
+AFTERNOON_HOURS = range(1, 8)
+
+# services.csv 에 없는 흔한 표현 -> 서비스명
+SERVICE_ALIASES = {
+    "목욕": "위생미용+목욕",
+}
+
+_WEEKDAYS = "월화수목금토일"
+_RELATIVE_DAYS = {"오늘": 0, "내일": 1, "모레": 2, "내일모레": 2, "글피": 3}
+_WEEK_OFFSETS = {"이번": 0, "다음": 1, "다다음": 2}
+
+_ISO_DATE = re.compile(r"(\d{4})\s*[-./]\s*(\d{1,2})\s*[-./]\s*(\d{1,2})")
+_KOREAN_DATE = re.compile(r"(?:(\d{4})\s*년\s*)?(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+_SLASH_DATE = re.compile(r"(?<![\d/])(\d{1,2})\s*/\s*(\d{1,2})(?![\d/])")
+_RELATIVE_DAY = re.compile(r"(내일\s*모레|오늘|내일|모레|글피)")
+_WEEKDAY = re.compile(r"(?:(다다음|다음|이번)\s*주\s*)?([월화수목금토일])\s*요일")
+_KOREAN_TIME = re.compile(
+    r"(오전|오후|아침|낮|저녁|밤)?\s*(\d{1,2})\s*시(?!간)\s*(?:(\d{1,2})\s*분|(반))?"
+)
+_COLON_TIME = re.compile(r"(오전|오후|아침|낮|저녁|밤)?\s*(\d{1,2}):(\d{2})(?::\d{2})?")
+_NOON = re.compile(r"정오")
+_PRICE_WON = re.compile(r"(\d[\d,]*)\s*원")
+_PRICE_MAN = re.compile(r"(\d+)\s*만\s*(?:(\d)\s*천)?\s*원?")
+_WEIGHT = re.compile(r"(\d+(?:\.\d+)?)\s*(?:kg|키로|킬로)", re.IGNORECASE)
+
+# make_reservation 에서 파서만으로 처리한 비율을 보기 위한 카운터
+parser_stats: Counter = Counter()
+
+
+@dataclass
+class ParsedReservation:
+    reservation_date: Optional[str] = None  # YYYY-MM-DD HH:MM:SS
+    service_name: Optional[str] = None
+    price: Optional[int] = None
+    weight: Optional[float] = None
+
+    def is_complete(self) -> bool:
+        """예약 생성에 필요한 필드(날짜, 서비스, 가격)가 모두 채워졌는지"""
+        return None not in (self.reservation_date, self.service_name, self.price)
+
+
+def parse_date(text: str, now: datetime) -> Optional[datetime]:
+    """날짜 표현을 찾아 자정 기준 datetime으로 돌려준다.
+
+    연도 없이 말한 날짜가 오늘보다 이전이면 다음 해의 같은 날짜로 본다.
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if match := _ISO_DATE.search(text):
+        year, month, day = map(int, match.groups())
+        return _safe_date(year, month, day)
+
+    year = month = day = None
+    if match := _KOREAN_DATE.search(text):
+        year = int(match.group(1)) if match.group(1) else None
+        month, day = int(match.group(2)), int(match.group(3))
+    elif match := _SLASH_DATE.search(text):
+        month, day = int(match.group(1)), int(match.group(2))
+    if month is not None:
+        if year is not None:
+            return _safe_date(year, month, day)
+        date = _safe_date(today.year, month, day)
+        if date is not None and date < today:
+            date = _safe_date(today.year + 1, month, day)
+        return date
+
+    if match := _RELATIVE_DAY.search(text):
+        return today + timedelta(days=_RELATIVE_DAYS[re.sub(r"\s", "", match.group(1))])
+
+    if match := _WEEKDAY.search(text):
+        weekday = _WEEKDAYS.index(match.group(2))
+        if match.group(1) is None:
+            # 그냥 "화요일"이면 오늘 이후 가장 가까운 화요일
+            return today + timedelta(days=(weekday - today.weekday()) % 7)
+        monday = today - timedelta(days=today.weekday())
+        date = monday + timedelta(weeks=_WEEK_OFFSETS[match.group(1)], days=weekday)
+        return date if date >= today else None
+    return None
+
+
+def parse_time(text: str) -> Optional[tuple[int, int]]:
+    """시각 표현을 (시, 분) 으로 돌려준다."""
+    if _NOON.search(text):
+        return 12, 0
+    if match := _COLON_TIME.search(text):
+        meridiem, hour, minute = match.group(1), int(match.group(2)), int(match.group(3))
+        is_24_hour = True
+    elif match := _KOREAN_TIME.search(text):
+        meridiem, hour = match.group(1), int(match.group(2))
+        minute = 30 if match.group(4) else int(match.group(3) or 0)
+        is_24_hour = False
+    else:
+        return None
+
+    if meridiem in ("오후", "저녁", "밤") and hour < 12:
+        hour += 12
+    elif meridiem == "낮" and hour < 7:
+        hour += 12
+    elif meridiem in ("오전", "아침", "밤") and hour == 12:
+        # "밤 12시"는 자정
+        hour = 0
+    elif meridiem is None and not is_24_hour and hour in AFTERNOON_HOURS:
+        hour += 12
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def parse_service_name(text: str) -> Optional[str]:
+    """services.csv 의 서비스명 중 문장에 들어있는 가장 긴 것을 찾는다."""
+    compact = normalize_breed_name(text)
+    vocabulary = {normalize_breed_name(name): name for name in price_table.service_names}
+    vocabulary.update(
+        {
+            normalize_breed_name(alias): name
+            for alias, name in SERVICE_ALIASES.items()
+            if normalize_breed_name(alias) not in vocabulary
+        }
+    )
+    for key in sorted(vocabulary, key=len, reverse=True):
+        if key in compact:
+            return vocabulary[key]
+    return None
+
+
+def parse_price(text: str) -> Optional[int]:
+    """문장에서 가장 먼저 나오는 금액. ("총 70,000원 (1만원 할인)" -> 70000)"""
+    candidates = [
+        (match.start(), int(match.group(1)) * 10000 + int(match.group(2) or 0) * 1000)
+        for match in _PRICE_MAN.finditer(text)
+    ]
+    candidates += [
+        (match.start(), int(match.group(1).replace(",", "")))
+        for match in _PRICE_WON.finditer(text)
+    ]
+    return min(candidates)[1] if candidates else None
+
+
+def parse_weight(text: str) -> Optional[float]:
+    if match := _WEIGHT.search(text):
+        return float(match.group(1))
+    return None
+
+
+def parse_reservation(text: str, now: Optional[datetime] = None) -> ParsedReservation:
+    """"12월 20일 오후 2시 가위컷 70,000원" 같은 문장에서 예약 정보를 규칙 기반으로 뽑는다."""
+    now = now or datetime.now()
+    parsed = ParsedReservation(
+        service_name=parse_service_name(text),
+        price=parse_price(text),
+        weight=parse_weight(text),
+    )
+    date = parse_date(text, now)
+    time = parse_time(text)
+    if date is not None and time is not None:
+        reservation_date = date.replace(hour=time[0], minute=time[1])
+        if reservation_date >= now:
+            parsed.reservation_date = reservation_date.strftime("%Y-%m-%d %H:%M:%S")
+    return parsed
+
+
+def record_parse_result(hit: bool):
+    parser_stats["hit" if hit else "fallback"] += 1
+
+
+def parser_hit_rate() -> float:
+    total = parser_stats["hit"] + parser_stats["fallback"]
+    return parser_stats["hit"] / total if total else 0.0
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[datetime]:
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
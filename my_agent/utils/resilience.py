@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# hedged 요청을 보낼 때 쓰는 스레드 수
+HEDGE_MAX_WORKERS = 8
+
+
+class DeadlineExceededError(TimeoutError):
+    """재시도를 포함한 전체 호출이 deadline 안에 끝나지 않은 경우"""
+
+
+class CircuitOpenError(RuntimeError):
+    """backend가 연속으로 실패해서 호출하지 않고 바로 실패시킨 경우"""
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """호출 하나에 적용할 제한 시간, 재시도, hedging 설정"""
+
+    deadline: float  # 재시도를 포함한 전체 제한 시간(초)
+    retries: int = 0  # 멱등(읽기) 호출에만 0보다 크게 준다
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    hedge_after: Optional[float] = None  # 이 시간(초) 안에 응답이 없으면 같은 요청을 한 번 더 보낸다
+
+
+def backoff_delay(attempt: int, policy: CallPolicy) -> float:
+    """exponential backoff + full jitter: [0, min(max, base * 2^attempt)]"""
+    return random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2**attempt))
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold번 쌓이면 reset_timeout 동안 호출을 막는다.
+
+    그 뒤 한 번의 시험 호출(half-open)이 성공하면 다시 열고, 실패하면 다시 막는다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def before_call(self) -> bool:
+        """호출해도 되는지 확인한다. 이 호출이 half-open 시험 호출이면 True"""
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("backend is unavailable, failing fast")
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release_probe(self):
+        with self.lock:
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+class ResilientCaller:
+    """CallPolicy와 CircuitBreaker를 적용해서 함수를 호출한다.
+
+    attempt는 남은 시간(초)을 받아 그 안에 끝내야 하는 함수 (예: HTTP 요청의 timeout).
+    is_retryable이 True인 예외만 재시도하고 breaker의 실패로 센다. (예: 4xx는 backend 장애가 아니다)
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        is_retryable: Callable[[BaseException], bool],
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.breaker = breaker
+        self.is_retryable = is_retryable
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="rpc-hedge"
+        )
+
+    def call(self, attempt: Callable[[float], T], policy: CallPolicy) -> T:
+        deadline = time.monotonic() + policy.deadline
+        for attempt_index in range(policy.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceededError(f"deadline of {policy.deadline}s exceeded")
+            is_probe = self.breaker.before_call()
+            try:
+                if policy.hedge_after is not None:
+                    result = self._hedged(attempt, remaining, policy.hedge_after)
+                else:
+                    result = attempt(remaining)
+            except Exception as e:
+                if not self.is_retryable(e):
+                    # 4xx처럼 backend가 응답한 오류는 backend가 살아 있다는 뜻이다
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                delay = backoff_delay(attempt_index, policy)
+                if attempt_index == policy.retries or time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                # 어떤 경로로 끝나든 시험 호출 표시가 남아서 breaker가 영원히 막히지 않도록 한다
+                if is_probe:
+                    self.breaker.release_probe()
+
+    def _hedged(self, attempt: Callable[[float], T], remaining: float, hedge_after: float) -> T:
+        """hedge_after 안에 응답이 없으면 같은 요청을 하나 더 보내고, 먼저 성공한 결과를 쓴다."""
+        start = time.monotonic()
+        futures: list[Future] = [self.executor.submit(attempt, remaining)]
+        done, _ = wait(futures, timeout=min(hedge_after, remaining))
+        if not done:
+            futures.append(
+                self.executor.submit(attempt, remaining - (time.monotonic() - start))
+            )
+        error: Optional[BaseException] = None
+        pending = set(futures)
+        while pending:
+            timeout = remaining - (time.monotonic() - start)
+            if timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if error is not None:
+            raise error
+        raise DeadlineExceededError(f"no response within {remaining:.2f}s")
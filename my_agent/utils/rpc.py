@@ -1,66 +1,425 @@
-from .supabase_client import supabase
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+import httpx
+from my_agent.utils.registry import registry
+from my_agent.utils.reservation_backend import (
+    ReservationBackend,
+    RpcError,
+    SqliteReservationBackend,
+)
+from my_agent.utils.resilience import (
+    CallPolicy,
+    CircuitBreaker,
+    DeadlineExceededError,
+    ResilientCaller,
+)
+from my_agent.utils.settings import get_settings
 
+# 한 프로세스에서 Supabase로 열어둘 연결 수. HTTP/2는 연결 하나로 여러 요청을 동시에 보낸다
+RPC_MAX_CONNECTIONS = 10
+RPC_KEEPALIVE_EXPIRY_SECONDS = 60.0
+# 재시도해도 되는 HTTP 상태 (서버 오류, rate limit). 나머지 4xx는 요청이 잘못된 것이므로 그대로 올린다
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# search_reservation이 LLM에 넘기는 예약 필드와 최대 개수
+RESERVATION_FIELDS = ("reservation_uuid", "service_name", "reservation_date", "status", "price")
+UPCOMING_RESERVATIONS_LIMIT = 10
+# 전화번호별 예약 목록을 캐시에 두는 시간(초). 이 서버를 거치지 않은 변경(관리자 페이지 등)이 보이기까지의 최대 지연
+RESERVATION_CACHE_TTL_SECONDS = 60.0
 
-def get_supabase_client() -> Client:
-    load_dotenv()
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    return supabase
 
+def is_retryable(error: BaseException) -> bool:
+    """연결 실패, timeout, 5xx/429만 backend 장애로 보고 재시도한다."""
+    if isinstance(error, RpcError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, DeadlineExceededError))
 
-def get_reservations_by_phone(phone: str) -> dict:
-    supabase: Client = get_supabase_client()
-    response = supabase.rpc(
-        "get_reservations_by_phone", {"phone_number": phone}
-    ).execute()
-    # ret = json.loads(response.data)
-    # return ret
-    return response.data
+
+class RpcGateway:
+    """Supabase(PostgREST) RPC 호출 창구. `POST {base_url}/rest/v1/rpc/{function}`
+
+    HTTP/2 keep-alive 연결을 재사용하므로 호출마다 client 생성, TLS handshake 비용을 내지 않는다.
+    base_url만 바꾸면 로컬 stand-in 서버를 상대로도 그대로 동작한다.
+
+    모든 호출에 deadline(timeout)과 circuit breaker가 적용되고, idempotent=True인 읽기 호출만
+    read_policy에 따라 재시도(exponential backoff + jitter)와 hedged 요청을 한다.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        http2: bool = True,
+        max_connections: int = RPC_MAX_CONNECTIONS,
+        read_retries: int = 0,
+        hedge_after: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_policy = CallPolicy(deadline=timeout, retries=read_retries, hedge_after=hedge_after)
+        self.write_policy = CallPolicy(deadline=timeout)
+        self.caller = ResilientCaller(breaker or CircuitBreaker(), is_retryable)
+        self.client = httpx.Client(
+            base_url=f"{base_url.rstrip('/')}/rest/v1",
+            http2=http2,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=RPC_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            headers={"apikey": api_key, "Authorization": f"Bearer {api_key}"},
+        )
+
+    def call(
+        self,
+        function: str,
+        params: Optional[dict] = None,
+        query: Optional[dict] = None,
+        *,
+        idempotent: bool = False,
+    ) -> Any:
+        """query는 PostgREST query parameter (select, 필터, order, limit). 함수 결과에 DB에서 적용된다.
+
+        idempotent는 여러 번 실행해도 결과가 같은 읽기 함수에만 준다.
+        deadline을 넘기면 DeadlineExceededError, breaker가 열려 있으면 CircuitOpenError가 난다.
+        """
+        policy = self.read_policy if idempotent else self.write_policy
+        try:
+            return self.caller.call(
+                lambda remaining: self._post(function, params, query, remaining), policy
+            )
+        except httpx.TimeoutException as e:
+            raise DeadlineExceededError(f"RPC {function} timed out after {policy.deadline}s") from e
+
+    def _post(self, function: str, params: Optional[dict], query: Optional[dict], timeout: float) -> Any:
+        response = self.client.post(
+            f"/rpc/{function}",
+            json=params or {},
+            params=query,
+            timeout=httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout)),
+        )
+        if response.is_error:
+            try:
+                detail = response.json()
+            except ValueError:
+                detail = response.text
+            raise RpcError(function, response.status_code, detail)
+        # void를 반환하는 함수는 본문이 비어 있다
+        return response.json() if response.content else None
+
+    def warmup(self):
+        """첫 사용자 요청 전에 연결(DNS, TLS, HTTP/2 handshake)을 미리 맺어 둔다."""
+        try:
+            self.client.get("/")
+        except httpx.HTTPError as e:
+            print(f"RPC warmup failed: {e}")
+
+    def close(self):
+        self.client.close()
+
+
+def get_rpc_gateway() -> RpcGateway:
+    settings = get_settings()
+    base_url = settings.rpc_base_url or settings.supabase_url
+    if not settings.rpc_base_url:
+        settings.require("supabase_url")
+    settings.require("supabase_key")
+    return registry.get(
+        "rpc_gateway",
+        lambda base_url, api_key, timeout, connect_timeout, retries, hedge_after, threshold, reset: RpcGateway(
+            base_url,
+            api_key,
+            timeout=timeout,
+            connect_timeout=connect_timeout,
+            read_retries=retries,
+            hedge_after=hedge_after,
+            breaker=CircuitBreaker(threshold, reset),
+        ),
+        base_url,
+        settings.supabase_key,
+        settings.rpc_timeout_seconds,
+        settings.rpc_connect_timeout_seconds,
+        settings.rpc_read_retries,
+        settings.rpc_hedge_after_seconds,
+        settings.rpc_breaker_failure_threshold,
+        settings.rpc_breaker_reset_seconds,
+    )
+
+
+def warmup_rpc_gateway() -> threading.Thread:
+    """앱 시작 시 한 번 호출한다. 화면을 막지 않도록 백그라운드에서 연결을 맺는다."""
+
+    def warmup():
+        try:
+            get_reservation_backend().warmup()
+        except ValueError as e:
+            # 설정이 빠져 있으면 실제 호출 때 다시 오류가 나므로 여기서는 알리기만 한다
+            print(f"RPC warmup skipped: {e}")
+
+    thread = threading.Thread(target=warmup, name="rpc-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+class ReservationCache:
+    """전화번호별 예약 목록 캐시 (TTL).
+
+    같은 번호를 동시에 조회하면(예: prefetch 중에 사용자가 질문) RPC는 한 번만 보낸다.
+    예약을 바꾸는 RPC는 성공한 뒤 해당 번호의 항목을 지운다 (write-through invalidation).
+    """
+
+    def __init__(self, fetch: Callable[[str], list], ttl: float = RESERVATION_CACHE_TTL_SECONDS):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # phone -> [만료 시각, 조회 결과 Future]
+        self.entries: dict[str, list] = {}
+
+    def get(self, phone: str) -> list:
+        with self.lock:
+            entry = self.entries.get(phone)
+            if entry is not None and entry[0] <= time.monotonic():
+                entry = None
+            is_owner = entry is None
+            if is_owner:
+                # 조회가 끝날 때까지는 만료되지 않은 것으로 두고, 다른 호출은 같은 Future를 기다린다
+                entry = self.entries[phone] = [float("inf"), Future()]
+        future: Future = entry[1]
+        if is_owner:
+            try:
+                future.set_result(self.fetch(phone))
+            except Exception as e:
+                future.set_exception(e)
+                with self.lock:
+                    if self.entries.get(phone) is entry:
+                        del self.entries[phone]
+            else:
+                with self.lock:
+                    entry[0] = time.monotonic() + self.ttl
+        return future.result()
+
+    def prefetch(self, phone: str) -> threading.Thread:
+        """전화번호가 입력되자마자 백그라운드에서 예약 목록을 채워 둔다."""
+
+        def run():
+            try:
+                self.get(phone)
+            except Exception as e:
+                print(f"Reservation prefetch failed: {e}")
+
+        thread = threading.Thread(target=run, name="reservation-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self, phone: Optional[str] = None):
+        with self.lock:
+            if phone is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(phone, None)
+
+    def invalidate_reservation(self, reservation_uuid: str):
+        """reservation_uuid가 들어 있는 번호의 항목을 지운다. 어느 번호인지 모르면 전부 지운다."""
+        with self.lock:
+            phones = [
+                phone
+                for phone, (_, future) in self.entries.items()
+                if future.done()
+                and not future.exception()
+                and any(reservation_uuid in row.values() for row in future.result() or [])
+            ]
+            for phone in phones or list(self.entries):
+                del self.entries[phone]
+
+
+def _quote(value: str) -> str:
+    # PostgREST 논리식 안에서 ':', ',' 등이 들어간 값은 큰따옴표로 감싼다
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class SupabaseBackend(ReservationBackend):
+    """Supabase RPC로 예약을 다루는 backend. 필터, 정렬, 개수 제한, 필드 선택은 PostgREST query로 보낸다."""
+
+    def get_reservations_by_phone(
+        self,
+        phone: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        status: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[tuple[str, str]] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> list:
+        conditions = []
+        if date_from:
+            conditions.append(f"reservation_date.gte.{_quote(date_from)}")
+        if date_to:
+            conditions.append(f"reservation_date.lt.{_quote(date_to)}")
+        if after:
+            after_date, after_uuid = map(_quote, after)
+            conditions.append(
+                f"or(reservation_date.gt.{after_date},"
+                f"and(reservation_date.eq.{after_date},reservation_uuid.gt.{after_uuid}))"
+            )
+        query = {"order": "reservation_date.asc,reservation_uuid.asc"}
+        if conditions:
+            query["and"] = f"({','.join(conditions)})"
+        if status:
+            query["status"] = f"in.({','.join(map(_quote, status))})"
+        if limit:
+            query["limit"] = limit
+        if fields:
+            query["select"] = ",".join(fields)
+        return get_rpc_gateway().call(
+            "get_reservations_by_phone", {"phone_number": phone}, query, idempotent=True
+        )
+
+    def update_reservation_date(self, reservation_uuid: str, new_date: str):
+        get_rpc_gateway().call(
+            "update_reservation_date",
+            {"reservation_uuid": reservation_uuid, "new_reservation_date": new_date},
+        )
+
+    def cancel_reservation(self, reservation_uuid: str):
+        get_rpc_gateway().call("cancel_reservation", {"reservation_uuid": reservation_uuid})
+
+    def cancel_reservations(self, reservation_uuids: list[str]) -> list:
+        return get_rpc_gateway().call(
+            "cancel_reservations", {"reservation_uuids": reservation_uuids}
+        )
+
+    def update_reservation_dates(self, updates: list[dict]) -> list:
+        return get_rpc_gateway().call("update_reservation_dates", {"updates": updates})
+
+    def get_services_by_breed_and_weight(self, breed_type: int, weight_range: int) -> list:
+        return get_rpc_gateway().call(
+            "get_services_by_breed_and_weight",
+            {"breed_type_id": breed_type, "weight_range_id": weight_range},
+            idempotent=True,
+        )
+
+    def create_reservation(self, reservation: dict):
+        return get_rpc_gateway().call("create_reservation", reservation)
+
+    def warmup(self):
+        get_rpc_gateway().warmup()
+
+
+def get_reservation_backend() -> ReservationBackend:
+    """설정의 RESERVATION_BACKEND(supabase | sqlite)에 따라 backend를 고른다."""
+    settings = get_settings()
+    if settings.reservation_backend == "sqlite":
+        return registry.get(
+            "reservation_backend",
+            lambda path, latency, jitter: SqliteReservationBackend(
+                path, latency=latency, jitter=jitter
+            ),
+            settings.local_reservation_db_path,
+            settings.local_rpc_latency_seconds,
+            settings.local_rpc_jitter_seconds,
+        )
+    return registry.get("reservation_backend", lambda _: SupabaseBackend(), "supabase")
+
+
+def get_reservations_by_phone(
+    phone: str,
+    *,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    status: Optional[str | list[str]] = None,
+    limit: Optional[int] = None,
+    after: Optional[tuple[str, str]] = None,
+    fields: Optional[tuple[str, ...]] = None,
+) -> list:
+    """전화번호의 예약 목록. 필터, 정렬, 개수 제한, 필드 선택은 DB에서 처리된다.
+
+    date_from 이상, date_to 미만의 reservation_date만 가져오고, after에는 이전 페이지의 마지막
+    (reservation_date, reservation_uuid)를 넘긴다 (keyset pagination).
+    """
+    return get_reservation_backend().get_reservations_by_phone(
+        phone,
+        date_from=date_from,
+        date_to=date_to,
+        status=[status] if isinstance(status, str) else status,
+        limit=limit,
+        after=after,
+        fields=fields,
+    )
+
+
+def get_upcoming_reservations(phone: str) -> list:
+    """현재 시각 이후 예약 중 가까운 순 UPCOMING_RESERVATIONS_LIMIT개 (+ 더 있는지 확인용 1개)"""
+    return get_reservations_by_phone(
+        phone,
+        date_from=datetime.now(timezone.utc).isoformat(),
+        limit=UPCOMING_RESERVATIONS_LIMIT + 1,
+        fields=RESERVATION_FIELDS,
+    )
+
+
+reservation_cache = ReservationCache(get_upcoming_reservations)
 
 
 def update_reservation_date(reservation_uuid: str, new_date: str):
-    supabase: Client = get_supabase_client()
-    response = supabase.rpc(
-        "update_reservation_date",
-        {"reservation_uuid": reservation_uuid, "new_reservation_date": new_date},
-    ).execute()
+    get_reservation_backend().update_reservation_date(reservation_uuid, new_date)
+    reservation_cache.invalidate_reservation(reservation_uuid)
     return "reservation successfully updated"
 
 
 def cancel_reservation(reservation_uuid: str) -> dict:
-    supabase: Client = get_supabase_client()
-    response = supabase.rpc(
-        "cancel_reservation", {"reservation_uuid": reservation_uuid}
-    ).execute()
+    get_reservation_backend().cancel_reservation(reservation_uuid)
+    reservation_cache.invalidate_reservation(reservation_uuid)
     return "reservation successfully cancelled"
 
 
+def _invalidate_succeeded(results: list) -> list:
+    for result in results or []:
+        if result.get("ok"):
+            reservation_cache.invalidate_reservation(result["reservation_uuid"])
+    return results
+
+
+def cancel_reservations(reservation_uuids: list[str]) -> list:
+    """여러 예약을 한 번의 RPC(한 트랜잭션)로 취소한다. (sql/bulk_reservations.sql)
+
+    반환값은 항목별 {"reservation_uuid", "ok", "error"}
+    """
+    return _invalidate_succeeded(get_reservation_backend().cancel_reservations(reservation_uuids))
+
+
+def update_reservation_dates(updates: list[dict]) -> list:
+    """여러 예약의 날짜를 한 번의 RPC(한 트랜잭션)로 변경한다. (sql/bulk_reservations.sql)
+
+    updates는 {"reservation_uuid", "new_date"(YYYY-MM-DD HH:MM:SS)} 목록,
+    반환값은 항목별 {"reservation_uuid", "ok", "error"}
+    """
+    return _invalidate_succeeded(get_reservation_backend().update_reservation_dates(updates))
+
+
 def get_service_by_breed_and_weight(breed_type: int, weight_range: int):
-    response = supabase.rpc(
-        "get_services_by_breed_and_weight",
-        {"breed_type_id": breed_type, "weight_range_id": weight_range},
-    ).execute()
-    return response
+    return get_reservation_backend().get_services_by_breed_and_weight(breed_type, weight_range)
 
 
 def create_reservation(
     reservation_info,
     phone: str,
 ):
-    response = supabase.rpc(
-        "create_reservation",
+    response = get_reservation_backend().create_reservation(
         {
-
-            "status":reservation_info.status,
-            "service_name":reservation_info.service_name,
-            "weight":reservation_info.weight,
-            "reservation_date":reservation_info.reservation_date,
-            "price":reservation_info.price,
-            "phone":phone
+            "status": reservation_info.status,
+            "service_name": reservation_info.service_name,
+            "weight": reservation_info.weight,
+            "reservation_date": reservation_info.reservation_date,
+            "price": reservation_info.price,
+            "phone": phone,
         }
-    ).execute()
+    )
+    reservation_cache.invalidate(phone)
     return response
@@ -1,7 +1,7 @@
 from functools import lru_cache
 from my_agent.utils.tools.reservation import primary_tools
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from my_agent.utils.registry import get_chat_model
 from datetime import date, datetime
 from langchain.tools import Tool
 from my_agent.utils.state import ReservState
@@ -10,7 +10,7 @@ from my_agent.utils.state import ReservState
 @lru_cache(maxsize=4)
 def _get_model(model_name: str):
     if model_name == "openai":
-        model = ChatOpenAI(model="gpt-4o-mini")
+        model = get_chat_model("gpt-4o-mini")
     else:
         raise ValueError(f"Unsupported model type: {model_name}")
 
@@ -36,7 +36,12 @@ assistant_prompt = ChatPromptTemplate.from_messages(
             "Input: reservation_uuid: (str), new_date: (str in format YYYY-MM-DD HH:MM:SS). "
             "Output: Success message.\n"
             "3. CancelReservation: Cancel an existing reservation based on its UUID. "
-            "Input: reservation_uuid: (str). Output: Success message.\n\n"
+            "Input: reservation_uuid: (str). Output: Success message.\n"
+            "4. UpdateReservationDates: Update the dates of several reservations in one call. "
+            "Input: updates: list of (reservation_uuid, new_date). Output: ok/error per reservation.\n"
+            "5. delete_reservations: Cancel several reservations in one call. "
+            "Input: reservation_uuids: list of str. Output: ok/error per reservation.\n"
+            "When the user wants to change or cancel more than one reservation, use 4 or 5 once instead of repeating 2 or 3.\n\n"
 
             "When given a task, choose the most appropriate tool to fulfill the request."
             "response is always say korean"
@@ -62,7 +67,6 @@ class RouteQuery(BaseModel):
 
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 
 route_prompt = ChatPromptTemplate.from_messages(
     [
@@ -79,7 +83,25 @@ route_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-model = ChatOpenAI(model="gpt-4o-mini")
+model = get_chat_model("gpt-4o-mini")
 structured_model = model.with_structured_output(RouteQuery)
 
 router_runnable = route_prompt | structured_model
+
+from langchain_core.output_parsers import StrOutputParser
+
+summary_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You maintain a running summary of a conversation between a puppy grooming reservation assistant and a customer.
+            Update the existing summary with the new part of the conversation.
+            Keep every fact needed to continue the reservation: the dog's breed and weight, quoted services and prices,
+            chosen service, requested dates, and reservations that were created, updated or cancelled.
+            Drop greetings and small talk. Write the summary in Korean, in at most 8 short lines.""",
+        ),
+        ("human", "기존 요약:\n{summary}\n\n새 대화:\n{conversation}"),
+    ]
+)
+
+summary_runnable = summary_prompt | get_chat_model("gpt-4o-mini") | StrOutputParser()
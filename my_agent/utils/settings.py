@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import Literal, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """외부 서비스 설정. 환경 변수와 .env에서 읽는다 (대소문자 무관, 예: SUPABASE_URL).
+
+    값이 없어도 import는 실패하지 않고, 그 값을 쓰는 client를 처음 만들 때 require()가 오류를 낸다.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    openai_api_key: Optional[str] = None
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+    # RPC를 보낼 PostgREST 주소. 비워두면 SUPABASE_URL을 쓴다 (로컬 stand-in 서버로 바꿀 때 사용)
+    rpc_base_url: Optional[str] = None
+    # RPC 한 번의 전체 제한 시간(초, 재시도 포함)
+    rpc_timeout_seconds: float = 10.0
+    rpc_connect_timeout_seconds: float = 3.0
+    # 읽기 RPC만 재시도한다. 쓰기는 중복 실행될 수 있으므로 재시도하지 않는다
+    rpc_read_retries: int = 2
+    # 읽기 RPC가 이 시간(초) 안에 응답이 없으면 같은 요청을 한 번 더 보낸다. 비워두면 끈다
+    rpc_hedge_after_seconds: Optional[float] = None
+    # 연속 실패가 threshold번이면 reset 시간(초) 동안 RPC를 보내지 않고 바로 실패한다
+    rpc_breaker_failure_threshold: int = 5
+    rpc_breaker_reset_seconds: float = 30.0
+    # 예약 저장소. sqlite는 Supabase 없이 로컬 파일(csv로 채움)을 쓴다 (오프라인 개발, 부하 테스트, CI)
+    reservation_backend: Literal["supabase", "sqlite"] = "supabase"
+    local_reservation_db_path: str = "reservations.db"
+    # sqlite backend가 호출마다 기다리는 시간(초). latency + 0 ~ jitter 사이 임의 시간
+    local_rpc_latency_seconds: float = 0.0
+    local_rpc_jitter_seconds: float = 0.0
+    upstage_api_key: Optional[str] = None
+    upstage_embedding_model: str = "embedding-query"
+    pinecone_api_key: Optional[str] = None
+    pinecone_index_name: str = "breeds"
+    # 품종 벡터 DB. local은 Pinecone 대신 로컬 스냅샷(python -m my_agent.utils.local_vector_store로 생성)을 쓴다
+    breeds_vector_store: Literal["pinecone", "local"] = "pinecone"
+    local_breeds_index_path: str = "breeds_index"
+    # LLM router의 결정을 파일에 쌓아 n-gram pre-router 학습에 쓸지. 사용자 문장이 남으므로 기본은 끈다
+    # (전화번호, 이메일은 가린 뒤 저장한다)
+    routing_log_enabled: bool = False
+    routing_log_path: str = "routing_log.jsonl"
+
+    def require(self, *names: str):
+        missing = [name.upper() for name in names if not getattr(self, name)]
+        if missing:
+            raise ValueError(f"Missing settings: {', '.join(missing)}")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
@@ -1,9 +1,48 @@
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, Optional
 from langgraph.graph.message import AnyMessage, add_messages
 from typing import List
 
 
+class PetProfile(TypedDict, total=False):
+    breed: str
+    breed_type: str
+    weight: float
+    name: str
+
+
+class ReservationSlots(TypedDict, total=False):
+    """대화 중에 확정된 예약 정보. 툴이 새로 알게 된 값만 조금씩 갱신한다."""
+
+    pet: PetProfile
+    quoted_services: dict[str, int]  # 마지막으로 안내한 서비스명 -> 가격
+    service_name: Optional[str]
+    price: Optional[int]
+    reservation_date: Optional[str]  # YYYY-MM-DD HH:MM:SS
+    # 가격표를 안내한 뒤 예약을 마칠 때까지 True. 사용자의 다음 말을 rag_assistant로 이어 보낼 때 쓴다
+    reservation_in_progress: bool
+
+
+def merge_slots(current: Optional[dict], update: Optional[dict]) -> dict:
+    """slots reducer: 넘어온 key만 덮어쓴다. pet은 한 단계 더 병합한다.
+
+    값을 지우려면 해당 key에 None을 넘긴다.
+    """
+    merged = dict(current or {})
+    for key, value in (update or {}).items():
+        if key == "pet" and value is not None:
+            merged["pet"] = {**merged.get("pet", {}), **value}
+        else:
+            merged[key] = value
+    return merged
+
+
 class ReservState(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
     user_info: str
     documents: List[str]
+    slots: Annotated[ReservationSlots, merge_slots]
+    # 마지막으로 라우팅된 sub assistant, 대화가 이어지면 라우팅을 건너뛰는 데 사용
+    active_assistant: Optional[str]
+    # context window 밖으로 밀려난 대화의 요약과, 요약에 포함된 마지막 message id
+    summary: str
+    summary_until: Optional[str]
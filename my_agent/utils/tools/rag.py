@@ -1,22 +1,34 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
-from typing import Optional
-from langchain_core.tools import tool, Tool
-from .tools_prompt import (
-    pet_prompt_template,
-    reservation_prompt_template,
-    grade_weight_range_chain,
-    weight_dictionary,
-)
-from langchain_openai import ChatOpenAI
-from ..rpc import get_service_by_breed_and_weight, create_reservation
+from typing import Optional, Annotated
+from langchain_core.tools import tool, Tool, StructuredTool
+from .tools_prompt import quote_request_prompt_template
+from ..rpc import create_reservation
 from langchain_core.prompts import ChatPromptTemplate
 from datetime import datetime
-from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt import ToolNode, InjectedState
 from my_agent.utils.grade_doc import retrieval_grader
-from my_agent.utils.vector_db import breeds_database
+from my_agent.utils.vector_db import get_breeds_database
+from my_agent.utils.breed_index import breed_index, BreedMatch, BREED_MATCH_THRESHOLD
+from my_agent.utils.pricing import price_table, quote_matrix
+from my_agent.utils.reservation_parser import (
+    ParsedReservation,
+    parse_reservation,
+    parse_weight,
+    parser_hit_rate,
+    record_parse_result,
+)
 from langchain_core.runnables.config import RunnableConfig
+from my_agent.utils.registry import get_chat_model
 
-llm = ChatOpenAI(model="gpt-4o-mini")
+llm = get_chat_model("gpt-4o-mini")
+# sync 경로에서 품종 검색과 동시에 LLM 추출을 돌리는 스레드
+EXTRACTION_MAX_WORKERS = 4
+_extraction_executor = ThreadPoolExecutor(
+    max_workers=EXTRACTION_MAX_WORKERS, thread_name_prefix="pet-extraction"
+)
 
 
 class Pet(BaseModel):
@@ -62,85 +74,354 @@ class Reservation(BaseModel):
     phone: Optional[str] = Field(description="The phone number of the customer, must have a value")
 
 
-structured_pet_llm = llm.with_structured_output(schema=Pet)
-structured_reservation_llm = llm.with_structured_output(schema=Reservation)
-fill_pet_info_runnable = pet_prompt_template | structured_pet_llm
-fill_reservation_info_runnable = (
-    reservation_prompt_template | structured_reservation_llm
-)
+class QuoteRequest(BaseModel):
+    """Everything needed to quote and book a grooming service, extracted at once.
+    ^ Doc-string for the entity QuoteRequest
+    This doc-string is sent to the LLM as the description of the schema QuoteRequest,
+    and it can help to improve extraction results.
+
+    Note that:
+    1. Each field is an `optional` -- this allows the model to decline to extract it!
+    2. The pet and the reservation are read from this result, so one call replaces the
+       separate pet and reservation extractions. The weight range is computed from the weight.
+    """
+
+    name: Optional[str] = Field(description="The name of the pet")
+    breed: Optional[str] = Field(description="The breed of the pet")
+    weight: Optional[float] = Field(description="The weight of the pet in kg")
+    age: Optional[int] = Field(description="The age of the pet")
+    service_name: Optional[str] = Field(
+        description="The name of the requested grooming service"
+    )
+    reservation_date: Optional[str] = Field(
+        description="The requested date and time of the reservation (format: YYYY-MM-DD HH:MM:SS)"
+    )
+    price: Optional[int] = Field(description="The price of the service")
+
+    def to_pet(self) -> Pet:
+        return Pet(
+            name=self.name,
+            breed_type=None,
+            breed=self.breed,
+            weight=self.weight,
+            age=self.age,
+        )
+
+
+structured_quote_request_llm = llm.with_structured_output(schema=QuoteRequest)
+fill_quote_request_runnable = quote_request_prompt_template | structured_quote_request_llm
 
 
 # 주어진 강아지 정보로부터 breed type을 채워넣는 함수
-def fill_breed_type(query: str, retrieved_docs) -> Pet:
-    extracted_pet: Pet = fill_pet_info_runnable.invoke({"query": query})
-    breed_type_info = None
-    for doc in retrieved_docs:
-        # 각 문서의 page_content에서 name과 type을 파싱
-        lines = doc.page_content.split("\n")
-        name_line = next((line for line in lines if line.startswith("name:")), None)
-        type_line = next((line for line in lines if line.startswith("type:")), None)
-        breed = name_line.split(":")[-1].strip()  # name 값 추출
-        breed_type_info = type_line.split(":")[-1].strip()  # type 값 추출
-    if breed:
-        extracted_pet.breed = breed
-    if breed_type_info:
-        extracted_pet.breed_type = breed_type_info
+def fill_breed_type(extracted_pet: Pet, breed_match: BreedMatch) -> Pet:
+    extracted_pet.breed = breed_match.name
+    extracted_pet.breed_type = breed_match.breed_type
     return extracted_pet
 
 
-def fill_reservation_info(query: str) -> Reservation:
-    return fill_reservation_info_runnable.invoke({"query": query})
+def parse_breed_document(document) -> BreedMatch:
+    # vector db 문서의 page_content에서 name과 type을 파싱
+    lines = document.page_content.split("\n")
+    name_line = next((line for line in lines if line.startswith("name:")), None)
+    type_line = next((line for line in lines if line.startswith("type:")), None)
+    return BreedMatch(
+        name=name_line.split(":")[-1].strip(),
+        breed_type=type_line.split(":")[-1].strip(),
+        score=0.0,
+        matched="",
+    )
+
+
+def _fill_from_slots(reservation: ParsedReservation, slots: dict):
+    # 이번 문장에 없는 값은 이전 턴에서 확정된 slot으로 채운다
+    reservation.service_name = reservation.service_name or slots.get("service_name")
+    reservation.reservation_date = reservation.reservation_date or slots.get(
+        "reservation_date"
+    )
+    reservation.weight = reservation.weight or (slots.get("pet") or {}).get("weight")
+    quoted_services = slots.get("quoted_services") or {}
+    # 안내했던 가격표에 있는 서비스면 그 가격을 그대로 쓴다
+    if reservation.service_name in quoted_services:
+        reservation.price = quoted_services[reservation.service_name]
+    elif reservation.price is None and reservation.service_name == slots.get(
+        "service_name"
+    ):
+        reservation.price = slots.get("price")
+
+
+def _pet_change_slots(known_pet: dict, breed: Optional[str], weight: Optional[float]) -> dict:
+    """이전에 확정된 강아지와 품종이나 몸무게가 달라졌을 때 비워야 하는 slot.
+
+    품종이 바뀌면 다른 강아지이므로 고른 서비스까지, 몸무게만 바뀌면 가격을 비운다.
+    그대로 두면 _fill_from_slots가 이전 강아지의 가격으로 예약한다.
+    """
+    if known_pet.get("breed") not in (None, breed):
+        return {"quoted_services": None, "service_name": None, "price": None}
+    if known_pet.get("weight") not in (None, weight):
+        return {"quoted_services": None, "price": None}
+    return {}
+
+
+def fill_reservation_info(query: str, slots: Optional[dict] = None) -> ParsedReservation:
+    slots = slots or {}
+    # 규칙 기반 파서 + slot으로 필수 필드를 모두 채울 수 있으면 LLM을 호출하지 않는다
+    reservation = parse_reservation(query)
+    _fill_from_slots(reservation, slots)
+    record_parse_result(reservation.is_complete())
+    print(f"reservation parser hit rate: {parser_hit_rate():.0%}")
+    if not reservation.is_complete():
+        extracted: QuoteRequest = fill_quote_request_runnable.invoke({"query": query})
+        reservation.reservation_date = (
+            reservation.reservation_date or extracted.reservation_date
+        )
+        reservation.service_name = reservation.service_name or extracted.service_name
+        reservation.weight = reservation.weight or extracted.weight
+        reservation.price = reservation.price or extracted.price
+        _fill_from_slots(reservation, slots)
+    return reservation
+
+
+def fill_pet_info(query: str) -> Pet:
+    quote_request: QuoteRequest = fill_quote_request_runnable.invoke({"query": query})
+    return quote_request.to_pet()
 
 
-@tool
-def get_service_menu(query: str):
+async def afill_pet_info(query: str) -> Pet:
+    quote_request: QuoteRequest = await fill_quote_request_runnable.ainvoke(
+        {"query": query}
+    )
+    return quote_request.to_pet()
+
+
+def _resolve_breed(query: str, known_pet: dict) -> Optional[BreedMatch]:
+    """로컬 품종 인덱스로 품종을 찾는다. 확신할 수 없으면 None (vector search + grader로 확인)"""
+    breed_match = breed_index.resolve(query)
+    if breed_match is not None and breed_match.score >= BREED_MATCH_THRESHOLD:
+        return breed_match
+    if known_pet.get("breed") and not breed_index.mentions_breed(query):
+        # 이번 문장에 품종이 없으면 이전에 확정된 품종을 그대로 쓴다.
+        # 애매하게라도 다른 품종을 말했으면 이전 품종으로 넘기지 않고 vector search로 확인한다
+        return BreedMatch(
+            name=known_pet["breed"],
+            breed_type=known_pet["breed_type"],
+            score=1.0,
+            matched="",
+        )
+    return None
+
+
+def _service_menu(pet_info: Pet, known_pet: dict, weight_from_slots: bool):
+    """확정된 품종과 몸무게로 가격표를 만들고 slot을 갱신한다."""
+    if weight_from_slots and known_pet.get("breed") != pet_info.breed:
+        # 다른 강아지에게 이전 강아지의 몸무게를 쓰지 않는다
+        pet_info.weight = None
+    if not pet_info.weight:
+        return "강아지 몸무게를 알려주세요. 예: '포메라니안, 5kg'", {
+            "slots": {
+                **_pet_change_slots(known_pet, pet_info.breed, None),
+                "reservation_in_progress": True,
+                "pet": {
+                    "breed": pet_info.breed,
+                    "breed_type": pet_info.breed_type,
+                    "weight": None,
+                },
+            }
+        }
+    # weight_range 계산과 breed_type 4의 kg당 가격 계산은 pricing 모듈에서 처리
+    services = price_table.quote(int(pet_info.breed_type), pet_info.weight)
+    slot_update = {
+        **_pet_change_slots(known_pet, pet_info.breed, pet_info.weight),
+        "reservation_in_progress": True,
+        "pet": {
+            "breed": pet_info.breed,
+            "breed_type": pet_info.breed_type,
+            "weight": pet_info.weight,
+        },
+        "quoted_services": {
+            service["service_name"]: service["price"] for service in services
+        },
+    }
+    if pet_info.name:
+        slot_update["pet"]["name"] = pet_info.name
+    return services, {"slots": slot_update}
+
+
+def _print_timings(timings: dict[str, float]):
+    print(
+        "get_service_menu timings: "
+        + ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in timings.items())
+    )
+
+
+def _get_service_menu(query: str, state: Annotated[dict, InjectedState]):
     """
     Retrieves the available services based on the provided query describing the pet.
 
     Steps:
     1. Extracts pet information such as breed type, weight, and other attributes.
-    2. Maps the weight to the appropriate weight range using the weight dictionary.
-    3. Fetches the services available for the given breed type and weight range from the database.
+    2. Maps the weight to the appropriate weight range.
+    3. Looks up the services and prices for the given breed type and weight range in the price table.
 
     Note:
         - This tool must be used to select services when making a grooming reservation for your pet.
         - Without using this tool, it is not possible to proceed with a grooming reservation as it ensures
           accurate matching of services based on the pet's breed type and weight range.
     """
-    documents = breeds_database.similarity_search(query, k=1)
-    grade_result = retrieval_grader.invoke(
-        {"document": documents[0].page_content, "question": query}
+    # sync 그래프에서는 LLM 추출을 스레드에서 돌린다. 호출마다 asyncio.run으로 새 event loop를 만들면
+    # 공유하는 ChatOpenAI의 async 연결 풀이 닫힌 loop에 묶여서 다음 호출이 느려지거나 실패한다
+    known_pet = (state.get("slots") or {}).get("pet") or {}
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    parsed_weight = parse_weight(query)
+    weight = parsed_weight or known_pet.get("weight")
+    pet_future = None
+    if weight is None:
+        pet_future = _extraction_executor.submit(fill_pet_info, query)
+    try:
+        stage_started = time.perf_counter()
+        breed_match = _resolve_breed(query, known_pet)
+        timings["breed_index"] = time.perf_counter() - stage_started
+        if breed_match is None:
+            stage_started = time.perf_counter()
+            documents = get_breeds_database().similarity_search(query, k=1)
+            timings["vector_search"] = time.perf_counter() - stage_started
+            stage_started = time.perf_counter()
+            grade_result = retrieval_grader.invoke(
+                {"document": documents[0].page_content, "question": query}
+            )
+            timings["grader"] = time.perf_counter() - stage_started
+            if grade_result.binary_score == "no":
+                return "강아지 품종명을 정확하게 알려주세요. 예: '포메라니안, 5kg'", {}
+            breed_match = parse_breed_document(documents[0])
+        pet_info = Pet(name=None, breed_type=None, breed=None, weight=weight, age=None)
+        if pet_future is not None:
+            pet_info = pet_future.result()
+    finally:
+        # 품종을 못 찾아 먼저 끝나는 경우 아직 시작하지 않은 추출은 취소
+        if pet_future is not None:
+            pet_future.cancel()
+        timings["total"] = time.perf_counter() - started
+        _print_timings(timings)
+    return _service_menu(
+        fill_breed_type(pet_info, breed_match),
+        known_pet,
+        weight_from_slots=parsed_weight is None and pet_future is None,
     )
-    if grade_result.binary_score == "no":
-        return "강아지 품종명을 정확하게 알려주세요. 예: '포메라니안, 5kg'"
-    pet_info: Pet = fill_breed_type(query, documents)
-    weight_range = grade_weight_range_chain.invoke(
-        {"pet_info": pet_info, "weight_dictionary": weight_dictionary}
+
+
+async def _aget_service_menu(query: str, state: Annotated[dict, InjectedState]):
+    known_pet = (state.get("slots") or {}).get("pet") or {}
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+
+    async def timed(stage: str, coro):
+        stage_started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[stage] = time.perf_counter() - stage_started
+
+    # 무게는 문장에서 바로 찾거나 이전 턴에서 확정된 값을 쓰고, 둘 다 없을 때만 LLM으로 추출한다.
+    # 품종 검색(vector search -> grader)과 LLM 추출은 서로 독립적이라 동시에 실행한다
+    parsed_weight = parse_weight(query)
+    weight = parsed_weight or known_pet.get("weight")
+    pet_task = None
+    if weight is None:
+        pet_task = asyncio.create_task(timed("pet_extraction", afill_pet_info(query)))
+    try:
+        stage_started = time.perf_counter()
+        breed_match = _resolve_breed(query, known_pet)
+        timings["breed_index"] = time.perf_counter() - stage_started
+        if breed_match is None:
+            # 로컬 품종 인덱스로 확신할 수 없을 때만 vector search + grader를 사용
+            documents = await timed(
+                "vector_search", get_breeds_database().asimilarity_search(query, k=1)
+            )
+            grade_result = await timed(
+                "grader",
+                retrieval_grader.ainvoke(
+                    {"document": documents[0].page_content, "question": query}
+                ),
+            )
+            if grade_result.binary_score == "no":
+                return "강아지 품종명을 정확하게 알려주세요. 예: '포메라니안, 5kg'", {}
+            breed_match = parse_breed_document(documents[0])
+        pet_info = Pet(name=None, breed_type=None, breed=None, weight=weight, age=None)
+        if pet_task is not None:
+            pet_info = await pet_task
+    finally:
+        # 품종을 못 찾아 먼저 끝나는 경우 진행 중인 추출은 필요 없으므로 취소
+        if pet_task is not None and not pet_task.done():
+            pet_task.cancel()
+        timings["total"] = time.perf_counter() - started
+        _print_timings(timings)
+    return _service_menu(
+        fill_breed_type(pet_info, breed_match),
+        known_pet,
+        weight_from_slots=parsed_weight is None and pet_task is None,
     )
-    if pet_info.breed_type != "4":
-        return get_service_by_breed_and_weight(int(pet_info.breed_type), weight_range)
-    else:
-        service_data = get_service_by_breed_and_weight(
-            3, weight_range
-        )  # 일단 3으로 설정하고 다시 세팅, DB에 데이터가 없음
-        price_per_kg = {
-            "위생미용+목욕": 7000,
-            "클리핑": 10000,
-            "스포팅": 13000,
-            "가위컷": 20000,
-            "위생미용": 5000,
-        }
-        for service in service_data.data:
-            service_name = service["service_name"]
-            if service_name in price_per_kg:
-                service["price"] = price_per_kg[service_name] * int(pet_info.weight)
-    return service_data
 
 
-@tool
+# ToolNode를 sync로 실행하면 func, async로 실행하면 coroutine이 호출된다
+get_service_menu = StructuredTool.from_function(
+    func=_get_service_menu,
+    coroutine=_aget_service_menu,
+    name="get_service_menu",
+    response_format="content_and_artifact",
+)
+
+
+@tool(response_format="content_and_artifact")
+def quote_price(
+    breed: str,
+    weight: float,
+    state: Annotated[dict, InjectedState],
+    service_name: Optional[str] = None,
+):
+    """
+    Quickly answers a grooming price question from the precomputed quote table.
+
+    Args:
+        breed: The breed of the pet (ex: 말티즈)
+        weight: The weight of the pet in kg (ex: 7)
+        service_name: The grooming service the user asked about (ex: 가위컷). Leave empty to get every service.
+
+    Note:
+        - Use this tool when the user only asks how much a grooming service costs.
+        - To make a reservation, use the `get_service_menu` tool instead.
+    """
+    breed_match = breed_index.resolve(breed)
+    if breed_match is None or breed_match.score < BREED_MATCH_THRESHOLD:
+        return "강아지 품종명을 정확하게 알려주세요. 예: '포메라니안, 5kg'", {}
+    quotes = quote_matrix.lookup(breed_match.name, weight, service_name)
+    if not quotes:
+        return (
+            f"'{service_name}' 서비스를 찾을 수 없습니다. "
+            f"가능한 서비스: {', '.join(price_table.service_names)}"
+        ), {}
+    known_pet = (state.get("slots") or {}).get("pet") or {}
+    slot_update = {
+        **_pet_change_slots(known_pet, breed_match.name, weight),
+        "pet": {
+            "breed": breed_match.name,
+            "breed_type": breed_match.breed_type,
+            "weight": weight,
+        },
+    }
+    if service_name is not None:
+        slot_update.update(
+            {"service_name": quotes[0]["service_name"], "price": quotes[0]["price"]}
+        )
+    return {"breed": breed_match.name, "weight": weight, "services": quotes}, {
+        "slots": slot_update
+    }
+
+
+@tool(response_format="content_and_artifact")
 def make_reservation(
     query: str,
     config: RunnableConfig,
+    state: Annotated[dict, InjectedState],
 ):
     """
     Creates a reservation for a pet grooming service.
@@ -156,9 +437,46 @@ def make_reservation(
         - Ensure to include both **date** and **time** in the reservation query to successfully schedule the grooming service.
         - The **price** of the selected service must be included and stored when creating the reservation.
     """
-    reservation_info: Reservation = fill_reservation_info(query)
+    reservation = fill_reservation_info(query, state.get("slots"))
+    slot_update = {
+        "service_name": reservation.service_name,
+        "price": reservation.price,
+        "reservation_date": reservation.reservation_date,
+        "reservation_in_progress": True,
+    }
+    if not reservation.is_complete():
+        missing = [
+            label
+            for label, value in (
+                ("예약 날짜와 시간", reservation.reservation_date),
+                ("서비스", reservation.service_name),
+                ("가격", reservation.price),
+            )
+            if value is None
+        ]
+        # 지금까지 확인된 값은 slot에 남겨두고 부족한 정보만 다시 묻는다
+        return f"예약에 필요한 정보가 부족합니다: {', '.join(missing)}", {
+            "slots": slot_update
+        }
+
+    reservation_info = Reservation(
+        service_name=reservation.service_name,
+        weight=reservation.weight,
+        reservation_date=reservation.reservation_date,
+        price=reservation.price,
+        phone=None,
+    )
     response = create_reservation(reservation_info=reservation_info, phone=config["configurable"]["phone_number"])
-    return response
+    # 예약이 끝났으므로 다음 예약을 위해 안내한 가격표, 서비스, 가격, 날짜는 비운다
+    return response, {
+        "slots": {
+            "quoted_services": None,
+            "service_name": None,
+            "price": None,
+            "reservation_date": None,
+            "reservation_in_progress": False,
+        }
+    }
 
 
 # using co-star
@@ -168,6 +486,7 @@ add_reservation_assistant_prompt = ChatPromptTemplate.from_messages(
             "system",
             """
             You are assisting users in creating dog grooming reservations easily and quickly. You assist users in booking grooming appointments for their dogs by gathering necessary information.
+            If the user only asks about the price of grooming for a breed and weight, answer with the provided tool(quote_price).
             First, collect the dog’s breed and weight to determine the suitable grooming options using the provided tool(get_service_menu).
             if user already input what type of grooming service pass the show options and final check of price
             Then, display the available grooming options along with their prices. Finally, guide users to select a grooming service and their preferred date, and proceed to complete the reservation.
@@ -178,14 +497,16 @@ add_reservation_assistant_prompt = ChatPromptTemplate.from_messages(
             Dog owners, including those who are new to making grooming reservations.
             Provide questions in 2-3 sentences per step, wait for the user's input, and proceed to the next step based on their responses. Include examples to make it easier for the user.
             If the selected date is earlier than today, adjust it to the same date in the next year.
+            Information already confirmed in this conversation is given below. Reuse it instead of asking the user again.
             """
+            "\nConfirmed information: {slots}"
             "\nCurrent time: {time}.",
         ),
         ("human", "{messages}"),
     ]
 ).partial(time=datetime.now)
 
-rag_safe_tools = [get_service_menu]
+rag_safe_tools = [get_service_menu, quote_price]
 rag_sensitive_tools = [make_reservation]
 rag_sensitive_tool_names = {t.name for t in rag_sensitive_tools}
 rag_tools: list[Tool] = rag_safe_tools + rag_sensitive_tools
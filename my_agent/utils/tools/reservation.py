@@ -1,9 +1,12 @@
 from langchain.tools import Tool
 from langchain_core.tools import tool
 from my_agent.utils.rpc import (
-    get_reservations_by_phone,
+    UPCOMING_RESERVATIONS_LIMIT,
+    reservation_cache,
     update_reservation_date,
+    update_reservation_dates,
     cancel_reservation,
+    cancel_reservations,
 )
 from langchain_core.runnables.config import RunnableConfig
 
@@ -16,7 +19,6 @@ from langchain_core.runnables.config import RunnableConfig
 
 from langchain.tools import StructuredTool
 from pydantic import BaseModel, Field
-from datetime import datetime, timezone
 
 
 class UpdateReservationDateInput(BaseModel):
@@ -37,6 +39,33 @@ update_reservation = StructuredTool.from_function(
 )
 
 
+class UpdateReservationDatesInput(BaseModel):
+    updates: list[UpdateReservationDateInput] = Field(
+        ..., description="The reservations to update and their new dates"
+    )
+
+
+def _update_reservation_dates(updates: list[UpdateReservationDateInput]):
+    return update_reservation_dates(
+        [
+            update.model_dump() if isinstance(update, BaseModel) else dict(update)
+            for update in updates
+        ]
+    )
+
+
+update_reservations = StructuredTool.from_function(
+    func=_update_reservation_dates,
+    name="UpdateReservationDates",
+    description=(
+        "Update the dates of several existing reservations at once. "
+        "Use this instead of calling UpdateReservationDate repeatedly. "
+        "Returns ok/error for each reservation."
+    ),
+    args_schema=UpdateReservationDatesInput,
+)
+
+
 @tool
 def search_reservation(config: RunnableConfig):
     """
@@ -64,17 +93,14 @@ def search_reservation(config: RunnableConfig):
     # few shot
     phone_number = config.get("configurable", {}).get("phone_number")
     print(phone_number)
-    reservations = get_reservations_by_phone(phone_number)
-    current_time = datetime.now(timezone.utc)
-
-    # 현재시간 이후의 예약만 가져오기
-    upcoming_reservations = [
-        reservation
-        for reservation in reservations
-        if datetime.fromisoformat(reservation["reservation_date"]) > current_time
-    ]
-
-    return upcoming_reservations
+    # 현재 시각 이후 예약만, 필요한 필드만 DB에서 가져온다.
+    # 전화번호 입력 시 미리 채워 둔 캐시를 쓴다 (없거나 만료됐으면 RPC 조회)
+    reservations = reservation_cache.get(phone_number)
+    return {
+        "reservations": reservations[:UPCOMING_RESERVATIONS_LIMIT],
+        # 보여준 것보다 예약이 더 있으면 사용자에게 알려준다
+        "has_more": len(reservations) > UPCOMING_RESERVATIONS_LIMIT,
+    }
 
 
 # @tool
@@ -96,8 +122,23 @@ def delete_reservation(reservation_uuid: str):
     return cancel_reservation(reservation_uuid)
 
 
+@tool
+def delete_reservations(reservation_uuids: list[str]):
+    """
+    Cancel several existing reservations at once (e.g. "cancel all my bookings next week").
+    Use this instead of calling delete_reservation repeatedly.
+    Input: reservation_uuids (list of str). Output: ok/error for each reservation.
+    """
+    return cancel_reservations(reservation_uuids)
+
+
 primary_safe_tools = [search_reservation]
-primary_sensitive_tools = [update_reservation, delete_reservation]
+primary_sensitive_tools = [
+    update_reservation,
+    delete_reservation,
+    update_reservations,
+    delete_reservations,
+]
 primary_sensitive_tool_names = {t.name for t in primary_sensitive_tools}
 
 primary_tools: list[Tool] = primary_safe_tools + primary_sensitive_tools
@@ -1,17 +1,31 @@
 import streamlit as st
 from langchain_core.messages import HumanMessage
 from .db import (
-    get_sessions,
+    get_sessions_page,
+    count_sessions,
     create_session,
     update_session_name,
     delete_session,
+    search_messages,
+    SEARCH_PAGE_SIZE,
+)
+from .chat import (
+    set_selected_session,
+    get_selected_session,
+    has_older_messages,
+    load_older_messages,
 )
-from .chat import set_selected_session, get_selected_session
 
 
 def sidebar_ui():
     st.subheader("채팅방 관리")
-    sessions = get_sessions()
+    # 페이지별 시작 cursor (첫 페이지는 None)
+    cursors = st.session_state.setdefault("session_page_cursors", [None])
+    sessions, next_cursor = get_sessions_page(cursors[-1])
+    # 마지막 채팅방을 지워서 빈 페이지가 되면 채팅방이 있는 앞 페이지로 돌아간다
+    while not sessions and len(cursors) > 1:
+        cursors.pop()
+        sessions, next_cursor = get_sessions_page(cursors[-1])
     selected_session_id = None
 
     # CSS로 버튼 스타일 지정
@@ -35,13 +49,17 @@ def sidebar_ui():
         try:
             new_id = create_session("")  # 빈 이름으로 채팅방 생성
             set_selected_session(new_id)
+            # 새 채팅방이 보이도록 첫 페이지로 돌아간다
+            st.session_state.session_page_cursors = [None]
         except Exception as e:
             st.error(f"채팅방을 생성하는 중 오류가 발생했습니다: {e}")
         st.rerun()
 
+    search_ui()
+
     # 채팅방 목록 표시
     if sessions:
-        st.write("채팅방 목록")
+        st.write(f"채팅방 목록 ({count_sessions()})")
         for session_id, session_name in sessions:
             # 채팅방 선택 버튼과 관리 버튼을 가로로 배치
             col1, col2, col3 = st.columns([5, 2, 2])
@@ -96,11 +114,70 @@ def sidebar_ui():
                             st.session_state.pop(f"editing_{session_id}")
                             st.rerun()
 
+    # 목록이 비어 있어도 페이지 이동은 할 수 있도록 목록 밖에 둔다
+    col1, col2 = st.columns(2)
+    with col1:
+        if len(cursors) > 1 and st.button(
+            "이전", key="sessions_prev", use_container_width=True
+        ):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if next_cursor is not None and st.button(
+            "다음", key="sessions_next", use_container_width=True
+        ):
+            cursors.append(next_cursor)
+            st.rerun()
+
     return selected_session_id
 
 
+def search_ui():
+    """채팅 기록 검색창. 결과를 누르면 해당 채팅방으로 이동한다."""
+    query = st.text_input("대화 검색", key="history_search", placeholder="예) 스포팅")
+    if st.session_state.get("history_search_query") != query:
+        st.session_state.history_search_query = query
+        st.session_state.history_search_page = 0
+    if not query.strip():
+        return
+
+    page = st.session_state.history_search_page
+    # 다음 페이지가 있는지 알기 위해 한 개 더 가져온다
+    results = search_messages(query, SEARCH_PAGE_SIZE + 1, page * SEARCH_PAGE_SIZE)
+    if not results:
+        st.caption("검색 결과가 없습니다.")
+        return
+    for result in results[:SEARCH_PAGE_SIZE]:
+        session_name = result["session_name"].strip() or "제목 없음"
+        snippet = result["snippet"].replace("\n", " ")[:60]
+        if st.button(
+            f"{session_name} · {snippet}",
+            key=f"search_result_{result['message_id']}",
+            use_container_width=True,
+            disabled=st.session_state.button_disabled_state,
+        ):
+            set_selected_session(result["session_id"])
+            st.rerun()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if page > 0 and st.button("이전", key="search_prev", use_container_width=True):
+            st.session_state.history_search_page -= 1
+            st.rerun()
+    with col2:
+        if len(results) > SEARCH_PAGE_SIZE and st.button(
+            "다음", key="search_next", use_container_width=True
+        ):
+            st.session_state.history_search_page += 1
+            st.rerun()
+
+
 def display_messages(messages):
-    for msg in messages:
+    # rerun마다 최근 history_window개만 그린다
+    if has_older_messages() and st.button("이전 메시지 더 보기", key="load_older_messages"):
+        load_older_messages()
+        st.rerun()
+    for msg in messages[-st.session_state.history_window :]:
         role = "user" if isinstance(msg, HumanMessage) else "assistant"
         with st.chat_message(role):
             st.markdown(msg["content"] if isinstance(msg, dict) else msg.content)
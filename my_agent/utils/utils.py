@@ -2,16 +2,25 @@
 from langchain_core.runnables import RunnableLambda
 from langchain_core.messages import ToolMessage
 from langgraph.prebuilt import ToolNode
+from my_agent.utils.resilience import CircuitOpenError, DeadlineExceededError
 import re
 
 
 def handle_tool_error(state) -> dict:
     error = state.get("error")
     tool_calls = state["messages"][-1].tool_calls
+    if isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+        # 입력이 잘못된 게 아니라 예약 시스템이 응답하지 않는 경우. 같은 호출을 반복하지 않도록 알린다
+        content = (
+            f"Error: {repr(error)}\n the reservation system is temporarily unavailable."
+            " do not retry; ask the user to try again in a moment."
+        )
+    else:
+        content = f"Error: {repr(error)}\n please fix your mistakes."
     return {
         "messages": [
             ToolMessage(
-                content=f"Error: {repr(error)}\n please fix your mistakes.",
+                content=content,
                 tool_call_id=tc["id"],
             )
             for tc in tool_calls
@@ -1,8 +1,32 @@
-from langchain_pinecone import PineconeVectorStore
-from my_agent.utils.embedding import embedding
-
-breeds_database_index = "breeds"
-breeds_database = PineconeVectorStore(
-    index_name=breeds_database_index,
-    embedding=embedding
-)
+from typing import TYPE_CHECKING
+from my_agent.utils.embedding import get_embedding
+from my_agent.utils.registry import registry
+from my_agent.utils.settings import get_settings
+
+if TYPE_CHECKING:
+    from langchain_core.vectorstores import VectorStore
+
+
+def get_breeds_database() -> "VectorStore":
+    """품종 벡터 DB. BREEDS_VECTOR_STORE에 따라 Pinecone이나 로컬 스냅샷을 처음 호출될 때 연다."""
+    settings = get_settings()
+    if settings.breeds_vector_store == "local":
+
+        def build_local(path: str) -> "VectorStore":
+            from my_agent.utils.local_vector_store import LocalVectorStore
+
+            return LocalVectorStore.load(path, get_embedding())
+
+        return registry.get("breeds_database", build_local, settings.local_breeds_index_path)
+
+    def build(index_name: str, api_key: str) -> "VectorStore":
+        from langchain_pinecone import PineconeVectorStore
+
+        return PineconeVectorStore(
+            index_name=index_name, embedding=get_embedding(), pinecone_api_key=api_key
+        )
+
+    settings.require("pinecone_api_key")
+    return registry.get(
+        "breeds_database", build, settings.pinecone_index_name, settings.pinecone_api_key
+    )
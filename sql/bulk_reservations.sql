@@ -0,0 +1,49 @@
+-- 여러 예약을 한 번의 RPC(한 트랜잭션)로 취소/변경하는 함수.
+-- 기존 단건 함수(cancel_reservation, update_reservation_date)를 그대로 재사용하며,
+-- 항목마다 savepoint(BEGIN ... EXCEPTION)로 감싸서 실패한 항목만 건너뛰고 결과를 항목별로 돌려준다.
+-- Supabase SQL editor에서 실행한다.
+
+create or replace function cancel_reservations(reservation_uuids uuid[])
+returns table (reservation_uuid uuid, ok boolean, error text)
+language plpgsql
+as $$
+declare
+  target uuid;
+begin
+  foreach target in array reservation_uuids loop
+    reservation_uuid := target;
+    begin
+      perform cancel_reservation(target);
+      ok := true;
+      error := null;
+    exception when others then
+      ok := false;
+      error := sqlerrm;
+    end;
+    return next;
+  end loop;
+end;
+$$;
+
+-- updates: [{"reservation_uuid": "...", "new_date": "YYYY-MM-DD HH:MM:SS"}, ...]
+create or replace function update_reservation_dates(updates jsonb)
+returns table (reservation_uuid uuid, ok boolean, error text)
+language plpgsql
+as $$
+declare
+  item jsonb;
+begin
+  for item in select * from jsonb_array_elements(updates) loop
+    reservation_uuid := (item ->> 'reservation_uuid')::uuid;
+    begin
+      perform update_reservation_date(reservation_uuid, (item ->> 'new_date')::timestamp);
+      ok := true;
+      error := null;
+    exception when others then
+      ok := false;
+      error := sqlerrm;
+    end;
+    return next;
+  end loop;
+end;
+$$;
@@ -0,0 +1,60 @@
+import pytest
+from my_agent.utils.breed_index import BREED_MATCH_THRESHOLD, breed_index
+
+
+@pytest.mark.parametrize(
+    "query, breed, breed_type",
+    [
+        ("말티즈 3kg", "말티즈", "1"),
+        ("비숑프리제 5kg", "비숑 프리제", "3"),
+        ("푸숑", "푸숑", "2"),
+        ("요크셔테리어", "요크셔 테리어(요키)", "1"),
+        ("골든 리트리바", "골든 리트리버", "4"),
+        ("포메라니언 5kg", "포메라니안", "2"),
+    ],
+)
+def test_resolves_exact_and_typo_names(query, breed, breed_type):
+    match = breed_index.resolve(query)
+    assert match is not None and match.score >= BREED_MATCH_THRESHOLD
+    assert (match.name, match.breed_type) == (breed, breed_type)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # 비숑푸(2) / 비숑 프리제(3)
+        "비숑 5kg",
+        # 말티슈(2) / 말티즈(1)
+        "말티스 3kg",
+    ],
+)
+def test_ambiguous_fuzzy_matches_defer_to_vector_search(query):
+    match = breed_index.resolve(query)
+    assert match is None or match.score < BREED_MATCH_THRESHOLD
+
+
+@pytest.mark.parametrize(
+    "query, breed",
+    [
+        # 장모 닥스훈트가 있어도 닥스훈트는 그 자체로 품종이다
+        ("닥스훈트", "닥스훈트"),
+        ("장모 닥스훈트", "장모 닥스훈트"),
+        ("말티즈3kg", "말티즈"),
+        ("믹스견이에요", "믹스(혼합)"),
+        ("스탠다드 푸들 20kg", "스탠더드 푸들"),
+    ],
+)
+def test_exact_full_names_are_kept(query, breed):
+    match = breed_index.resolve(query)
+    assert match is not None and match.name == breed
+
+
+def test_longer_ambiguous_name_does_not_fall_back_to_short_exact_name(monkeypatch):
+    # 긴 품종명을 가릴 수 없을 때 '푸들'(2)로 확정하면 스탠더드 푸들(4)과 가격표가 달라진다
+    monkeypatch.setattr(breed_index, "_best_fuzzy", lambda scores, tokens: None)
+    assert breed_index.resolve("스탠다드 푸들 20kg") is None
+
+
+def test_breed_name_inside_another_word_is_not_exact():
+    match = breed_index.resolve("믹스커피 한잔")
+    assert match is None or match.score < BREED_MATCH_THRESHOLD
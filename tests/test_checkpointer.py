@@ -0,0 +1,67 @@
+from typing import TypedDict
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, interrupt
+from my_agent.utils.checkpointer import SqliteCheckpointer
+
+
+class State(TypedDict, total=False):
+    approvals: int
+    payload: str
+
+
+def build_graph(checkpointer):
+    def approve(state: State):
+        interrupt("approve?")
+        return {"approvals": state.get("approvals", 0) + 1}
+
+    builder = StateGraph(State)
+    builder.add_node("approve", approve)
+    builder.add_edge(START, "approve")
+    builder.add_edge("approve", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def count(checkpointer, table: str) -> int:
+    return checkpointer.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_resolved_interrupts_are_pruned(tmp_path):
+    checkpointer = SqliteCheckpointer(str(tmp_path / "checkpoints.db"), retain=5)
+    graph = build_graph(checkpointer)
+    config = {"configurable": {"thread_id": "thread-1"}}
+
+    for cycle in range(1, 21):
+        graph.invoke({"payload": "x"}, config)
+        # 승인 대기 중인 interrupt는 남아 있어야 재개할 수 있다
+        assert graph.get_state(config).next == ("approve",)
+        graph.invoke(Command(resume=True), config)
+        assert graph.get_state(config).values["approvals"] == cycle
+        assert count(checkpointer, "checkpoints") <= 5
+
+    # 재시작 후에도 대기 중인 interrupt를 이어갈 수 있다
+    graph.invoke({"payload": "x"}, config)
+    checkpointer.compact()
+    reopened = SqliteCheckpointer(checkpointer.path, retain=5)
+    graph = build_graph(reopened)
+    assert graph.get_state(config).next == ("approve",)
+    graph.invoke(Command(resume=True), config)
+    assert graph.get_state(config).values["approvals"] == 21
+    checkpointer.close()
+    reopened.close()
+
+
+def test_compact_frees_all_pages(tmp_path):
+    checkpointer = SqliteCheckpointer(str(tmp_path / "checkpoints.db"), retain=1)
+    graph = build_graph(checkpointer)
+    for i in range(50):
+        config = {"configurable": {"thread_id": f"thread-{i}"}}
+        graph.invoke({"payload": "x" * 100_000}, config)
+    checkpointer.conn.execute("DELETE FROM writes")
+    checkpointer.conn.execute("DELETE FROM checkpoints")
+    checkpointer.conn.commit()
+    freelist = checkpointer.conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert freelist > 1
+
+    checkpointer.compact()
+    assert checkpointer.conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    checkpointer.close()
@@ -0,0 +1,216 @@
+import sqlite3
+import threading
+import time
+import pytest
+from my_agent.utils import db
+
+
+@pytest.fixture
+def chat_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "chat_history.db"))
+    monkeypatch.setattr(db, "WRITE_RETRY_BACKOFF", 0.001)
+    monkeypatch.setattr(db, "message_writer", db.MessageWriter())
+    db.init_db()
+    return db.create_session("test")
+
+
+def contents(messages) -> list[str]:
+    return [message.content for message in messages]
+
+
+def test_load_history_sees_batch_committed_during_select(chat_db, monkeypatch):
+    writer = db.message_writer
+    gate = threading.Event()
+    real_save = writer._save
+    monkeypatch.setattr(writer, "_save", lambda rows: (gate.wait(), real_save(rows)))
+    db.save_message(chat_db, "user", "안녕하세요")
+
+    class CommitAfterSelect:
+        """SELECT 결과를 읽은 직후 writer가 batch를 저장하도록 만든다."""
+
+        def __init__(self, conn):
+            self.conn = conn
+
+        def execute(self, *args):
+            rows = self.conn.execute(*args).fetchall()
+            gate.set()
+            writer.flush()
+            return type("Cursor", (), {"fetchall": lambda _: rows})()
+
+    real_get_connection = db.get_connection
+    reader = threading.current_thread()
+    monkeypatch.setattr(
+        db,
+        "get_connection",
+        lambda: (
+            CommitAfterSelect(real_get_connection())
+            if threading.current_thread() is reader
+            else real_get_connection()
+        ),
+    )
+    assert contents(db.load_history(chat_db)) == ["안녕하세요"]
+
+
+def test_pending_and_saved_messages_are_not_duplicated(chat_db):
+    db.save_message(chat_db, "user", "a")
+    db.message_writer.flush()
+    db.save_message(chat_db, "assistant", "b")
+    assert contents(db.load_history(chat_db)) == ["a", "b"]
+    db.message_writer.flush()
+    assert contents(db.load_history(chat_db)) == ["a", "b"]
+
+
+def test_writer_retries_transient_errors(chat_db, monkeypatch):
+    real_transaction = db.transaction
+    failures = iter([True, True])
+
+    def flaky_transaction():
+        if next(failures, False):
+            raise sqlite3.OperationalError("database is locked")
+        return real_transaction()
+
+    monkeypatch.setattr(db, "transaction", flaky_transaction)
+    db.save_message(chat_db, "user", "a")
+    db.message_writer.flush()
+    assert contents(db.load_history(chat_db)) == ["a"]
+    assert db.message_writer.pending_messages(chat_db) == []
+
+
+@pytest.mark.parametrize("error", [sqlite3.OperationalError("disk I/O error"), ValueError("bug")])
+def test_writer_keeps_failed_messages_and_survives(chat_db, monkeypatch, error):
+    real_transaction = db.transaction
+    broken = True
+
+    def transaction():
+        if broken:
+            raise error
+        return real_transaction()
+
+    monkeypatch.setattr(db, "transaction", transaction)
+    db.save_message(chat_db, "user", "a")
+    with pytest.raises(RuntimeError):
+        db.message_writer.flush()
+    # 저장하지 못한 메시지는 버리지 않고 화면에는 계속 보인다
+    assert contents(db.load_history(chat_db)) == ["a"]
+    assert db.message_writer.thread.is_alive()
+
+    broken = False
+    db.save_message(chat_db, "assistant", "b")
+    db.message_writer.flush()
+    assert contents(db.load_history(chat_db)) == ["a", "b"]
+    saved = db.get_connection().execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    assert saved == 2
+
+
+@pytest.fixture
+def broken_transaction(monkeypatch):
+    """state["broken"]가 True인 동안 저장이 실패한다."""
+    real_transaction = db.transaction
+    state = {"broken": False}
+
+    def transaction():
+        if state["broken"]:
+            raise sqlite3.OperationalError("disk I/O error")
+        return real_transaction()
+
+    monkeypatch.setattr(db, "transaction", transaction)
+    return state
+
+
+def saved_contents() -> list[str]:
+    rows = db.get_connection().execute("SELECT content FROM messages ORDER BY id")
+    return [row[0] for row in rows]
+
+
+def test_failed_messages_are_retried_without_new_messages(chat_db, broken_transaction):
+    db.message_writer.retry_interval = 0.01
+    broken_transaction["broken"] = True
+    db.save_message(chat_db, "user", "a")
+    with pytest.raises(RuntimeError):
+        db.message_writer.flush()
+    broken_transaction["broken"] = False
+    deadline = time.monotonic() + 5
+    while db.message_writer.pending_messages(chat_db) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert saved_contents() == ["a"]
+    db.message_writer.flush()
+
+
+def test_delete_session_ignores_failures_of_other_sessions(chat_db, broken_transaction):
+    other = db.create_session("other")
+    broken_transaction["broken"] = True
+    db.save_message(chat_db, "user", "deleted")
+    db.save_message(other, "user", "kept")
+    with pytest.raises(RuntimeError):
+        db.message_writer.flush()
+    broken_transaction["broken"] = False
+    db.delete_session(chat_db)
+    assert db.message_writer.pending_messages(chat_db) == []
+    assert [row[0] for row in db.message_writer.failed] in ([other], [])
+    db.message_writer.retry_interval = 0.01
+    db.save_message(other, "assistant", "next")
+    db.message_writer.flush()
+    assert saved_contents() == ["kept", "next"]
+
+
+def test_close_logs_instead_of_raising(chat_db, broken_transaction, capsys):
+    broken_transaction["broken"] = True
+    db.save_message(chat_db, "user", "a")
+    db.message_writer.close()
+    assert "Dropping 1 unsaved chat messages" in capsys.readouterr().out
+
+
+@pytest.fixture
+def empty_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "chat_history.db"))
+    monkeypatch.setattr(db, "message_writer", db.MessageWriter())
+    return db
+
+
+def user_version() -> int:
+    return db.get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_failed_migration_rolls_back_schema_and_version(empty_db, monkeypatch):
+    def broken(c):
+        raise sqlite3.OperationalError("broken migration")
+
+    monkeypatch.setattr(db, "MIGRATIONS", db.MIGRATIONS + (broken,))
+    with pytest.raises(sqlite3.OperationalError):
+        db.init_db()
+    assert user_version() == 0
+    assert not db._has_search_index()
+    tables = db.get_connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    assert tables.fetchall() == []
+
+
+def test_search_index_is_created_after_sqlite_upgrade(empty_db, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(db.sqlite3, "sqlite_version_info", (3, 33, 0))
+        db.init_db()
+    assert user_version() == len(db.MIGRATIONS)
+    assert not db._has_search_index()
+
+    session_id = db.create_session("test")
+    db.save_message(session_id, "user", "강아지 미용 예약")
+    db.message_writer.flush()
+    db.init_db()
+    assert db._has_search_index()
+    assert [hit["message_id"] for hit in db.search_messages("미용 예약")]
+
+
+def test_search_results_are_cached_until_a_new_message_is_saved(chat_db, monkeypatch):
+    db.save_message(chat_db, "user", "미용 문의")
+    db.message_writer.flush()
+    real_get_connection = db.get_connection
+    queries = []
+    monkeypatch.setattr(db, "get_connection", lambda: queries.append(1) or real_get_connection())
+    # Streamlit rerun마다 같은 검색을 다시 해도 DB는 한 번만 읽는다
+    assert len(db.search_messages("미용")) == 1
+    reads = len(queries)
+    assert len(db.search_messages("미용")) == 1
+    assert len(queries) == reads
+
+    db.save_message(chat_db, "assistant", "미용 가격 안내")
+    db.message_writer.flush()
+    assert len(db.search_messages("미용")) == 2
@@ -0,0 +1,90 @@
+import itertools
+import json
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from my_agent.utils import pre_router
+from my_agent.utils.settings import Settings
+
+
+@pytest.fixture
+def settings(monkeypatch, tmp_path):
+    settings = Settings(_env_file=None, routing_log_path=str(tmp_path / "routing_log.jsonl"))
+    monkeypatch.setattr(pre_router, "get_settings", lambda: settings)
+    monkeypatch.setattr(pre_router, "_model", pre_router.NgramRouteModel())
+    return settings
+
+
+def test_routing_log_is_opt_in(settings, tmp_path):
+    pre_router.log_routing_decision("홍길동 010-1234-5678 예약해주세요", "rag_assistant")
+    assert not (tmp_path / "routing_log.jsonl").exists()
+    # 파일에 남기지 않아도 현재 프로세스의 모델에는 반영된다
+    assert pre_router._model.size == 1
+
+
+def test_routing_log_redacts_contact_details(settings, tmp_path):
+    settings.routing_log_enabled = True
+    pre_router.log_routing_decision("01012345678, a.b@example.com 으로 연락 주세요", "rag_assistant")
+    record = json.loads((tmp_path / "routing_log.jsonl").read_text(encoding="utf-8"))
+    assert record == {"text": "<phone>, <email> 으로 연락 주세요", "route": "rag_assistant", "source": "llm"}
+
+
+def conversation(reply: str) -> list:
+    return [HumanMessage("안녕하세요"), AIMessage("오늘 날씨 어때요?"), HumanMessage(reply)]
+
+
+def test_question_mark_alone_does_not_keep_the_route():
+    assert pre_router._sticky_decision(conversation("강아지 간식 추천해줘"), "rag_assistant") is None
+
+
+@pytest.mark.parametrize(
+    "reply, slots",
+    [
+        ("네", None),
+        ("다음주 목요일이 좋겠어요 괜찮을까요", {"reservation_in_progress": True}),
+    ],
+)
+def test_sticks_while_waiting_for_an_answer(reply, slots):
+    decision = pre_router._sticky_decision(conversation(reply), "rag_assistant", slots)
+    assert decision is not None and decision.route == "rag_assistant"
+
+
+def test_finished_booking_does_not_keep_the_route():
+    # 예약을 마친 뒤에도 가격표가 남아 있다고 rag_assistant(조회 도구 없음)로 보내면 안 된다
+    slots = {"quoted_services": {"가위컷": 70000}, "reservation_in_progress": False}
+    messages = conversation("제 강아지 예약된 거 언제였죠?")
+    assert pre_router._sticky_decision(messages, "rag_assistant", slots) is None
+
+
+def test_breed_inside_another_word_is_not_a_rule_hit():
+    assert pre_router._rule_decision("믹스커피 한잔") is None
+    decision = pre_router._rule_decision("믹스견이에요")
+    assert decision is not None and decision.route == "rag_assistant"
+
+
+def trained_model(terminate_examples: int) -> pre_router.NgramRouteModel:
+    examples = {
+        "rag_assistant": ["말티즈 3kg 가위컷 얼마예요", "포메 미용 가격 알려주세요", "목욕 비용이 궁금해요"],
+        "reservation_assistant": ["예약 취소해주세요", "제 예약 확인해줘", "예약 날짜 변경하고 싶어요"],
+        "terminate": ["날씨가 좋네요", "영업시간 알려줘", "ㅋㅋㅋ"],
+    }
+    model = pre_router.NgramRouteModel()
+    for route, texts in examples.items():
+        count = terminate_examples if route == "terminate" else 30
+        for text in itertools.islice(itertools.cycle(texts), count):
+            model.add(text, route)
+    return model
+
+
+def test_ngram_model_needs_examples_of_every_route():
+    assert trained_model(terminate_examples=0).predict("말티즈 미용 가격") is None
+
+
+@pytest.mark.parametrize("text", ["아 그리고 혹시 주차 되나요", "제 강아지 털이 많이 빠져요"])
+def test_ngram_model_leaves_unseen_text_to_the_llm_router(text):
+    assert trained_model(terminate_examples=12).predict(text) is None
+
+
+def test_ngram_model_routes_familiar_text():
+    decision = trained_model(terminate_examples=12).predict("말티즈 미용 가격")
+    assert decision is not None and decision.route == "rag_assistant"
+    assert decision.confidence >= pre_router.PRE_ROUTER_THRESHOLD
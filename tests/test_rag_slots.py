@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+from langchain_core.documents import Document
+from my_agent.utils.breed_index import breed_index
+from my_agent.utils.reservation_parser import parse_reservation
+from my_agent.utils.state import merge_slots
+from my_agent.utils.tools import rag
+
+MALTESE = {
+    "pet": {"breed": "말티즈", "breed_type": "1", "weight": 3.0},
+    "quoted_services": {"가위컷": 55000},
+    "service_name": "가위컷",
+    "price": 55000,
+}
+
+
+class NoVectorSearch:
+    """vector search까지 가면 실패시킨다. 이전 품종을 이어 쓰는 경우에는 호출되면 안 된다"""
+
+    def similarity_search(self, query, k=1):
+        raise AssertionError(f"unexpected vector search for {query!r}")
+
+    async def asimilarity_search(self, query, k=1):
+        return self.similarity_search(query, k)
+
+
+@pytest.fixture(params=["sync", "async"])
+def service_menu(request):
+    """ToolNode가 sync로 실행할 때와 async로 실행할 때의 get_service_menu"""
+    if request.param == "sync":
+        return lambda query, slots: rag._get_service_menu(query, {"slots": slots})
+    return lambda query, slots: asyncio.run(rag._aget_service_menu(query, {"slots": slots}))
+
+
+@pytest.fixture(autouse=True)
+def no_vector_search(monkeypatch):
+    monkeypatch.setattr(rag, "get_breeds_database", NoVectorSearch)
+
+
+def test_reuses_breed_when_none_is_mentioned(service_menu):
+    services, artifact = service_menu("5kg로 다시 알려주세요", MALTESE)
+    slots = artifact["slots"]
+    assert slots["pet"] == {"breed": "말티즈", "breed_type": "1", "weight": 5.0}
+    # 몸무게가 바뀌면 이전 가격으로 예약되지 않도록 가격을 비운다
+    assert slots["price"] is None
+    assert slots["quoted_services"] == {s["service_name"]: s["price"] for s in services}
+
+
+def test_ambiguous_new_breed_is_not_replaced_by_previous_breed(service_menu, monkeypatch):
+    class NotABreed:
+        binary_score = "no"
+
+    class Grader:
+        def invoke(self, _):
+            return NotABreed()
+
+        async def ainvoke(self, _):
+            return NotABreed()
+
+    class Documents:
+        def similarity_search(self, query, k=1):
+            return [Document(page_content="name: 비숑 프리제\ntype: 3")]
+
+        async def asimilarity_search(self, query, k=1):
+            return self.similarity_search(query, k)
+
+    monkeypatch.setattr(rag, "get_breeds_database", Documents)
+    monkeypatch.setattr(rag, "retrieval_grader", Grader())
+    message, artifact = service_menu("비숑 5kg", MALTESE)
+    assert "품종" in message and artifact == {}
+
+
+def test_new_breed_clears_the_previous_pet(service_menu):
+    message, artifact = service_menu("이번엔 시츄예요", MALTESE)
+    assert "몸무게" in message
+    assert artifact["slots"] == {
+        "quoted_services": None,
+        "service_name": None,
+        "price": None,
+        "reservation_in_progress": True,
+        "pet": {"breed": "시츄", "breed_type": "1", "weight": None},
+    }
+
+
+def test_quote_price_for_another_pet_drops_stale_quotes():
+    _, artifact = rag.quote_price.func("포메라니안", 4, {"slots": MALTESE})
+    slots = artifact["slots"]
+    assert slots["quoted_services"] is None and slots["service_name"] is None
+    reservation = parse_reservation("12월 20일 오후 2시 가위컷")
+    rag._fill_from_slots(reservation, merge_slots(MALTESE, slots))
+    assert reservation.price is None
+
+
+def test_mentions_breed():
+    assert breed_index.mentions_breed("비숑 5kg")
+    assert not breed_index.mentions_breed("가격 다시 알려주세요")
+
+
+def test_sync_path_extracts_in_a_thread_without_an_event_loop(monkeypatch):
+    # 호출마다 asyncio.run으로 loop를 만들면 공유하는 LLM client의 async 연결 풀이 닫힌 loop에 묶인다
+    monkeypatch.setattr(asyncio, "run", None)
+    extracted = []
+
+    def fill_pet_info(query):
+        extracted.append(query)
+        return rag.Pet(name="콩이", breed_type=None, breed=None, weight=4.0, age=None)
+
+    monkeypatch.setattr(rag, "fill_pet_info", fill_pet_info)
+    for _ in range(2):
+        services, artifact = rag._get_service_menu("말티즈예요", {"slots": {}})
+        assert artifact["slots"]["pet"] == {
+            "breed": "말티즈",
+            "breed_type": "1",
+            "weight": 4.0,
+            "name": "콩이",
+        }
+    assert extracted == ["말티즈예요", "말티즈예요"]
+
+
+def test_booking_clears_the_finished_reservation(monkeypatch):
+    booked = []
+    monkeypatch.setattr(
+        rag, "create_reservation", lambda reservation_info, phone: booked.append(reservation_info)
+    )
+    slots = merge_slots(MALTESE, {"reservation_date": "2099-12-20 14:00:00"})
+    _, artifact = rag.make_reservation.func(
+        "가위컷으로 예약해주세요", {"configurable": {"phone_number": "01012345678"}}, {"slots": slots}
+    )
+    assert booked[0].price == 55000
+    assert artifact["slots"] == {
+        "quoted_services": None,
+        "service_name": None,
+        "price": None,
+        "reservation_date": None,
+        "reservation_in_progress": False,
+    }
@@ -0,0 +1,49 @@
+import pytest
+from my_agent.utils.reservation_backend import CANCELLED_STATUS, SqliteReservationBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SqliteReservationBackend(str(tmp_path / "reservations.db"))
+    yield backend
+    backend.close()
+
+
+def reserve(backend) -> str:
+    return backend.create_reservation(
+        {
+            "phone": "01012345678",
+            "service_name": "가위컷",
+            "weight": 3,
+            "reservation_date": "2024-12-20T14:00:00",
+            "price": 70000,
+            "status": "reserved",
+        }
+    )["reservation_uuid"]
+
+
+def statuses(backend) -> list[str]:
+    return [row["status"] for row in backend.get_reservations_by_phone("01012345678")]
+
+
+def test_failed_items_are_rolled_back_individually(backend):
+    reservation_uuid = reserve(backend)
+    results = backend.cancel_reservations([reservation_uuid, "missing"])
+    assert [result["ok"] for result in results] == [True, False]
+    assert statuses(backend) == [CANCELLED_STATUS]
+
+
+def test_batch_is_one_transaction(backend, monkeypatch):
+    reservation_uuids = [reserve(backend), reserve(backend)]
+    cancel = backend._cancel
+
+    def crash_on_second(conn, reservation_uuid):
+        if reservation_uuid == reservation_uuids[1]:
+            raise RuntimeError("connection lost")
+        cancel(conn, reservation_uuid)
+
+    monkeypatch.setattr(backend, "_cancel", crash_on_second)
+    with pytest.raises(RuntimeError):
+        backend.cancel_reservations(reservation_uuids)
+    # 앞 항목의 취소도 함께 되돌려진다
+    assert statuses(backend) == ["reserved", "reserved"]
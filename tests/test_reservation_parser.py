@@ -0,0 +1,36 @@
+import pytest
+from benchmarks.reservation_corpus import CORPUS, NOW
+from my_agent.utils.reservation_parser import parse_price, parse_reservation, parse_time
+
+
+@pytest.mark.parametrize("text, expected_date, expected_service, expected_price", CORPUS)
+def test_parse_reservation(text, expected_date, expected_service, expected_price):
+    parsed = parse_reservation(text, now=NOW)
+    assert (parsed.reservation_date, parsed.service_name, parsed.price) == (
+        expected_date,
+        expected_service,
+        expected_price,
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("07:30", (7, 30)),
+        ("19:30", (19, 30)),
+        ("7시 반", (19, 30)),
+        ("오전 7시", (7, 0)),
+        ("밤 12시", (0, 0)),
+        ("밤 11시", (23, 0)),
+    ],
+)
+def test_afternoon_guess_only_for_korean_hours(text, expected):
+    assert parse_time(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("총 70,000원 (1만원 할인)", 70000), ("6만원 (5,000원 추가)", 60000), ("3만 5천원", 35000)],
+)
+def test_parse_price_takes_first_amount(text, expected):
+    assert parse_price(text) == expected
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from my_agent.utils.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceededError
+from my_agent.utils.rpc import RpcError, RpcGateway
+
+OK = (200, 0.0)
+UNAVAILABLE = (503, 0.0)
+BAD_REQUEST = (400, 0.0)
+
+
+class FaultInjectingPostgREST(BaseHTTPRequestHandler):
+    """script에 넣어 둔 (status, delay)를 요청 순서대로 돌려준다. 비어 있으면 200"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._send(200, {})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            status, delay = server.script.popleft() if server.script else OK
+        time.sleep(delay)
+        self._send(status, [{"ok": True}] if status < 400 else {"message": "injected"})
+
+    def _send(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # hedging/timeout으로 먼저 닫힌 연결에 늦게 응답하다 나는 오류는 무시한다
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(("127.0.0.1", 0), FaultInjectingPostgREST)
+    server.lock = threading.Lock()
+    server.script = deque()
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_gateway(server, **kwargs) -> RpcGateway:
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=2, reset_timeout=0.1))
+    return RpcGateway(
+        f"http://127.0.0.1:{server.server_port}", "stand-in-key", http2=False, **kwargs
+    )
+
+
+def read(gateway: RpcGateway):
+    return gateway.call("get_reservations_by_phone", {"phone_number": "01012345678"}, idempotent=True)
+
+
+def open_breaker(server, gateway: RpcGateway):
+    server.script.extend([UNAVAILABLE, UNAVAILABLE])
+    for _ in range(2):
+        with pytest.raises(RpcError):
+            read(gateway)
+    assert gateway.caller.breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        read(gateway)
+
+
+def test_read_retries_recover_from_5xx(server):
+    gateway = make_gateway(server, read_retries=2, breaker=CircuitBreaker(failure_threshold=10))
+    server.script.extend([UNAVAILABLE, UNAVAILABLE])
+    assert read(gateway) == [{"ok": True}]
+    assert server.requests == 3
+
+
+def test_writes_and_4xx_are_not_retried(server):
+    gateway = make_gateway(server, read_retries=2)
+    server.script.append(UNAVAILABLE)
+    with pytest.raises(RpcError):
+        gateway.call("cancel_reservation", {"reservation_uuid": "x"})
+    server.script.append(BAD_REQUEST)
+    with pytest.raises(RpcError) as e:
+        read(gateway)
+    assert e.value.status_code == 400
+    assert server.requests == 2
+    assert not gateway.caller.breaker.is_open
+
+
+def test_breaker_closes_after_non_retryable_probe(server):
+    gateway = make_gateway(server)
+    open_breaker(server, gateway)
+    time.sleep(0.15)
+    # half-open 시험 호출이 4xx여도 backend는 응답했으므로 breaker가 다시 열린다
+    server.script.append(BAD_REQUEST)
+    with pytest.raises(RpcError):
+        read(gateway)
+    for _ in range(3):
+        assert read(gateway) == [{"ok": True}]
+
+
+def test_breaker_reopens_after_failed_probe_and_recovers(server):
+    gateway = make_gateway(server, timeout=0.2)
+    open_breaker(server, gateway)
+    time.sleep(0.15)
+    # 시험 호출이 deadline을 넘기면 다시 막혔다가, reset_timeout 뒤 정상 응답으로 풀린다
+    server.script.append((200, 0.5))
+    with pytest.raises(DeadlineExceededError):
+        read(gateway)
+    with pytest.raises(CircuitOpenError):
+        read(gateway)
+    time.sleep(0.15)
+    assert read(gateway) == [{"ok": True}]
+    assert not gateway.caller.breaker.is_open
+
+
+def test_hedged_read_cuts_slow_response(server):
+    gateway = make_gateway(server, hedge_after=0.05, timeout=2.0)
+    server.script.append((200, 1.0))
+    start = time.monotonic()
+    assert read(gateway) == [{"ok": True}]
+    assert time.monotonic() - start < 0.5
+    assert server.requests == 2